@@ -0,0 +1,95 @@
+import argparse
+import time
+
+import numpy as np
+
+from digimix.audio import Gst
+from digimix.audio.base import AudioMode, GstElement
+from digimix.audio.buses import MasterBus
+from digimix.audio.channels import FaderChannel
+from digimix.audio.engine import ChannelStripEngine, VectorFaderChannel, VectorMasterBus
+from digimix.audio.pipeline import Topology
+from digimix.audio.profiles import OFFLINE
+
+from common import SAMPLE_RATE, BenchSink, BenchSource
+
+
+def make_topology(vectorized: bool, channel_count: int, buffers: int, frames: int) -> tuple[Topology, GstElement]:
+    topology = Topology(name=f"channel_strip-{channel_count}", profile=OFFLINE)
+    sources = [topology.add(BenchSource(name=f"in{i}", buffers=buffers, frames=frames)) for i in range(channel_count)]
+    if vectorized:
+        channels = [
+            topology.add(VectorFaderChannel(name=f"ch{i}", mode=AudioMode.MONO))
+            for i in range(channel_count)
+        ]
+        master = topology.add(VectorMasterBus(name="master", channels=channels))
+    else:
+        channels = [topology.add(FaderChannel(name=f"ch{i}")) for i in range(channel_count)]
+        master = topology.add(MasterBus(name="master", inputs=[channel.src[0] for channel in channels]))
+    out = topology.add(BenchSink(name="out"))
+
+    for source, channel in zip(sources, channels):
+        topology.link(source.src[0], channel.sink[0])
+    topology.link(master.src[0], out.sink[0])
+    return topology, master
+
+
+def run_pipeline(vectorized: bool, channel_count: int, buffers: int, frames: int) -> float:
+    topology, master = make_topology(vectorized, channel_count, buffers, frames)
+    pipeline = topology.create_pipeline()
+    topology.attach_pipeline(pipeline)
+
+    start = time.process_time()
+    pipeline.set_state(Gst.State.PLAYING)
+    pipeline.get_bus().timed_pop_filtered(Gst.CLOCK_TIME_NONE, Gst.MessageType.EOS | Gst.MessageType.ERROR)
+    cpu = time.process_time() - start
+
+    pipeline.set_state(Gst.State.NULL)
+    if isinstance(master, VectorMasterBus):
+        master.detach()
+    return cpu
+
+
+def run_engine(channel_count: int, buffers: int, frames: int) -> float:
+    engine = ChannelStripEngine()
+    for _ in range(channel_count):
+        engine.add_strip(1)
+    block = np.random.default_rng(0).uniform(-1, 1, (channel_count, 2, frames)).astype(np.float32)
+    block[:, 1] = 0
+
+    start = time.process_time()
+    for i in range(buffers):
+        # keep the ramp path in the measurement
+        if i % 16 == 0:
+            engine.set(i % channel_count, "fader", 0.5 if i % 32 else 1.)
+        engine.process(block)
+    return time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU per channel of the vectorized and element-per-stage strips")
+    parser.add_argument('--channels', type=int, nargs='+', default=[8, 32, 128])
+    parser.add_argument('--seconds', type=float, default=10., help="seconds of audio to process")
+    parser.add_argument('--frames', type=int, default=256, help="frames per buffer")
+    parser.add_argument('--gst', action='store_true', help="also run both engines as complete pipelines")
+    args = parser.parse_args()
+
+    buffers = int(args.seconds * SAMPLE_RATE / args.frames)
+    audio_s = buffers * args.frames / SAMPLE_RATE
+
+    print(f"{'channels':>8} {'engine':>10} {'cpu s':>8} {'us/ch/s':>9} {'realtime':>9}")
+    for channel_count in args.channels:
+        results = [("numpy", run_engine(channel_count, buffers, args.frames))]
+        if args.gst:
+            results.append(("elements", run_pipeline(False, channel_count, buffers, args.frames)))
+            results.append(("vector", run_pipeline(True, channel_count, buffers, args.frames)))
+
+        for name, cpu in results:
+            print(
+                f"{channel_count:>8} {name:>10} {cpu:>8.3f} "
+                f"{cpu * 1e6 / channel_count / audio_s:>9.1f} {audio_s / cpu if cpu else float('inf'):>8.1f}x"
+            )
+
+
+if __name__ == '__main__':
+    main()
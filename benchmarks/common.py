@@ -0,0 +1,68 @@
+import os
+
+from digimix.audio.base import GstElement
+from digimix.audio.builder import GraphBuilder, Serialized
+
+SAMPLE_RATE = 48000
+
+
+class BenchSource(GstElement):
+    def __init__(self, name: str, buffers: int, frames: int, is_live: bool = False):
+        super().__init__(name)
+        self._buffers = buffers
+        self._frames = frames
+        self._is_live = is_live
+
+    @property
+    def sink(self) -> list[str]:
+        return []
+
+    @property
+    def src(self) -> list[str]:
+        return [f"bench-src-{self.name}"]
+
+    def build(self, builder: GraphBuilder):
+        builder.chain(
+            builder.element(
+                "audiotestsrc",
+                f"bench-audiotestsrc-{self.name}",
+                num_buffers=self._buffers,
+                samplesperbuffer=self._frames,
+                is_live=self._is_live,
+                wave=Serialized("white-noise"),
+            ),
+            builder.element(
+                "capsfilter",
+                f"bench-caps-{self.name}",
+                caps=f"audio/x-raw,format=F32LE,layout=interleaved,rate={SAMPLE_RATE},channels=1",
+            ),
+            builder.element("tee", self.src[0]),
+        )
+
+
+class BenchSink(GstElement):
+    @property
+    def sink(self) -> list[str]:
+        return [f"bench-sink-{self.name}"]
+
+    @property
+    def src(self) -> list[str]:
+        return []
+
+    def build(self, builder: GraphBuilder):
+        builder.chain(builder.element("fakesink", self.sink[0], sync=False))
+
+
+def thread_count() -> int:
+    return len(os.listdir('/proc/self/task'))
+
+
+def memory_kib() -> dict[str, int]:
+    # VmRSS is the current resident set, VmHWM its peak
+    memory = {}
+    with open('/proc/self/status') as status:
+        for line in status:
+            key, _, value = line.partition(':')
+            if key in ('VmRSS', 'VmHWM'):
+                memory[key] = int(value.split()[0])
+    return memory
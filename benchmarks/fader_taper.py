@@ -0,0 +1,50 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from digimix.audio.tapers import ConsoleTaper, taper_table
+from digimix.audio.utils import db_to_amplitude
+
+
+def per_event(convert, values: list[int]) -> float:
+    start = time.perf_counter()
+    for value in values:
+        convert(value)
+    return (time.perf_counter() - start) / len(values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost of a fader CC conversion, computed vs. taper lookup table")
+    parser.add_argument('--events', type=int, default=200000)
+    parser.add_argument('--channels', type=int, default=64, help="faders set at once by a batched scene recall")
+    args = parser.parse_args()
+
+    taper = ConsoleTaper()
+    table = taper_table(taper)
+    values = [random.randrange(128) for _ in range(args.events)]
+
+    def computed(value: int) -> float:
+        return db_to_amplitude(float(taper.db(value / 127)))
+
+    print(f"{'conversion':<24} {'ns / event':>10}")
+    print(f"{'computed':<24} {per_event(computed, values[:args.events // 20]) * 1e9:>10.0f}")
+    print(f"{'db_to_amplitude':<24} {per_event(lambda value: db_to_amplitude(table.db(value)), values) * 1e9:>10.0f}")
+    print(f"{'table.amplitude':<24} {per_event(table.amplitude, values) * 1e9:>10.0f}")
+
+    batch = np.array(values[:args.channels])
+    rounds = max(args.events // args.channels, 1)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        [table.amplitude(value) for value in batch.tolist()]
+    scalar = (time.perf_counter() - start) / rounds
+    start = time.perf_counter()
+    for _ in range(rounds):
+        table.amplitude_batch(batch)
+    batched = (time.perf_counter() - start) / rounds
+    print(f"scene recall of {args.channels} faders: {scalar * 1e6:.1f}us scalar, {batched * 1e6:.1f}us batched")
+
+
+if __name__ == '__main__':
+    main()
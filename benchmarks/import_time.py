@@ -0,0 +1,40 @@
+import argparse
+
+from digimix.utils.importtime import measure_import
+
+MODULES = (
+    "digimix.audio",
+    "digimix.audio.utils",
+    "digimix.audio.base",
+    "digimix.audio.pipeline",
+    "digimix.midi.dispatcher",
+    "digimix.midi.generic_controls",
+    "digimix.midi.devices.akai_midimix",
+    "digimix.shm.reader",
+    "digimix.shm.export",
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per module import time in a fresh interpreter (-X importtime)")
+    parser.add_argument('modules', nargs='*', default=MODULES)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--top', type=int, default=0, help="also list the N slowest imports of each module")
+    args = parser.parse_args()
+
+    print(f"{'module':<36} {'best ms':>8} {'modules':>8} {'gi':>3}")
+    for module in args.modules:
+        try:
+            profiles = [measure_import(module) for _ in range(args.rounds)]
+        except RuntimeError as e:
+            print(f"{module:<36} failed: {str(e).splitlines()[-1]}")
+            continue
+        best = min(profiles, key=lambda profile: profile.cumulative_us(module))
+        gi = "yes" if "gi" in best.modules else "no"
+        print(f"{module:<36} {best.cumulative_us(module) / 1000:>8.1f} {len(best.modules):>8} {gi:>3}")
+        if args.top:
+            print(best.format(args.top))
+
+
+if __name__ == '__main__':
+    main()
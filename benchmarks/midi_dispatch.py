@@ -0,0 +1,111 @@
+import argparse
+import itertools
+import random
+import time
+import typing
+
+from mido.messages import Message
+
+from digimix.midi.dispatcher import MidiDispatcher
+from digimix.midi.raw import MidiParser
+from digimix.utils.dicts import dict_to_tuple
+
+
+class LinearMidiDispatcher:
+    # the dispatcher before indexing: every message is compared against every registered pattern
+    def __init__(self):
+        self._midi_callback_map = {}
+
+    def add_callback(self, partial_msg_dict: typing.Dict, callback: typing.Callable):
+        self._midi_callback_map.setdefault(dict_to_tuple(partial_msg_dict), set()).add(callback)
+
+    def dispatch(self, msg: Message):
+        msg_dict_view = msg.dict().items()
+        for partial_msg_dict, callbacks in self._midi_callback_map.items():
+            if dict(partial_msg_dict).items() <= msg_dict_view:
+                for callback in callbacks:
+                    if callback:
+                        callback(msg=msg)
+
+
+def patterns(count: int) -> list[dict]:
+    # distinct (type, channel, number) first, pattern values / velocities only once those run out
+    fields = {'control_change': ('control', 'value'), 'note_on': ('note', 'velocity'), 'note_off': ('note', 'velocity')}
+    result = []
+    for extra, msg_type, channel, number in itertools.product([None, *range(128)], fields, range(16), range(128)):
+        number_field, extra_field = fields[msg_type]
+        pattern = {'type': msg_type, 'channel': channel, number_field: number}
+        if extra is not None:
+            pattern[extra_field] = extra
+        result.append(pattern)
+        if len(result) == count:
+            return result
+    raise ValueError(f"Can't generate {count} distinct patterns")
+
+
+def messages(count: int) -> list[Message]:
+    result = []
+    for _ in range(count):
+        msg_type = random.choice(('control_change', 'note_on', 'note_off'))
+        number_field, extra_field = ('control', 'value') if msg_type == 'control_change' else ('note', 'velocity')
+        result.append(Message(
+            msg_type, channel=random.randrange(16), **{number_field: random.randrange(128), extra_field: 127},
+        ))
+    return result
+
+
+def rate(dispatcher, msgs: list[Message]) -> float:
+    start = time.perf_counter()
+    for msg in msgs:
+        dispatcher.dispatch(msg)
+    return len(msgs) / (time.perf_counter() - start)
+
+
+def decode_rate(dispatcher: MidiDispatcher, packets: list[list[int]]) -> tuple[float, float]:
+    start = time.perf_counter()
+    for packet in packets:
+        dispatcher.dispatch(Message.from_bytes(packet))
+    mido_rate = len(packets) / (time.perf_counter() - start)
+
+    parser = MidiParser()
+    start = time.perf_counter()
+    for packet in packets:
+        for msg in parser.feed(packet):
+            dispatcher.dispatch(msg)
+    return mido_rate, len(packets) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MIDI dispatch throughput: linear scan vs. index, mido decoding vs. raw bytes")
+    parser.add_argument('--registrations', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--messages', type=int, default=20000)
+    args = parser.parse_args()
+
+    def callback(msg: Message):
+        pass
+
+    msgs = messages(args.messages)
+    print(f"{'registrations':>13} {'linear msg/s':>13} {'indexed msg/s':>14} {'speedup':>8}")
+    for count in args.registrations:
+        linear, indexed = LinearMidiDispatcher(), MidiDispatcher()
+        for pattern in patterns(count):
+            linear.add_callback(pattern, callback)
+            indexed.add_callback(pattern, callback)
+        # the linear scan gets slow quickly, a slice of the messages is enough for a stable rate
+        linear_rate = rate(linear, msgs[:max(args.messages * 100 // count, 100)])
+        indexed_rate = rate(indexed, msgs)
+        print(f"{count:>13} {linear_rate:>13.0f} {indexed_rate:>14.0f} {indexed_rate / linear_rate:>8.1f}")
+
+    # bytes as they come from rtmidi, decoded through mido vs. the raw parser
+    print(f"\n{'registrations':>13} {'mido msg/s':>13} {'raw msg/s':>14} {'speedup':>8}")
+    packets = [msg.bytes() for msg in msgs]
+    for count in args.registrations:
+        indexed = MidiDispatcher()
+        for pattern in patterns(count):
+            indexed.add_callback(pattern, callback)
+        mido_rate, raw_rate = decode_rate(indexed, packets)
+        print(f"{count:>13} {mido_rate:>13.0f} {raw_rate:>14.0f} {raw_rate / mido_rate:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+import argparse
+import os
+import time
+
+from digimix.audio import GLib, Gst
+from digimix.audio.base import AudioMode
+from digimix.audio.builder import GraphBuilder, Serialized
+from digimix.audio.io.jack import (
+    MatrixJackClientInput,
+    MatrixJackClientOutput,
+    MultiJackClientInput,
+    SingleJackClientInput,
+    SingleJackClientOutput,
+)
+from digimix.audio.pipeline import Topology
+
+from common import BenchSink
+
+LAYOUTS = {
+    'single': (SingleJackClientInput, SingleJackClientOutput),
+    'matrix': (MatrixJackClientInput, MatrixJackClientOutput),
+}
+SIDES = ('in', 'out', 'both')
+
+# elements which run their own streaming thread
+THREADED_FACTORIES = ("queue", "jackaudiosrc", "audiotestsrc", "audiomixer", "audiointerleave")
+
+OFFLINE_FRAMES = 256
+OFFLINE_RATE = 48000
+
+
+class OfflineJack:
+    # swaps the JACK elements for a white noise source and a fakesink, the patch panel in between stays the same
+    offline_buffers = 0
+
+    def _jack_element(self, builder: GraphBuilder, factory: str, name: str, client_name: str) -> str:
+        if factory == "jackaudiosrc":
+            return builder.element(
+                "audiotestsrc",
+                name,
+                num_buffers=self.offline_buffers,
+                samplesperbuffer=OFFLINE_FRAMES,
+                wave=Serialized("white-noise"),
+            )
+        return builder.element("fakesink", name, sync=False)
+
+
+def offline(cls: type, buffers: int) -> type:
+    return type(f"Offline{cls.__name__}", (OfflineJack, cls), {"offline_buffers": buffers})
+
+
+def make_topology(layout: str, stereo_count: int, side: str = 'both', offline_buffers: int = 0) -> Topology:
+    input_class, output_class = LAYOUTS[layout]
+    if side == 'out':
+        # one source per stream, so only the output patch panel differs between layouts
+        input_class = MultiJackClientInput
+    if offline_buffers:
+        input_class, output_class = offline(input_class, offline_buffers), offline(output_class, offline_buffers)
+    conf = tuple((f"st{i}", AudioMode.STEREO) for i in range(stereo_count))
+
+    topology = Topology(name=f"patch_panel-{layout}-{side}")
+    src = topology.add(input_class(name=f"bench_in_{layout}", conf=conf))
+    if side == 'in':
+        sinks = [topology.add(BenchSink(name=name)).sink[0] for name, _ in conf]
+    else:
+        sinks = topology.add(output_class(name=f"bench_out_{layout}", conf=conf)).sink
+    for src_name, sink_name in zip(src.src, sinks):
+        topology.link(src_name, sink_name)
+    return topology
+
+
+def run(topology: Topology, seconds: float) -> tuple[float, int]:
+    pipeline = topology.create_pipeline()
+    main = GLib.MainLoop()
+    pipeline.set_state(Gst.State.PLAYING)
+    pipeline.get_state(Gst.CLOCK_TIME_NONE)
+
+    threads = len(os.listdir('/proc/self/task'))
+    start = time.process_time()
+    GLib.timeout_add(int(seconds * 1000), main.quit)
+    main.run()
+    cpu = time.process_time() - start
+
+    pipeline.set_state(Gst.State.NULL)
+    return cpu / seconds, threads
+
+
+def run_offline(topology: Topology, audio_seconds: float) -> tuple[float, int]:
+    # runs as fast as possible to EOS, CPU time per second of audio is the load the layout puts on a live system
+    pipeline = topology.create_pipeline()
+    start = time.process_time()
+    pipeline.set_state(Gst.State.PLAYING)
+    threads = len(os.listdir('/proc/self/task'))
+    message = pipeline.get_bus().timed_pop_filtered(
+        Gst.CLOCK_TIME_NONE, Gst.MessageType.EOS | Gst.MessageType.ERROR,
+    )
+    cpu = time.process_time() - start
+    pipeline.set_state(Gst.State.NULL)
+    if message.type == Gst.MessageType.ERROR:
+        error, debug = message.parse_error()
+        raise RuntimeError(f"{topology.name} failed: {error.message}")
+    return cpu / audio_seconds, threads
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the deinterleave/interleave and matrix patch panels")
+    parser.add_argument('--stereo', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--side', choices=SIDES, nargs='+', default=list(SIDES))
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        '--run',
+        type=float,
+        metavar='SECONDS',
+        help="also play each topology (requires a running JACK server) and measure CPU load and threads",
+    )
+    mode.add_argument(
+        '--offline',
+        type=float,
+        metavar='AUDIO_SECONDS',
+        help="replace JACK by white noise sources and fakesinks, process AUDIO_SECONDS of audio as fast as possible "
+             "and report CPU time per second of audio",
+    )
+    args = parser.parse_args()
+    offline_buffers = int(args.offline * OFFLINE_RATE / OFFLINE_FRAMES) if args.offline else 0
+
+    print(
+        f"{'layout':>8} {'side':>4} {'stereo':>6} {'elements':>8} {'queues':>6} {'threads':>7} "
+        f"{'cpu %':>6} {'os threads':>10}"
+    )
+    for side in args.side:
+        for stereo_count in args.stereo:
+            for layout in LAYOUTS:
+                topology = make_topology(layout, stereo_count, side, offline_buffers)
+                elements = topology.graph.elements.values()
+                queues = sum(element.factory == "queue" for element in elements)
+                threads = sum(element.factory in THREADED_FACTORIES for element in elements)
+
+                if args.run:
+                    cpu, os_threads = run(topology, args.run)
+                elif args.offline:
+                    cpu, os_threads = run_offline(topology, args.offline)
+                else:
+                    cpu, os_threads = float('nan'), 0
+                print(
+                    f"{layout:>8} {side:>4} {stereo_count:>6} {len(elements):>8} {queues:>6} {threads:>7} "
+                    f"{cpu * 100:>6.1f} {os_threads:>10}"
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import socket
+import time
+
+from digimix.audio import Gst
+from digimix.audio.base import AudioMode
+from digimix.audio.io.rtp import RtpEncoding, RtpInput, RtpOutput
+from digimix.audio.pipeline import Topology
+from digimix.audio.profiles import LIVE
+
+from common import BenchSink, BenchSource
+
+MS_NS = 1000 * 1000
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as udp:
+        udp.bind(("127.0.0.1", 0))
+        return udp.getsockname()[1] & ~1
+
+
+def make_topology(
+    channel_count: int,
+    encoding: RtpEncoding,
+    ptime_ns: int,
+    latency_ns: int,
+) -> tuple[Topology, RtpInput]:
+    # stage box and mixing host in one process, connected over loopback
+    topology = Topology(name=f"rtp-{channel_count}", profile=LIVE)
+    conf = tuple((f"ch{i}", AudioMode.MONO) for i in range(channel_count))
+    port = free_port()
+    rtp_out = topology.add(
+        RtpOutput("stagebox", conf, host="127.0.0.1", port=port, encoding=encoding, ptime_ns=ptime_ns)
+    )
+    rtp_in = topology.add(
+        RtpInput("host", conf, address="127.0.0.1", port=port, encoding=encoding, latency_ns=latency_ns)
+    )
+    for i, (name, _) in enumerate(conf):
+        source = topology.add(BenchSource(name=name, buffers=-1, frames=64, is_live=True))
+        sink = topology.add(BenchSink(name=name))
+        topology.link(source.src[0], rtp_out.sink[i])
+        topology.link(rtp_in.src[i], sink.sink[0])
+    return topology, rtp_in
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RTP loopback: CPU cost and packet statistics against packet time")
+    parser.add_argument('--channels', type=int, nargs='+', default=[2, 8, 32])
+    parser.add_argument('--ptime-ms', type=float, nargs='+', default=[0.25, 0.5, 1., 2., 4.])
+    parser.add_argument('--latency-ms', type=int, default=5, help="jitter buffer latency")
+    parser.add_argument('--encoding', choices=[encoding.name for encoding in RtpEncoding], default="L24")
+    parser.add_argument('--seconds', type=float, default=5.)
+    args = parser.parse_args()
+
+    print(f"{'channels':>8} {'ptime ms':>8} {'packets/s':>9} {'cpu/s':>7} {'lost %':>7} {'late':>6} {'jitter ms':>9}")
+    for channel_count in args.channels:
+        for ptime_ms in args.ptime_ms:
+            topology, rtp_in = make_topology(
+                channel_count,
+                RtpEncoding[args.encoding],
+                int(ptime_ms * MS_NS),
+                args.latency_ms * MS_NS,
+            )
+            pipeline = topology.create_pipeline()
+            topology.attach_pipeline(pipeline)
+
+            cpu_start = time.process_time()
+            pipeline.set_state(Gst.State.PLAYING)
+            time.sleep(args.seconds)
+            cpu_s = time.process_time() - cpu_start
+            statistics = list(rtp_in.statistics().values())
+            pipeline.set_state(Gst.State.NULL)
+
+            pushed = sum(stats.pushed for stats in statistics)
+            lost = sum(stats.lost for stats in statistics)
+            print(
+                f"{channel_count:>8} {ptime_ms:>8.2f} {channel_count * 1000 / ptime_ms:>9.0f} "
+                f"{cpu_s / args.seconds:>7.3f} {100 * lost / max(1, pushed + lost):>7.2f} "
+                f"{sum(stats.late for stats in statistics):>6} "
+                f"{max(stats.jitter_ns for stats in statistics) / MS_NS:>9.3f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import statistics
+import time
+
+from digimix.audio import Gst
+from digimix.audio.automation import element_running_time
+from digimix.audio.buses import MasterBus
+from digimix.audio.channels import AudioPanoramaMethods, FaderChannel
+from digimix.audio.pipeline import Topology
+from digimix.audio.profiles import LIVE
+from digimix.audio.scenes import SceneStore
+
+from common import BenchSink, BenchSource
+
+
+def make_topology(channel_count: int) -> tuple[Topology, list[FaderChannel]]:
+    topology = Topology(name=f"scene_recall-{channel_count}", profile=LIVE)
+    sources = [
+        topology.add(BenchSource(name=f"in{i}", buffers=-1, frames=256, is_live=True))
+        for i in range(channel_count)
+    ]
+    channels = [topology.add(FaderChannel(name=f"ch{i}")) for i in range(channel_count)]
+    master = topology.add(MasterBus(name="master", inputs=[channel.src[0] for channel in channels]))
+    out = topology.add(BenchSink(name="out"))
+    for source, channel in zip(sources, channels):
+        topology.link(source.src[0], channel.sink[0])
+    topology.link(master.src[0], out.sink[0])
+    return topology, channels
+
+
+def scramble(channels: list[FaderChannel], fraction: float, step: int):
+    for channel in channels[:max(1, round(len(channels) * fraction))]:
+        channel.gain_db = step % 7
+        channel.fader_db = -(step % 13)
+        channel.pan = (step % 5 - 2) / 2
+        channel.pan_method = AudioPanoramaMethods(step % 2)
+        channel.cut = bool(step % 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scene recall latency against individual property writes")
+    parser.add_argument('--channels', type=int, nargs='+', default=[8, 32, 128])
+    parser.add_argument('--fractions', type=float, nargs='+', default=[0.1, 1.])
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'channels':>8} {'changed':>7} {'writes':>6} {'recall us':>10} {'direct us':>10} {'direct spread us':>16}")
+    for channel_count in args.channels:
+        topology, channels = make_topology(channel_count)
+        pipeline = topology.create_pipeline()
+        topology.attach_pipeline(pipeline)
+        pipeline.set_state(Gst.State.PLAYING)
+        pipeline.get_state(Gst.CLOCK_TIME_NONE)
+
+        store = SceneStore(topology)
+        store.attach_pipeline(pipeline)
+        store.save("base")
+
+        for fraction in args.fractions:
+            recall_s, direct_s, spread_ns, writes = [], [], [], 0
+            for step in range(1, args.rounds + 1):
+                scramble(channels, fraction, step)
+                start = time.perf_counter()
+                writes = store.recall("base").changes
+                recall_s.append(time.perf_counter() - start)
+
+                # the same changes as individual live writes, each landing whenever it happens to run
+                scramble(channels, fraction, step)
+                changes = store.capture("now").diff(store.scenes["base"])
+                start, first_ns = time.perf_counter(), element_running_time(pipeline)
+                for name, values in changes.items():
+                    channel = next(channel for channel in channels if channel.name == name)
+                    for key, value in values.items():
+                        setattr(channel, key, type(getattr(channel, key))(value))
+                direct_s.append(time.perf_counter() - start)
+                spread_ns.append(element_running_time(pipeline) - first_ns)
+
+            print(
+                f"{channel_count:>8} {fraction:>7.0%} {writes:>6} "
+                f"{statistics.median(recall_s) * 1e6:>10.1f} {statistics.median(direct_s) * 1e6:>10.1f} "
+                f"{statistics.median(spread_ns) / 1000:>16.1f}"
+            )
+
+        pipeline.set_state(Gst.State.NULL)
+
+
+if __name__ == '__main__':
+    main()
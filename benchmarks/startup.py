@@ -0,0 +1,62 @@
+import argparse
+import statistics
+import time
+
+from digimix.audio import Gst
+from digimix.audio.base import AudioMode
+from digimix.audio.buses import MasterBus
+from digimix.audio.channels import FaderChannel
+from digimix.audio.io.jack import SingleJackClientInput, SingleJackClientOutput
+from digimix.audio.pipeline import Topology
+
+
+def make_topology(channel_count: int) -> Topology:
+    topology = Topology(name=f"startup-{channel_count}")
+
+    src = topology.add(SingleJackClientInput(
+        name="bench_in",
+        conf=tuple((f"in{i}", AudioMode.MONO) for i in range(channel_count)),
+    ))
+    channels = [topology.add(FaderChannel(name=f"ch{i}")) for i in range(channel_count)]
+    master = topology.add(MasterBus(name="master", inputs=[channel.src[0] for channel in channels]))
+    out = topology.add(SingleJackClientOutput(name="bench_out", conf=(("main", AudioMode.STEREO),)))
+
+    for src_name, channel in zip(src.src, channels):
+        topology.link(src_name, channel.sink[0])
+    topology.link(master.src[0], out.sink[0])
+
+    return topology
+
+
+def measure(factory, rounds: int) -> list[float]:
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        pipeline = factory()
+        durations.append(time.perf_counter() - start)
+        pipeline.set_state(Gst.State.NULL)
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pipeline startup of Gst.parse_launch and the builder")
+    parser.add_argument('--channels', type=int, nargs='+', default=[8, 32, 128])
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'channels':>8} {'desc kB':>8} {'parse_launch ms':>16} {'builder ms':>11} {'speedup':>8}")
+    for channel_count in args.channels:
+        topology = make_topology(channel_count)
+        desc_size = len(topology.pipeline_description.encode()) / 1024
+
+        parsed = statistics.median(measure(topology.parse_launch, args.rounds))
+        built = statistics.median(measure(topology.create_pipeline, args.rounds))
+
+        print(
+            f"{channel_count:>8} {desc_size:>8.1f} "
+            f"{parsed * 1000:>16.2f} {built * 1000:>11.2f} {parsed / built:>8.2f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
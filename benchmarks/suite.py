@@ -0,0 +1,240 @@
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from digimix.audio import Gst
+from digimix.audio.buses import MasterBus
+from digimix.audio.channels import FaderChannel
+from digimix.audio.pipeline import Topology
+from digimix.audio.profiles import PROFILES
+from digimix.audio.stages import DynamicsStage, EqualizerBand, EqualizerStage, HighPassStage
+from digimix.audio.threads import ThreadPlacement, thread_domain
+
+from common import SAMPLE_RATE, BenchSink, BenchSource, memory_kib, thread_count
+
+STAGES = ("none", "bypassed", "active")
+
+# metrics where a larger value is a regression
+TRACKED_METRICS = ("startup_ms", "to_playing_ms", "cpu_per_audio_s", "threads", "rss_kib")
+
+
+def make_stages(stages: str) -> list:
+    if stages == "none":
+        return []
+    bypass = stages == "bypassed"
+    return [
+        HighPassStage(bypass=bypass),
+        EqualizerStage([EqualizerBand(freq=freq, bandwidth=freq / 2) for freq in (100., 1000., 8000.)], bypass=bypass),
+        DynamicsStage(bypass=bypass),
+    ]
+
+
+def make_topology(
+    channel_count: int,
+    bus_count: int,
+    buffers: int,
+    frames: int,
+    profile: str,
+    domain_count: int = 0,
+    stages: str = "none",
+) -> Topology:
+    topology = Topology(name=f"suite-{channel_count}x{bus_count}", profile=PROFILES[profile])
+    sources = [topology.add(BenchSource(name=f"in{i}", buffers=buffers, frames=frames)) for i in range(channel_count)]
+    channels = [
+        topology.add(FaderChannel(name=f"ch{i}", stages=make_stages(stages)))
+        for i in range(channel_count)
+    ]
+    for source, channel in zip(sources, channels):
+        topology.link(source.src[0], channel.sink[0])
+
+    buses = []
+    for i in range(bus_count):
+        bus = topology.add(MasterBus(name=f"bus{i}", inputs=[channel.src[0] for channel in channels]))
+        out = topology.add(BenchSink(name=f"out{i}"))
+        topology.link(bus.src[0], out.sink[0])
+        buses.append(bus)
+
+    if domain_count:
+        # buses on the first CPU, consecutive channel groups spread over the others
+        cpus = sorted(os.sched_getaffinity(0))
+        channel_cpus = cpus[1:] or cpus
+        topology.assign(thread_domain("buses", cpus[0]), *buses)
+        group_size = -(-channel_count // domain_count)
+        for group in range(domain_count):
+            domain = thread_domain(f"channels-{group}", channel_cpus[group % len(channel_cpus)])
+            members = slice(group * group_size, (group + 1) * group_size)
+            topology.assign(domain, *sources[members], *channels[members])
+    return topology
+
+
+def run_case(
+    channel_count: int,
+    bus_count: int,
+    seconds: float,
+    frames: int,
+    profile: str,
+    domain_count: int,
+    stages: str,
+) -> dict:
+    buffers = int(seconds * SAMPLE_RATE / frames)
+    topology = make_topology(channel_count, bus_count, buffers, frames, profile, domain_count, stages)
+    elements = len(topology.graph.elements)
+
+    start = time.perf_counter()
+    pipeline = topology.create_pipeline()
+    startup_s = time.perf_counter() - start
+    topology.attach_pipeline(pipeline)
+    if domain_count:
+        ThreadPlacement.for_topology(topology).attach_pipeline(pipeline)
+
+    try:
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        pipeline.set_state(Gst.State.PLAYING)
+        result, _, _ = pipeline.get_state(Gst.CLOCK_TIME_NONE)
+        to_playing_s = time.perf_counter() - start
+        if result == Gst.StateChangeReturn.FAILURE:
+            raise RuntimeError(f"{topology.name} failed to reach PLAYING")
+        threads = thread_count()
+
+        message = pipeline.get_bus().timed_pop_filtered(
+            Gst.CLOCK_TIME_NONE,
+            Gst.MessageType.EOS | Gst.MessageType.ERROR,
+        )
+        cpu_s = time.process_time() - cpu_start
+        if message.type == Gst.MessageType.ERROR:
+            error, debug = message.parse_error()
+            raise RuntimeError(f"{topology.name} failed: {error.message} ({debug})")
+        memory = memory_kib()
+    finally:
+        pipeline.set_state(Gst.State.NULL)
+
+    return {
+        "channels": channel_count,
+        "buses": bus_count,
+        "domains": domain_count,
+        "stages": stages,
+        "elements": elements,
+        "startup_ms": startup_s * 1000,
+        "to_playing_ms": to_playing_s * 1000,
+        "cpu_per_audio_s": cpu_s / (buffers * frames / SAMPLE_RATE),
+        "threads": threads,
+        "rss_kib": memory.get("VmRSS", 0),
+        "peak_rss_kib": memory.get("VmHWM", 0),
+    }
+
+
+def environment() -> dict:
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "revision": revision,
+        "gstreamer": Gst.version_string(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    }
+
+
+def compare(results: list[dict], baseline_path: str, tolerance: float) -> int:
+    baseline = {}
+    with open(baseline_path) as baseline_file:
+        for line in baseline_file:
+            record = json.loads(line)
+            key = (record["channels"], record["buses"], record.get("domains", 0), record.get("stages", "none"))
+            baseline[key + (record.get("profile"),)] = record
+
+    regressions = 0
+    for record in results:
+        known = baseline.get(
+            (record["channels"], record["buses"], record["domains"], record["stages"], record["profile"])
+        )
+        if known is None:
+            continue
+        for metric in TRACKED_METRICS:
+            if known[metric] and record[metric] > known[metric] * (1 + tolerance):
+                regressions += 1
+                print(
+                    f"regression {record['channels']}x{record['buses']} {metric}: "
+                    f"{known[metric]:.3f} -> {record[metric]:.3f}",
+                    file=sys.stderr,
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic topology benchmarks: audiotestsrc -> channels -> buses")
+    parser.add_argument('--channels', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32, 64, 128, 256])
+    parser.add_argument('--buses', type=int, nargs='+', default=[1])
+    parser.add_argument('--seconds', type=float, default=5., help="seconds of audio to render per case")
+    parser.add_argument('--frames', type=int, default=256, help="frames per buffer")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='offline')
+    parser.add_argument(
+        '--domains',
+        type=int,
+        default=0,
+        help="split the channels into this many pinned thread domains, 0 leaves placement to the scheduler",
+    )
+    parser.add_argument(
+        '--stages',
+        choices=STAGES,
+        nargs='+',
+        default=["none"],
+        help="per channel HPF/EQ/dynamics stages; bypassed stages should cost the same as none",
+    )
+    parser.add_argument('--output', metavar='FILE', help="append the results as JSON lines")
+    parser.add_argument('--compare', metavar='FILE', help="JSON lines of a previous run, exits 1 on regressions")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="relative slack before flagging a regression")
+    args = parser.parse_args()
+
+    env = environment()
+    results = []
+    print(
+        f"{'channels':>8} {'buses':>5} {'stages':>8} {'elements':>8} {'startup ms':>10} {'playing ms':>10} "
+        f"{'cpu/s':>7} {'threads':>7} {'rss MiB':>8}"
+    )
+    # one fresh process per case so threads and RSS don't leak between cases
+    context = multiprocessing.get_context('spawn')
+    cases = [
+        (channel_count, bus_count, stages)
+        for channel_count in args.channels
+        for bus_count in args.buses
+        for stages in args.stages
+    ]
+    for channel_count, bus_count, stages in cases:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            record = executor.submit(
+                run_case, channel_count, bus_count, args.seconds, args.frames, args.profile, args.domains, stages,
+            ).result()
+        record = {**env, "profile": args.profile, "seconds": args.seconds, "frames": args.frames, **record}
+        results.append(record)
+        print(
+            f"{record['channels']:>8} {record['buses']:>5} {record['stages']:>8} {record['elements']:>8} "
+            f"{record['startup_ms']:>10.1f} {record['to_playing_ms']:>10.1f} "
+            f"{record['cpu_per_audio_s']:>7.3f} {record['threads']:>7} {record['rss_kib'] / 1024:>8.1f}"
+        )
+
+    if args.output:
+        with open(args.output, 'a') as output:
+            for record in results:
+                output.write(json.dumps(record) + '\n')
+
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,53 @@
-import gi
+import threading
 
-gi.require_version('GLib', '2.0')
-gi.require_version('Gst', '1.0')
-gi.require_version('GstAudio', '1.0')
+minGst = (1, 18)
 
-# noinspection PyUnresolvedReferences
-from gi.repository import GLib, Gst, GstAudio
+_init_lock = threading.Lock()
+_modules: dict = {}
+
+
+def _initialize():
+    # deferred until the first repository lookup, MIDI and shm only users never load GStreamer
+    with _init_lock:
+        if _modules:
+            return
+        import gi
+
+        gi.require_version('GLib', '2.0')
+        gi.require_version('GObject', '2.0')
+        gi.require_version('Gst', '1.0')
+        gi.require_version('GstAudio', '1.0')
+        gi.require_version('GstController', '1.0')
+
+        # noinspection PyUnresolvedReferences
+        from gi.repository import GLib, GObject, Gst, GstAudio, GstController
+
+        Gst.init([])
+        if Gst.version() < minGst:
+            raise Exception('GStreamer version', Gst.version(), 'is too old, at least', minGst, 'is required')
+        _modules.update(GLib=GLib, GObject=GObject, Gst=Gst, GstAudio=GstAudio, GstController=GstController)
+
+
+class _Repository:
+    # stands in for a gi.repository module, so importing it from here doesn't load GStreamer yet
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, name: str):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        _initialize()
+        value = getattr(_modules[self._name], name)
+        # later lookups of the same name don't go through __getattr__ anymore
+        setattr(self, name, value)
+        return value
+
+    def __repr__(self) -> str:
+        return f"<lazy gi.repository.{self._name}>"
 
-minGst = (1, 18)
 
-Gst.init([])
-if Gst.version() < minGst:
-    raise Exception('GStreamer version', Gst.version(), 'is too old, at least', minGst, 'is required')
+GLib = _Repository('GLib')
+GObject = _Repository('GObject')
+Gst = _Repository('Gst')
+GstAudio = _Repository('GstAudio')
+GstController = _Repository('GstController')
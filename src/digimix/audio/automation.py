@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import typing
+
+from digimix.audio import Gst, GstController
+from digimix.audio.bindings import ParameterBindings, PropertyBinding
+
+
+def element_running_time(element: Gst.Element) -> int:
+    clock = element.get_clock()
+    if clock is None:
+        return 0
+    return max(0, clock.get_time() - element.get_base_time())
+
+
+class ParameterRamp:
+    def __init__(self, binding: PropertyBinding, ramp_time_ns: int):
+        self._binding = binding
+        self._ramp_time_ns = int(ramp_time_ns)
+
+        self._control_source = GstController.InterpolationControlSource.new()
+        self._control_source.set_property("mode", GstController.InterpolationMode.LINEAR)
+        self._control_binding = GstController.DirectControlBinding.new_absolute(
+            binding.element,
+            binding.property_name,
+            self._control_source,
+        )
+        if not binding.element.add_control_binding(self._control_binding):
+            raise RuntimeError(f"Couldn't add control binding for {binding}")
+
+    @property
+    def binding(self) -> PropertyBinding:
+        return self._binding
+
+    @property
+    def control_source(self) -> GstController.InterpolationControlSource:
+        return self._control_source
+
+    @property
+    def ramp_time_ns(self) -> int:
+        return self._ramp_time_ns
+
+    @ramp_time_ns.setter
+    def ramp_time_ns(self, new_ramp_time_ns: int):
+        self._ramp_time_ns = int(new_ramp_time_ns)
+
+    def ramp_to(self, value: float, ramp_time_ns: typing.Optional[int] = None, start_ns: typing.Optional[int] = None):
+        if ramp_time_ns is None:
+            ramp_time_ns = self._ramp_time_ns
+        if start_ns is None:
+            start_ns = element_running_time(self._binding.element)
+
+        valid, current = self._control_source.get_value(start_ns)
+        if not valid:
+            current = self._binding.get()
+
+        self._control_source.unset_all()
+        if ramp_time_ns > 0:
+            self._control_source.set(start_ns, current)
+            self._control_source.set(start_ns + ramp_time_ns, value)
+        else:
+            self._control_source.set(start_ns, value)
+            self._binding.set(value)
+
+    def schedule(self, value: float, at_ns: int, ramp_time_ns: typing.Optional[int] = None):
+        # unlike ramp_to, points before at_ns are kept so a whole script can be queued up front
+        if ramp_time_ns is None:
+            ramp_time_ns = self._ramp_time_ns
+
+        valid, current = self._control_source.get_value(at_ns)
+        if not valid:
+            current = self._binding.get()
+
+        for timed_value in self._control_source.get_all():
+            if timed_value.timestamp >= at_ns:
+                self._control_source.unset(timed_value.timestamp)
+        self._control_source.set(at_ns, current)
+        self._control_source.set(at_ns + max(1, ramp_time_ns), value)
+
+    def detach(self):
+        self._binding.element.remove_control_binding(self._control_binding)
+
+
+class ParameterAutomation:
+    def __init__(self, bindings: ParameterBindings, ramp_times_ns: typing.Mapping[str, int]):
+        self._bindings = bindings
+        self._ramps: dict[str, ParameterRamp] = {
+            key: ParameterRamp(bindings[key], ramp_time_ns)
+            for key, ramp_time_ns in ramp_times_ns.items()
+            if key in bindings
+        }
+
+    @property
+    def ramps(self) -> typing.Mapping[str, ParameterRamp]:
+        return self._ramps
+
+    def set(self, key: str, value, ramp_time_ns: typing.Optional[int] = None, start_ns: typing.Optional[int] = None):
+        ramp = self._ramps.get(key)
+        if ramp is not None:
+            ramp.ramp_to(value, ramp_time_ns=ramp_time_ns, start_ns=start_ns)
+        else:
+            self._bindings.set(key, value)
+
+    def schedule(self, key: str, value, at_ns: int, ramp_time_ns: typing.Optional[int] = None):
+        ramp = self._ramps.get(key)
+        if ramp is not None:
+            ramp.schedule(value, at_ns, ramp_time_ns=ramp_time_ns)
+        elif key in self._bindings:
+            self._bindings[key].set_at(value, at_ns)
+
+    def set_ramp_time_ns(self, key: str, ramp_time_ns: int):
+        ramp = self._ramps.get(key)
+        if ramp is not None:
+            ramp.ramp_time_ns = ramp_time_ns
+
+    def detach(self):
+        for ramp in self._ramps.values():
+            ramp.detach()
+        self._ramps.clear()
@@ -1,21 +1,110 @@
+from __future__ import annotations
+
+import contextlib
 import enum
+import functools
 import typing
 from abc import ABC, abstractmethod
 
 from digimix.audio import Gst, GstAudio
+from digimix.audio.automation import ParameterAutomation
+from digimix.audio.bindings import ParameterBindings
+from digimix.audio.builder import DescriptionBuilder, GraphBuilder
+from digimix.audio.formats import INTERNAL_FORMAT, SampleFormat
+from digimix.audio.profiles import DEFAULT_PROFILE, LatencyProfile
+from digimix.audio.scheduler import ParameterScheduler
 from digimix.audio.utils import amplitude_to_db, db_to_amplitude
 
 
+class ThreadDomain(typing.NamedTuple):
+    name: str
+    cpus: frozenset[int]
+
+
 class GstElement(ABC):
-    QUEUE_TIME_NS = 3 * 1000 * 1000 * 1000
+    RAMP_TIMES_NS: dict[str, int] = {}
+    SCENE_PARAMETERS: tuple[str, ...] = ()
 
     def __init__(self, name: str):
         self.__name = str(name)
+        self._pipeline: typing.Optional[Gst.Pipeline] = None
+        self._bindings = ParameterBindings()
+        self._ramp_times_ns = dict(self.RAMP_TIMES_NS)
+        self._automation = ParameterAutomation(self._bindings, {})
+        self._scheduler: typing.Optional[ParameterScheduler] = None
+        self._profile = DEFAULT_PROFILE
+        self._sample_format = INTERNAL_FORMAT
+        self._scheduled_at_ns: typing.Optional[int] = None
+        self._scheduled_ramp_time_ns: typing.Optional[int] = None
+        self._thread_domain: typing.Optional[ThreadDomain] = None
+        self._upstream: typing.Mapping[str, GstElement] = {}
 
     @property
     def name(self) -> str:
         return self.__name
 
+    @property
+    def profile(self) -> LatencyProfile:
+        return self._profile
+
+    @profile.setter
+    def profile(self, new_profile: LatencyProfile):
+        self._profile = new_profile
+
+    @property
+    def sample_format(self) -> SampleFormat:
+        return self._sample_format
+
+    @sample_format.setter
+    def sample_format(self, new_sample_format: SampleFormat):
+        self._sample_format = new_sample_format
+
+    @property
+    def thread_domain(self) -> typing.Optional[ThreadDomain]:
+        return self._thread_domain
+
+    @thread_domain.setter
+    def thread_domain(self, new_thread_domain: typing.Optional[ThreadDomain]):
+        self._thread_domain = new_thread_domain
+
+    @property
+    def upstream(self) -> typing.Mapping[str, 'GstElement']:
+        return self._upstream
+
+    @upstream.setter
+    def upstream(self, new_upstream: typing.Mapping[str, 'GstElement']):
+        self._upstream = new_upstream
+
+    @property
+    def parameter_targets(self) -> dict[str, tuple[str, str]]:
+        return {}
+
+    @property
+    def bindings(self) -> ParameterBindings:
+        return self._bindings
+
+    @property
+    def automation(self) -> ParameterAutomation:
+        return self._automation
+
+    @property
+    def scheduler(self) -> typing.Optional[ParameterScheduler]:
+        return self._scheduler
+
+    @scheduler.setter
+    def scheduler(self, new_scheduler: typing.Optional[ParameterScheduler]):
+        self._scheduler = new_scheduler
+
+    @property
+    def ramp_times_ns(self) -> typing.Mapping[str, int]:
+        return self._ramp_times_ns
+
+    def set_ramp_time_ns(self, key: str, ramp_time_ns: int):
+        if key not in self.RAMP_TIMES_NS:
+            raise KeyError(f"{self.__class__.__name__} has no automated parameter {key}")
+        self._ramp_times_ns[key] = int(ramp_time_ns)
+        self._automation.set_ramp_time_ns(key, ramp_time_ns)
+
     @property
     @abstractmethod
     def sink(self) -> list[str]:
@@ -26,44 +115,101 @@ class GstElement(ABC):
     def src(self) -> list[str]:
         ...
 
-    @property
     @abstractmethod
-    def pipeline_description(self) -> str:
+    def build(self, builder: GraphBuilder):
         ...
 
-    @abstractmethod
+    def _queue(self, builder: GraphBuilder, name: str) -> str:
+        return builder.element("queue", name, **self._profile.queue_properties)
+
+    def _edge_queue(self, builder: GraphBuilder, name: str, upstream: typing.Optional[str] = None) -> str:
+        # a queue (and with it a streaming thread) is only needed where the stream enters another thread domain
+        source = self._upstream.get(name)
+        if source in (None, self) and upstream is not None:
+            source = self._upstream.get(upstream)
+        same_domain = source not in (None, self) and source.thread_domain == self._thread_domain
+        if self._thread_domain is not None and same_domain:
+            return builder.element("identity", name)
+        return self._queue(builder, name)
+
+    def _caps(self, mode: 'AudioMode') -> str:
+        return mode.caps(self._sample_format.format_info)
+
+    def _mixer(self, builder: GraphBuilder, name: str) -> str:
+        return builder.element("audiomixer", name, **self._profile.mixer_properties)
+
+    @property
+    def pipeline_description(self) -> str:
+        builder = DescriptionBuilder()
+        self.build(builder)
+        return builder.description
+
     def attach_pipeline(self, pipeline: Gst.Pipeline):
-        ...
+        if self._pipeline is not None:
+            raise RuntimeError("Multiple invocation of attach_pipeline not supported")
+        self._bindings = ParameterBindings.resolve(pipeline, self.parameter_targets)
+        self._automation = ParameterAutomation(self._bindings, self._ramp_times_ns)
+        self._pipeline = pipeline
+
+    @contextlib.contextmanager
+    def scheduled_at(self, at_ns: int, ramp_time_ns: typing.Optional[int] = None):
+        # parameter changes made inside take effect at the given stream time instead of now
+        previous = self._scheduled_at_ns, self._scheduled_ramp_time_ns
+        self._scheduled_at_ns, self._scheduled_ramp_time_ns = int(at_ns), ramp_time_ns
+        try:
+            yield self
+        finally:
+            self._scheduled_at_ns, self._scheduled_ramp_time_ns = previous
+
+    def _apply_parameter(self, key: str, value):
+        if self._scheduled_at_ns is not None:
+            self._automation.schedule(key, value, self._scheduled_at_ns, ramp_time_ns=self._scheduled_ramp_time_ns)
+            return
+
+        if self._scheduler is None:
+            self._automation.set(key, value)
+            return
+
+        binding = self._bindings.get(key)
+        if binding is not None:
+            self._scheduler.schedule(
+                (binding.element, binding.property_name),
+                functools.partial(self._automation.set, key, value),
+            )
 
 
 @enum.unique
 class AudioMode(enum.Enum):
-    UNKNOWN = (1, [GstAudio.AudioChannelPosition.NONE])
-    MONO = (1, [GstAudio.AudioChannelPosition.MONO])
-    STEREO = (2, [GstAudio.AudioChannelPosition.FRONT_LEFT, GstAudio.AudioChannelPosition.FRONT_RIGHT])
-    LEFT_ONLY = (1, [GstAudio.AudioChannelPosition.FRONT_LEFT])
-    RIGHT_ONLY = (1, [GstAudio.AudioChannelPosition.FRONT_RIGHT])
+    UNKNOWN = (1, ("NONE",))
+    MONO = (1, ("MONO",))
+    STEREO = (2, ("FRONT_LEFT", "FRONT_RIGHT"))
+    LEFT_ONLY = (1, ("FRONT_LEFT",))
+    RIGHT_ONLY = (1, ("FRONT_RIGHT",))
 
     def __init__(self, channels, channel_positions):
         self._channels = int(channels)
-        valid, mask = GstAudio.audio_channel_positions_to_mask(channel_positions, True)
-        if not valid:
-            raise AssertionError("Couldn't convert to channel mask")
-        self._channel_mask = f"{mask:x}"
+        self._channel_positions = tuple(channel_positions)
 
     @property
     def channels(self) -> int:
         return self._channels
 
-    @property
+    @functools.cached_property
     def channel_mask(self) -> str:
-        return self._channel_mask
+        positions = [getattr(GstAudio.AudioChannelPosition, position) for position in self._channel_positions]
+        valid, mask = GstAudio.audio_channel_positions_to_mask(positions, True)
+        if not valid:
+            raise AssertionError("Couldn't convert to channel mask")
+        return f"{mask:x}"
 
     def caps(self, format_info="audio/x-raw"):
         return f"{format_info},channels={self.channels},channel-mask=(bitmask)0x{self.channel_mask}"
 
 
 class Stereo2Mono(GstElement):
+    RAMP_TIMES_NS = {"level": 20 * 1000 * 1000}
+    SCENE_PARAMETERS = ("level_db",)
+
     def __init__(self, name: str, *, level_db: float = None, level_amplitude: float = None):
         super().__init__(name)
 
@@ -79,9 +225,6 @@ class Stereo2Mono(GstElement):
         else:
             self._level_db = 0
 
-        self._pipeline: typing.Optional[Gst.Pipeline] = None
-        self._volume_element: typing.Optional[Gst.Element] = None
-
     @property
     def sink(self) -> list[str]:
         return [self._sink]
@@ -90,6 +233,10 @@ class Stereo2Mono(GstElement):
     def src(self) -> list[str]:
         return [self._src]
 
+    @property
+    def parameter_targets(self) -> dict[str, tuple[str, str]]:
+        return {"level": (f"stereo2mono-volume-{self.name}", "volume")}
+
     @property
     def level_db(self) -> float:
         return self._level_db
@@ -98,8 +245,7 @@ class Stereo2Mono(GstElement):
     def level_db(self, new_level_db: float):
         new_level_db = float(new_level_db)
         self._level_db = new_level_db
-        if self._volume_element:
-            self._volume_element.set_property("volume", db_to_amplitude(new_level_db))
+        self._apply_parameter("level", db_to_amplitude(new_level_db))
 
     @property
     def level_amplitude(self) -> float:
@@ -109,40 +255,25 @@ class Stereo2Mono(GstElement):
     def level_amplitude(self, new_level_amplitude: float):
         self.level_db = amplitude_to_db(new_level_amplitude)
 
-    @property
-    def pipeline_description(self) -> str:
-        return f"""
-        bin.(
-            name=bin-stereo2mono-{self.name}
-            queue
-                name=stereo2mono-sink-{self.name}
-                max-size-time={self.QUEUE_TIME_NS}
-            ! capsfilter
-                name=stereo2mono-caps-in
-                caps={AudioMode.STEREO.caps()}
-            ! deinterleave
-                name=stereo2mono-split-{self.name}
-
-            stereo2mono-split-{self.name}.src_0,src_1
-            ! stereo2mono-mix-{self.name}.sink_0,sink_1
-
-            audiomixer
-                name=stereo2mono-mix-{self.name}
-            ! volume
-                name=stereo2mono-volume-{self.name}
-                volume={db_to_amplitude(self._level_db)}
-            ! capsfilter
-                name=stereo2mono-caps-out
-                caps={AudioMode.MONO.caps()}
-            ! tee
-                name=stereo2mono-src-{self.name}
-        )
-        """
+    def build(self, builder: GraphBuilder):
+        with builder.bin(f"bin-stereo2mono-{self.name}"):
+            split = builder.element("deinterleave", f"stereo2mono-split-{self.name}")
+            mix = self._mixer(builder, f"stereo2mono-mix-{self.name}")
 
-    def attach_pipeline(self, pipeline: Gst.Pipeline):
-        if self._pipeline is not None:
-            self._pipeline = pipeline
-            if pipeline is not None:
-                self._volume_element = pipeline.get_by_name(f"stereo2mono-volume-{self.name}")
-        else:
-            raise RuntimeError("Multiple invocation of attach_pipeline not supported")
+            builder.chain(
+                self._edge_queue(builder, self._sink),
+                builder.element("capsfilter", f"stereo2mono-caps_in-{self.name}", caps=self._caps(AudioMode.STEREO)),
+                split,
+            )
+            builder.link(split, mix, "src_0", "sink_0")
+            builder.link(split, mix, "src_1", "sink_1")
+            builder.chain(
+                mix,
+                builder.element(
+                    "volume",
+                    f"stereo2mono-volume-{self.name}",
+                    volume=db_to_amplitude(self._level_db),
+                ),
+                builder.element("capsfilter", f"stereo2mono-caps_out-{self.name}", caps=self._caps(AudioMode.MONO)),
+                builder.element("tee", self._src),
+            )
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import typing
+
+from digimix.audio import GObject, Gst
+
+
+class PropertyBinding:
+    def __init__(self, element: Gst.Element, property_name: str):
+        pspec = element.find_property(property_name)
+        if pspec is None:
+            raise RuntimeError(f"{element.get_name()} has no property {property_name}")
+
+        self._element = element
+        self._property_name = pspec.name
+        self._value_type: GObject.GType = pspec.value_type
+        self._set_property = element.set_property
+        self._get_property = element.get_property
+
+    @property
+    def element(self) -> Gst.Element:
+        return self._element
+
+    @property
+    def property_name(self) -> str:
+        return self._property_name
+
+    @property
+    def value_type(self) -> GObject.GType:
+        return self._value_type
+
+    def set(self, value):
+        self._set_property(self._property_name, value)
+
+    def get(self):
+        return self._get_property(self._property_name)
+
+    def set_at(self, value, pts_ns: int):
+        # applied in the streaming thread with the first buffer at or after pts_ns
+        def probe(_, info: Gst.PadProbeInfo) -> Gst.PadProbeReturn:
+            pts = info.get_buffer().pts
+            if pts == Gst.CLOCK_TIME_NONE or pts < pts_ns:
+                return Gst.PadProbeReturn.OK
+            self.set(value)
+            return Gst.PadProbeReturn.REMOVE
+
+        pad = self._element.get_static_pad("sink")
+        if pad is None:
+            raise RuntimeError(f"{self._element.get_name()} has no sink pad to schedule {self._property_name} on")
+        pad.add_probe(Gst.PadProbeType.BUFFER, probe)
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} ' \
+               f'element={self._element.get_name()} ' \
+               f'property={self._property_name} ' \
+               f'type={self._value_type.name}>'
+
+
+class ParameterBindings(typing.Mapping[str, PropertyBinding]):
+    def __init__(self, bindings: typing.Optional[typing.Mapping[str, PropertyBinding]] = None):
+        self._bindings: dict[str, PropertyBinding] = dict(bindings or {})
+
+    @classmethod
+    def resolve(cls, pipeline: Gst.Bin, targets: typing.Mapping[str, tuple[str, str]]) -> 'ParameterBindings':
+        elements: dict[str, Gst.Element] = {}
+        bindings = {}
+        for key, (element_name, property_name) in targets.items():
+            element = elements.get(element_name)
+            if element is None:
+                element = pipeline.get_by_name(element_name)
+                if element is None:
+                    raise RuntimeError(f"Couldn't find element {element_name} for parameter {key}")
+                elements[element_name] = element
+            bindings[key] = PropertyBinding(element, property_name)
+        return cls(bindings)
+
+    def __getitem__(self, key: str) -> PropertyBinding:
+        return self._bindings[key]
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self._bindings)
+
+    def __len__(self) -> int:
+        return len(self._bindings)
+
+    def set(self, key: str, value):
+        binding = self._bindings.get(key)
+        if binding is not None:
+            binding.set(value)
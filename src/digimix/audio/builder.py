@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import enum
+import typing
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+from digimix.audio import Gst
+
+
+class PadRef(typing.NamedTuple):
+    element: str
+    pad: typing.Optional[str] = None
+
+
+ChainItem = typing.Union[str, PadRef]
+
+
+class Serialized(str):
+    pass
+
+
+def value_array(rows: typing.Sequence[typing.Sequence[float]], value_type: str = 'double') -> Serialized:
+    return Serialized('<' + ', '.join(
+        '<' + ', '.join(f"({value_type}){value}" for value in row) + '>'
+        for row in rows
+    ) + '>')
+
+
+def _as_pad_ref(item: ChainItem) -> PadRef:
+    if isinstance(item, PadRef):
+        return item
+    return PadRef(str(item))
+
+
+def _property_name(key: str) -> str:
+    # a trailing underscore escapes python keywords, e.g. async_
+    return key.rstrip('_').replace('_', '-')
+
+
+# Elements are addressed by their pipeline wide unique name, so links may reference elements of other wrappers
+class GraphBuilder(ABC):
+    @abstractmethod
+    def element(self, factory: str, name: str, **properties) -> str:
+        ...
+
+    @abstractmethod
+    def chain(self, *items: ChainItem):
+        ...
+
+    @abstractmethod
+    @contextmanager
+    def bin(self, name: str):
+        ...
+
+    def link(self, src: str, sink: str, src_pad: typing.Optional[str] = None, sink_pad: typing.Optional[str] = None):
+        self.chain(PadRef(src, src_pad), PadRef(sink, sink_pad))
+
+
+class DescriptionBuilder(GraphBuilder):
+    INDENT = ' ' * 4
+
+    class _Scope:
+        def __init__(self, parent: typing.Optional['DescriptionBuilder._Scope'], depth: int):
+            self.parent = parent
+            self.depth = depth
+            self.lines: list[str] = []
+            self.pending: dict[str, tuple[str, dict]] = {}
+
+    def __init__(self):
+        self._root = self._Scope(None, 0)
+        self._scope = self._root
+
+    @staticmethod
+    def _format_value(value) -> str:
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        if isinstance(value, Serialized):
+            return f'"{value}"'
+        if isinstance(value, enum.Enum):
+            return str(value.value)
+        return str(value)
+
+    def _declaration(self, scope: _Scope, name: str) -> list[str]:
+        factory, properties = scope.pending.pop(name)
+        lines = [factory, f"{self.INDENT}name={name}"]
+        lines += [f"{self.INDENT}{key}={self._format_value(value)}" for key, value in properties.items()]
+        return lines
+
+    def _pending_scope(self, name: str) -> typing.Optional[_Scope]:
+        scope = self._scope
+        while scope is not None:
+            if name in scope.pending:
+                return scope
+            scope = scope.parent
+        return None
+
+    def _emit(self, scope: _Scope, lines: list[str]):
+        indent = self.INDENT * scope.depth
+        scope.lines += [indent + line if line else line for line in lines]
+
+    def element(self, factory: str, name: str, **properties) -> str:
+        self._scope.pending[name] = (factory, {_property_name(key): value for key, value in properties.items()})
+        return name
+
+    def chain(self, *items: ChainItem):
+        refs = [_as_pad_ref(item) for item in items]
+
+        # elements only referenced via a pad have to be declared standalone beforehand
+        for ref in refs:
+            if ref.pad is not None:
+                scope = self._pending_scope(ref.element)
+                if scope is not None:
+                    self._emit(scope, self._declaration(scope, ref.element))
+
+        statement: list[str] = []
+        for i, ref in enumerate(refs):
+            scope = self._pending_scope(ref.element) if ref.pad is None else None
+            if scope is not None:
+                part = self._declaration(scope, ref.element)
+            else:
+                part = [f"{ref.element}.{ref.pad or ''}"]
+
+            if statement:
+                part[0] = '! ' + part[0]
+            statement += part
+
+            # a reference is only valid at the start or end of a statement, so split the chain at it
+            if scope is None and 0 < i < len(refs) - 1:
+                self._emit(self._scope, statement + [''])
+                statement = [f"{ref.element}.{ref.pad or ''}"]
+
+        self._emit(self._scope, statement + [''])
+
+    @contextmanager
+    def bin(self, name: str):
+        parent = self._scope
+        self._scope = self._Scope(parent, parent.depth + 1)
+        try:
+            yield name
+            for pending in list(self._scope.pending):
+                self._emit(self._scope, self._declaration(self._scope, pending))
+        finally:
+            scope, self._scope = self._scope, parent
+        self._emit(parent, ['bin.(', f"{self.INDENT}name={name}"])
+        parent.lines += scope.lines
+        self._emit(parent, [')', ''])
+
+    @property
+    def description(self) -> str:
+        for pending in list(self._root.pending):
+            self._emit(self._root, self._declaration(self._root, pending))
+        return '\n'.join(self._root.lines) + '\n'
+
+
+class ObjectBuilder(GraphBuilder):
+    def __init__(self, root: Gst.Bin):
+        self._root = root
+        self._bins: list[Gst.Bin] = [root]
+        self._elements: dict[str, Gst.Element] = {}
+        self._links: list[tuple[PadRef, PadRef]] = []
+
+    @property
+    def elements(self) -> typing.Mapping[str, Gst.Element]:
+        return self._elements
+
+    def element(self, factory: str, name: str, **properties) -> str:
+        element = Gst.ElementFactory.make(factory, name)
+        if element is None:
+            raise RuntimeError(f"Couldn't create element {name} of type {factory}")
+        for key, value in properties.items():
+            if isinstance(value, Serialized):
+                Gst.util_set_object_arg(element, _property_name(key), value)
+                continue
+            if key == 'caps' and isinstance(value, str):
+                value = Gst.Caps.from_string(value)
+            elif isinstance(value, enum.Enum):
+                value = value.value
+            element.set_property(_property_name(key), value)
+        self._add(name, element)
+        return name
+
+    def _add(self, name: str, element: Gst.Element):
+        if name in self._elements:
+            raise RuntimeError(f"Element named {name} already exists")
+        if not self._bins[-1].add(element):
+            raise RuntimeError(f"Couldn't add {name} to {self._bins[-1].get_name()}")
+        self._elements[name] = element
+
+    def chain(self, *items: ChainItem):
+        refs = [_as_pad_ref(item) for item in items]
+        self._links += zip(refs, refs[1:])
+
+    @contextmanager
+    def bin(self, name: str):
+        gst_bin = Gst.Bin.new(name)
+        self._add(name, gst_bin)
+        self._bins.append(gst_bin)
+        try:
+            yield name
+        finally:
+            self._bins.pop()
+
+    def _lookup(self, name: str) -> Gst.Element:
+        element = self._elements.get(name)
+        if element is None:
+            element = self._root.get_by_name(name)
+        if element is None:
+            raise RuntimeError(f"Couldn't find element {name}")
+        return element
+
+    @staticmethod
+    def _is_sometimes_pad(element: Gst.Element, pad_name: str) -> bool:
+        if element.get_static_pad(pad_name) is not None:
+            return False
+        return any(
+            template.direction == Gst.PadDirection.SRC and template.presence == Gst.PadPresence.SOMETIMES
+            for template in element.get_factory().get_static_pad_templates()
+        )
+
+    @staticmethod
+    def _link_delayed(src: Gst.Element, src_pad: str, sink: Gst.Element, sink_pad: typing.Optional[str]):
+        def on_pad_added(element: Gst.Element, pad: Gst.Pad):
+            if pad.get_name() == src_pad:
+                if not element.link_pads(src_pad, sink, sink_pad):
+                    raise RuntimeError(f"Couldn't link {element.get_name()}.{src_pad} to {sink.get_name()}")
+
+        src.connect('pad-added', on_pad_added)
+
+    def finish(self):
+        links, self._links = self._links, []
+        for src_ref, sink_ref in links:
+            src = self._lookup(src_ref.element)
+            sink = self._lookup(sink_ref.element)
+            if src_ref.pad is not None and self._is_sometimes_pad(src, src_ref.pad):
+                self._link_delayed(src, src_ref.pad, sink, sink_ref.pad)
+            elif not src.link_pads(src_ref.pad, sink, sink_ref.pad):
+                raise RuntimeError(f"Couldn't link {src_ref} to {sink_ref}")
+
+
+class ElementModel(typing.NamedTuple):
+    factory: str
+    name: str
+    properties: dict
+    bins: tuple[str, ...]
+
+
+class GraphModel(GraphBuilder):
+    def __init__(self):
+        self._bins: list[str] = []
+        self._elements: dict[str, ElementModel] = {}
+        self._links: list[tuple[PadRef, PadRef]] = []
+
+    @property
+    def elements(self) -> typing.Mapping[str, ElementModel]:
+        return self._elements
+
+    @property
+    def links(self) -> list[tuple[PadRef, PadRef]]:
+        return self._links
+
+    def element(self, factory: str, name: str, **properties) -> str:
+        self._elements[name] = ElementModel(
+            factory,
+            name,
+            {_property_name(key): value for key, value in properties.items()},
+            tuple(self._bins),
+        )
+        return name
+
+    def chain(self, *items: ChainItem):
+        refs = [_as_pad_ref(item) for item in items]
+        self._links += zip(refs, refs[1:])
+
+    @contextmanager
+    def bin(self, name: str):
+        self._bins.append(name)
+        try:
+            yield name
+        finally:
+            self._bins.pop()
+
+    def downstream(self) -> dict[str, list[str]]:
+        graph = {name: [] for name in self._elements}
+        for src, sink in self._links:
+            graph.setdefault(src.element, []).append(sink.element)
+        return graph
@@ -1,11 +1,50 @@
-from digimix.audio import Gst
-from digimix.audio.base import GstElement
+from digimix.audio.base import AudioMode, GstElement
+from digimix.audio.builder import GraphBuilder
+from digimix.audio.utils import amplitude_to_db, db_to_amplitude
 
 
 class MasterBus(GstElement):
-    def __init__(self, name: str, inputs: list[str]):
+    RAMP_TIMES_NS = {"fader": 20 * 1000 * 1000}
+    SCENE_PARAMETERS = ("fader_db", "mute")
+
+    def __init__(self, name: str, inputs: list[str], fader_db: float = 0., mute: bool = False):
         super().__init__(name)
         self._inputs = list(inputs)
+        self._fader_db = float(fader_db)
+        self._mute = bool(mute)
+
+    @property
+    def parameter_targets(self) -> dict[str, tuple[str, str]]:
+        return {
+            "fader": (f"master-bus-fader-{self.name}", "volume"),
+            "mute": (f"master-bus-fader-{self.name}", "mute"),
+        }
+
+    @property
+    def fader_db(self) -> float:
+        return self._fader_db
+
+    @fader_db.setter
+    def fader_db(self, new_fader_db: float):
+        self._fader_db = float(new_fader_db)
+        self._apply_parameter("fader", self.fader_amplitude)
+
+    @property
+    def fader_amplitude(self) -> float:
+        return db_to_amplitude(self._fader_db)
+
+    @fader_amplitude.setter
+    def fader_amplitude(self, new_fader_amplitude: float):
+        self.fader_db = amplitude_to_db(new_fader_amplitude)
+
+    @property
+    def mute(self) -> bool:
+        return self._mute
+
+    @mute.setter
+    def mute(self, new_mute: bool):
+        self._mute = bool(new_mute)
+        self._apply_parameter("mute", self._mute)
 
     @property
     def src(self) -> list[str]:
@@ -15,33 +54,26 @@ class MasterBus(GstElement):
     def sink(self) -> list[str]:
         return []
 
-    def attach_pipeline(self, pipeline: Gst.Pipeline):
-        pass
+    def build(self, builder: GraphBuilder):
+        with builder.bin(f"bin-master-bus-{self.name}"):
+            mixer = self._mixer(builder, f"master-bus-mixer-{self.name}")
+            builder.chain(
+                mixer,
+                builder.element("capsfilter", f"master-bus-caps-{self.name}", caps=self._caps(AudioMode.STEREO)),
+                self._queue(builder, f"queue-master-bus-mixer-{self.name}"),
+                builder.element(
+                    "volume",
+                    f"master-bus-fader-{self.name}",
+                    volume=self.fader_amplitude,
+                    mute=self._mute,
+                ),
+                builder.element("level", f"master-bus-level-{self.name}"),
+                builder.element("tee", f"master-src-{self.name}"),
+            )
 
-    @property
-    def pipeline_description(self) -> str:
-        desc = f"""
-        bin.(
-            name=bin-master-bus-{self.name}
-            audiomixer
-                name=master-bus-mixer-{self.name}
-            ! queue
-                name=queue-master-bus-mixer-{self.name}
-                max-size-time={self.QUEUE_TIME_NS}
-            ! tee
-                name=master-src-{self.name}
-        """
-
-        for input_name in self._inputs:
-            desc += f"""
-            {input_name}.
-            ! queue
-                name=queue-master-bux-mixer-{self.name}-{input_name}
-                max-size-time={self.QUEUE_TIME_NS}
-            ! master-bus-mixer-{self.name}.
-            """
-
-        desc += """
-        )
-        """
-        return desc
+            for input_name in self._inputs:
+                builder.chain(
+                    input_name,
+                    self._edge_queue(builder, f"queue-master-bux-mixer-{self.name}-{input_name}", input_name),
+                    mixer,
+                )
@@ -1,8 +1,13 @@
+from __future__ import annotations
+
 import enum
+import threading
 import typing
 
 from digimix.audio import Gst
-from digimix.audio.base import GstElement
+from digimix.audio.base import AudioMode, GstElement
+from digimix.audio.builder import GraphBuilder, ObjectBuilder
+from digimix.audio.stages import Stage
 from digimix.audio.utils import amplitude_to_db, db_to_amplitude
 
 
@@ -13,6 +18,13 @@ class AudioPanoramaMethods(enum.IntEnum):
 
 
 class FaderChannel(GstElement):
+    RAMP_TIMES_NS = {
+        "gain": 20 * 1000 * 1000,
+        "fader": 20 * 1000 * 1000,
+        "pan": 20 * 1000 * 1000,
+    }
+    SCENE_PARAMETERS = ("gain_db", "fader_db", "pan", "pan_method", "cut")
+
     def __init__(
         self,
         name: str,
@@ -20,11 +32,17 @@ class FaderChannel(GstElement):
         phase_invert: bool = False,
         pan: float = 0,
         pan_method: AudioPanoramaMethods = AudioPanoramaMethods.PSYCHOACOUSTIC,
+        stages: typing.Sequence[Stage] = (),
     ):
         super().__init__(name)
 
-        self._pipeline: typing.Optional[Gst.Pipeline] = None
-        self._fader: typing.Optional[Gst.Element] = None
+        self._stages: dict[str, Stage] = {}
+        for stage in stages:
+            if stage.kind in self._stages:
+                raise ValueError(f"{self.__class__.__name__} {name} has multiple {stage.kind} stages")
+            self._stages[stage.kind] = stage
+        self._stage_lock = threading.Lock()
+        self._relink_pending = False
 
         self._phase_invert = bool(phase_invert)
         self._gain_db = float(gain_db)
@@ -38,6 +56,16 @@ class FaderChannel(GstElement):
         self._fader_db: float = 0.
         self._cut: bool = False
 
+    @property
+    def parameter_targets(self) -> dict[str, tuple[str, str]]:
+        return {
+            "gain": (f"fader_channel-gain-{self.name}", "amplification"),
+            "fader": (f"fader_channel-fader-{self.name}", "volume"),
+            "cut": (f"fader_channel-fader-{self.name}", "mute"),
+            "pan": (f"fader_channel-pan-{self.name}", "panorama"),
+            "pan_method": (f"fader_channel-pan-{self.name}", "method"),
+        }
+
     @property
     def gain_db(self) -> float:
         return self._gain_db
@@ -46,9 +74,7 @@ class FaderChannel(GstElement):
     def gain_db(self, new_gain_db: float):
         new_gain_db = float(new_gain_db)
         self._gain_db = new_gain_db
-        if self._pipeline is not None:
-            gain = self._pipeline.get_by_name(f"fader_channel-gain-{self.name}")  # type: Gst.Element
-            gain.set_property("amplification", self.gain_amplitude)
+        self._apply_parameter("gain", self.gain_amplitude)
 
     @property
     def gain_amplitude(self) -> float:
@@ -67,9 +93,7 @@ class FaderChannel(GstElement):
         if not -1.0 <= new_pan <= 1.0:
             raise ValueError(f"pan must be between [-1, 1]. Given {new_pan}")
         self._pan = new_pan
-        if self._pipeline is not None:
-            panorama = self._pipeline.get_by_name(f"fader_channel-pan-{self.name}")  # type: Gst.Element
-            panorama.set_property("panorama", self._pan)
+        self._apply_parameter("pan", self._pan)
 
     @property
     def pan_method(self) -> AudioPanoramaMethods:
@@ -80,9 +104,7 @@ class FaderChannel(GstElement):
         if new_pan_method not in AudioPanoramaMethods:
             raise ValueError(f"Given pan_method is not a supported AudioPanoramaMethods: {new_pan_method}")
         self._pan_method = new_pan_method
-        if self._pipeline is not None:
-            panorama = self._pipeline.get_by_name(f"fader_channel-pan-{self.name}")  # type: Gst.Element
-            panorama.set_property("method", int(self._pan_method))
+        self._apply_parameter("pan_method", int(self._pan_method))
 
     @property
     def fader_db(self) -> float:
@@ -91,8 +113,7 @@ class FaderChannel(GstElement):
     @fader_db.setter
     def fader_db(self, new_fader_db: float):
         self._fader_db = float(new_fader_db)
-        if self._fader is not None:
-            self._fader.set_property("volume", self.fader_amplitude)
+        self._apply_parameter("fader", self.fader_amplitude)
 
     @property
     def fader_amplitude(self) -> float:
@@ -108,50 +129,43 @@ class FaderChannel(GstElement):
 
     @cut.setter
     def cut(self, new_cut: bool):
-        new_cut = bool(new_cut)
-        self._fader.set_property("mute", new_cut)
-
-    @property
-    def pipeline_description(self) -> str:
-        desc = f"""
-        bin.(
-            name=bin-fader_channel-{self.name}
-            queue
-                name=fader_channel-sink-{self.name}
-            ! audioamplify
-                name=fader_channel-gain-{self.name}
-                amplification={self.gain_amplitude}"""
-
-        if self._phase_invert:
-            desc += f"""
-            ! audioinvert
-                name=fader_channel-phase_invert-{self.name}"""
-
-        desc += f"""
-            ! tee
-                name=fader_channel-pre_fader-{self.name}
-            ! level
-                name=fader_channel-level-{self.name}
-            ! volume
-                name=fader_channel-fader-{self.name}
-            ! tee
-                name=fader_channel-post_fader-{self.name}
-            ! audiopanorama
-                name=fader_channel-pan-{self.name}
-                panorama={self._pan}
-                method={self._pan_method}
-            ! capsfilter
-                name=fader_channel-pan_caps-{self.name}
-                caps=audio/x-raw,channels=2,channel-mask=(bitmask)0x3
-            ! tee
-                name=fader_channel-src-{self.name}
-        )"""
-
-        return desc
-
-    def attach_pipeline(self, pipeline: Gst.Pipeline):
-        self._pipeline = pipeline
-        self._fader = pipeline.get_by_name(f"fader_channel-fader-{self.name}")
+        self._cut = bool(new_cut)
+        self._apply_parameter("cut", self._cut)
+
+    def build(self, builder: GraphBuilder):
+        with builder.bin(f"bin-fader_channel-{self.name}"):
+            elements = [
+                self._edge_queue(builder, f"fader_channel-sink-{self.name}"),
+                builder.element("audioamplify", f"fader_channel-gain-{self.name}", amplification=self.gain_amplitude),
+            ]
+            if self._phase_invert:
+                elements.append(builder.element("audioinvert", f"fader_channel-phase_invert-{self.name}"))
+            # bypassed stages are left out of the graph instead of running at unity
+            elements += [stage.build(builder, self.name) for stage in self._stages.values() if not stage.bypass]
+            elements += [
+                builder.element("tee", f"fader_channel-pre_fader-{self.name}"),
+                builder.element("level", f"fader_channel-level-{self.name}"),
+                builder.element(
+                    "volume",
+                    f"fader_channel-fader-{self.name}",
+                    volume=self.fader_amplitude,
+                    mute=self._cut,
+                ),
+                builder.element("tee", f"fader_channel-post_fader-{self.name}"),
+                builder.element(
+                    "audiopanorama",
+                    f"fader_channel-pan-{self.name}",
+                    panorama=self._pan,
+                    method=self._pan_method,
+                ),
+                builder.element(
+                    "capsfilter",
+                    f"fader_channel-pan_caps-{self.name}",
+                    caps=self._caps(AudioMode.STEREO),
+                ),
+                builder.element("tee", f"fader_channel-src-{self.name}"),
+            ]
+            builder.chain(*elements)
 
     @property
     def sink(self) -> list[str]:
@@ -164,3 +178,80 @@ class FaderChannel(GstElement):
     @property
     def phase_invert(self) -> bool:
         return self._phase_invert
+
+    @property
+    def stages(self) -> typing.Mapping[str, Stage]:
+        return self._stages
+
+    def attach_pipeline(self, pipeline: Gst.Pipeline):
+        super().attach_pipeline(pipeline)
+        for stage in self._stages.values():
+            if not stage.bypass:
+                stage.configure(self._get_element(stage.element_name(self.name)))
+
+    def _get_element(self, name: str) -> Gst.Element:
+        element = self._pipeline.get_by_name(name)
+        if element is None:
+            raise RuntimeError(f"Couldn't find element {name}")
+        return element
+
+    def _head_name(self) -> str:
+        return f"fader_channel-{'phase_invert' if self._phase_invert else 'gain'}-{self.name}"
+
+    def set_bypass(self, kind: str, bypass: bool):
+        stage = self._stages[kind]
+        bypass = bool(bypass)
+        with self._stage_lock:
+            if stage.bypass == bypass:
+                return
+            stage.bypass = bypass
+            if self._pipeline is None or self._relink_pending:
+                # a pending relink picks up the new state
+                return
+            self._relink_pending = True
+
+        # relinked once the head pad is idle, i.e. between two buffers; the stages are synchronous
+        # transforms running in the same streaming thread, so no data is left inside a removed stage
+        src_pad = self._get_element(self._head_name()).get_static_pad("src")
+        src_pad.add_probe(Gst.PadProbeType.IDLE, self._relink_stages)
+
+    def _relink_stages(self, head_pad: Gst.Pad, _) -> Gst.PadProbeReturn:
+        channel_bin = self._get_element(f"bin-fader_channel-{self.name}")
+        with self._stage_lock:
+            # neighbours come from the live bin, set_bypass may have been called any number of times since the probe
+            upstream = self._get_element(self._head_name())
+            stages = list(self._stages.values())
+            for position, stage in enumerate(stages):
+                name = stage.element_name(self.name)
+                element = channel_bin.get_by_name(name)
+                if (element is None) != stage.bypass:
+                    src_pad = upstream.get_static_pad("src")
+                    sink_pad = self._live_downstream(channel_bin, stages[position + 1:])
+                    if stage.bypass:
+                        src_pad.unlink(element.get_static_pad("sink"))
+                        element.get_static_pad("src").unlink(sink_pad)
+                        element.set_state(Gst.State.NULL)
+                        channel_bin.remove(element)
+                        src_pad.link(sink_pad)
+                        element = None
+                    else:
+                        builder = ObjectBuilder(channel_bin)
+                        stage.build(builder, self.name)
+                        element = builder.elements[name]
+                        stage.configure(element)
+                        src_pad.unlink(sink_pad)
+                        src_pad.link(element.get_static_pad("sink"))
+                        element.get_static_pad("src").link(sink_pad)
+                        element.sync_state_with_parent()
+                if element is not None:
+                    upstream = element
+            self._relink_pending = False
+        return Gst.PadProbeReturn.REMOVE
+
+    def _live_downstream(self, channel_bin: Gst.Bin, stages: list[Stage]) -> Gst.Pad:
+        # stages after the one being relinked still have their old state
+        for stage in stages:
+            element = channel_bin.get_by_name(stage.element_name(self.name))
+            if element is not None:
+                return element.get_static_pad("sink")
+        return self._get_element(f"fader_channel-pre_fader-{self.name}").get_static_pad("sink")
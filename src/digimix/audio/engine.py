@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import threading
+import typing
+
+import numpy as np
+
+from digimix.audio import Gst
+from digimix.audio.base import AudioMode, GstElement
+from digimix.audio.builder import GraphBuilder, Serialized
+from digimix.audio.channels import AudioPanoramaMethods, FaderChannel
+
+MS_NS = 1000 * 1000
+# the engine mixes floats, the vector elements only accept the float sample formats
+FLOAT_DTYPES = {"F32LE": np.dtype("<f4"), "F64LE": np.dtype("<f8")}
+
+
+def sample_dtype(format_name: str) -> np.dtype:
+    if format_name not in FLOAT_DTYPES:
+        raise ValueError(f"The vector engine needs one of the {tuple(FLOAT_DTYPES)} formats. Given {format_name}")
+    return FLOAT_DTYPES[format_name]
+
+
+class ChannelStripEngine:
+    PARAMETERS = ("gain", "phase_invert", "fader", "cut", "pan", "pan_method")
+
+    def __init__(self):
+        self._channels = np.zeros(0, dtype=np.int8)
+        self._gain = np.zeros(0)
+        self._phase_invert = np.zeros(0, dtype=bool)
+        self._fader = np.zeros(0)
+        self._cut = np.zeros(0, dtype=bool)
+        self._pan = np.zeros(0)
+        self._pan_method = np.zeros(0, dtype=np.int8)
+
+        # coefficients of the last processed block, [strip, out channel, in channel]
+        self._current = np.zeros((0, 2, 2), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    @property
+    def channels(self) -> np.ndarray:
+        return self._channels
+
+    def add_strip(self, channels: int, **parameters) -> int:
+        if channels not in (1, 2):
+            raise ValueError(f"Channel strips support mono or stereo input. Given {channels} channels")
+
+        self._channels = np.append(self._channels, channels).astype(np.int8)
+        self._gain = np.append(self._gain, 1.)
+        self._phase_invert = np.append(self._phase_invert, False)
+        self._fader = np.append(self._fader, 1.)
+        self._cut = np.append(self._cut, False)
+        self._pan = np.append(self._pan, 0.)
+        self._pan_method = np.append(self._pan_method, int(AudioPanoramaMethods.PSYCHOACOUSTIC)).astype(np.int8)
+
+        index = len(self._channels) - 1
+        for key, value in parameters.items():
+            self.set(index, key, value)
+        self._current = self.coefficients()
+        return index
+
+    def set(self, index: int, key: str, value):
+        if key not in self.PARAMETERS:
+            raise KeyError(f"{self.__class__.__name__} has no parameter {key}")
+        getattr(self, f"_{key}")[index] = value
+
+    def coefficients(self) -> np.ndarray:
+        scale = self._gain * self._fader * np.where(self._phase_invert, -1., 1.) * ~self._cut
+
+        positive = np.clip(self._pan, 0., 1.)
+        negative = np.clip(-self._pan, 0., 1.)
+        mono = self._channels == 1
+        psychoacoustic = self._pan_method == AudioPanoramaMethods.PSYCHOACOUSTIC
+
+        # same pan laws as audiopanorama
+        coefficients = np.zeros((len(self._channels), 2, 2))
+        coefficients[:, 0, 0] = np.where(mono & psychoacoustic, (1. - self._pan) / 2, 1. - positive)
+        coefficients[:, 1, 0] = np.where(
+            mono,
+            np.where(psychoacoustic, (1. + self._pan) / 2, 1. - negative),
+            np.where(psychoacoustic, positive, 0.),
+        )
+        coefficients[:, 0, 1] = np.where(~mono & psychoacoustic, negative, 0.)
+        coefficients[:, 1, 1] = np.where(mono, 0., 1. - negative)
+
+        return (coefficients * scale[:, None, None]).astype(np.float32)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        # block is [strip, channel, frame], mono strips only use channel 0
+        target = self.coefficients()
+        out = np.tensordot(self._current, block, axes=([0, 2], [0, 1]))
+
+        if not np.array_equal(target, self._current):
+            # ramp linearly over the block instead of stepping, like the GstController ramps
+            ramp = np.arange(1, block.shape[2] + 1, dtype=np.float32) / block.shape[2]
+            out += np.tensordot(target - self._current, block, axes=([0, 2], [0, 1])) * ramp
+            self._current = target
+
+        return out
+
+
+class VectorFaderChannel(FaderChannel):
+    def __init__(self, name: str, mode: AudioMode = AudioMode.STEREO, **kwargs):
+        self._engine: typing.Optional[ChannelStripEngine] = None
+        self._slot: typing.Optional[int] = None
+        super().__init__(name, **kwargs)
+        self._mode = mode
+
+    @property
+    def mode(self) -> AudioMode:
+        return self._mode
+
+    @property
+    def parameter_targets(self) -> dict[str, tuple[str, str]]:
+        return {}
+
+    def connect_engine(self, engine: ChannelStripEngine) -> int:
+        self._slot = engine.add_strip(
+            self._mode.channels,
+            gain=self.gain_amplitude,
+            phase_invert=self.phase_invert,
+            fader=self.fader_amplitude,
+            cut=self.cut,
+            pan=self.pan,
+            pan_method=int(self.pan_method),
+        )
+        self._engine = engine
+        return self._slot
+
+    def _apply_parameter(self, key: str, value):
+        # plain array stores, the engine picks them up and ramps at the next block
+        if self._engine is not None:
+            self._engine.set(self._slot, key, value)
+
+    def build(self, builder: GraphBuilder):
+        sample_dtype(self.sample_format.format)
+        with builder.bin(f"bin-vector_channel-{self.name}"):
+            builder.chain(
+                self._edge_queue(builder, f"vector_channel-sink-{self.name}"),
+                builder.element("audioconvert", f"vector_channel-convert-{self.name}"),
+                builder.element(
+                    "appsink",
+                    f"vector_channel-appsink-{self.name}",
+                    caps=self._caps(self._mode),
+                    sync=False,
+                    max_buffers=VectorMasterBus.APPSINK_MAX_BUFFERS,
+                ),
+            )
+
+    @property
+    def sink(self) -> list[str]:
+        return [f"vector_channel-sink-{self.name}"]
+
+    @property
+    def src(self) -> list[str]:
+        # summed into the VectorMasterBus
+        return []
+
+
+class VectorMasterBus(GstElement):
+    APPSINK_MAX_BUFFERS = 4
+    PULL_TIMEOUT_NS = 100 * MS_NS
+
+    def __init__(self, name: str, channels: list[VectorFaderChannel]):
+        super().__init__(name)
+        self._channels = list(channels)
+        self._engine = ChannelStripEngine()
+        for channel in self._channels:
+            channel.connect_engine(self._engine)
+
+        self._sinks: list[Gst.Element] = []
+        self._appsrc: typing.Optional[Gst.Element] = None
+        self._block = np.zeros((len(self._channels), 2, 0), dtype=np.float32)
+        self._dtype = sample_dtype(self.sample_format.format)
+        self._stop = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+
+    @property
+    def engine(self) -> ChannelStripEngine:
+        return self._engine
+
+    @property
+    def src(self) -> list[str]:
+        return [f"master-src-{self.name}"]
+
+    @property
+    def sink(self) -> list[str]:
+        return []
+
+    def build(self, builder: GraphBuilder):
+        self._dtype = sample_dtype(self.sample_format.format)
+        with builder.bin(f"bin-vector-master-bus-{self.name}"):
+            builder.chain(
+                builder.element(
+                    "appsrc",
+                    f"vector-master-bus-appsrc-{self.name}",
+                    is_live=True,
+                    format=Serialized("time"),
+                    caps=self._caps(AudioMode.STEREO),
+                ),
+                builder.element("level", f"master-bus-level-{self.name}"),
+                builder.element("tee", f"master-src-{self.name}"),
+            )
+
+    def attach_pipeline(self, pipeline: Gst.Pipeline):
+        super().attach_pipeline(pipeline)
+        self._sinks = [pipeline.get_by_name(f"vector_channel-appsink-{channel.name}") for channel in self._channels]
+        self._appsrc = pipeline.get_by_name(f"vector-master-bus-appsrc-{self.name}")
+        if self._appsrc is None or None in self._sinks:
+            raise RuntimeError(f"Couldn't find the appsink/appsrc elements of {self.name}")
+
+        self._stop.clear()
+        self._thread = threading.Thread(name=f"vector-master-bus-{self.name}", target=self._run, daemon=True)
+        self._thread.start()
+
+    def detach(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _pull(self, sink: Gst.Element) -> typing.Optional[Gst.Sample]:
+        while not self._stop.is_set():
+            sample = sink.emit("try-pull-sample", self.PULL_TIMEOUT_NS)
+            if sample is not None:
+                return sample
+            if sink.get_property("eos"):
+                self._appsrc.emit("end-of-stream")
+                return None
+        return None
+
+    def _run(self):
+        while not self._stop.is_set():
+            samples = []
+            for sink in self._sinks:
+                sample = self._pull(sink)
+                if sample is None:
+                    return
+                samples.append(sample)
+            self._appsrc.emit("push-buffer", self.process_samples(samples))
+
+    def process_samples(self, samples: list[Gst.Sample]) -> Gst.Buffer:
+        first = samples[0].get_buffer()
+        frames = first.get_size() // (self._dtype.itemsize * self._engine.channels[0])
+        if self._block.shape[2] != frames:
+            self._block = np.zeros((len(self._channels), 2, frames), dtype=np.float32)
+
+        for index, sample in enumerate(samples):
+            buffer = sample.get_buffer()
+            channels = self._engine.channels[index]
+            valid, info = buffer.map(Gst.MapFlags.READ)
+            if not valid:
+                raise RuntimeError(f"Couldn't map buffer of {self._channels[index].name}")
+            try:
+                data = np.frombuffer(info.data, dtype=self._dtype)[:frames * channels].reshape(-1, channels)
+                self._block[index, :channels, :len(data)] = data.T
+                self._block[index, :channels, len(data):] = 0
+            finally:
+                buffer.unmap(info)
+
+        out = self._engine.process(self._block)
+        buffer = Gst.Buffer.new_wrapped(np.ascontiguousarray(out.T, dtype=self._dtype).tobytes())
+        buffer.pts = first.pts
+        buffer.duration = first.duration
+        return buffer
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import typing
+
+from digimix.audio import Gst
+
+SAMPLE_WIDTHS = {"F32LE": 4, "F64LE": 8, "S16LE": 2, "S24LE": 3, "S24_32LE": 4, "S32LE": 4}
+CONVERTER_FACTORIES = ("audioconvert", "audioresample")
+
+
+class SampleFormat(typing.NamedTuple):
+    format: str = "F32LE"
+    rate: int = 48000
+    layout: str = "interleaved"
+
+    @property
+    def sample_width(self) -> int:
+        return SAMPLE_WIDTHS[self.format]
+
+    @property
+    def format_info(self) -> str:
+        return f"audio/x-raw,format={self.format},layout={self.layout},rate={self.rate}"
+
+
+INTERNAL_FORMAT = SampleFormat()
+
+
+class PadFormat(typing.NamedTuple):
+    element: str
+    pad: str
+    direction: Gst.PadDirection
+    format: typing.Optional[str]
+    rate: typing.Optional[int]
+    channels: typing.Optional[int]
+
+    @classmethod
+    def from_pad(cls, element: Gst.Element, pad: Gst.Pad) -> typing.Optional['PadFormat']:
+        caps = pad.get_current_caps()
+        if caps is None or caps.is_empty():
+            return None
+        structure = caps.get_structure(0)
+        if structure.get_name() != "audio/x-raw":
+            return None
+        has_rate, rate = structure.get_int("rate")
+        has_channels, channels = structure.get_int("channels")
+        return cls(
+            element=element.get_name(),
+            pad=pad.get_name(),
+            direction=pad.get_direction(),
+            format=structure.get_string("format"),
+            rate=rate if has_rate else None,
+            channels=channels if has_channels else None,
+        )
+
+    def matches(self, sample_format: SampleFormat) -> bool:
+        return self.format == sample_format.format and self.rate == sample_format.rate
+
+    def __str__(self) -> str:
+        return f"{self.element}.{self.pad} {self.format}@{self.rate}x{self.channels}"
+
+
+class FormatIssue(typing.NamedTuple):
+    element: str
+    kind: str
+    detail: str
+
+
+class FormatAudit(typing.NamedTuple):
+    sample_format: SampleFormat
+    pads: tuple[PadFormat, ...]
+    converters: dict[str, bool]
+    issues: tuple[FormatIssue, ...]
+
+    @property
+    def clean(self) -> bool:
+        return not self.issues
+
+    @classmethod
+    def from_pipeline(cls, pipeline: Gst.Pipeline, sample_format: SampleFormat = INTERNAL_FORMAT) -> 'FormatAudit':
+        # only meaningful once caps are negotiated, i.e. in PAUSED or PLAYING
+        pads = []
+        converters = {}
+        issues = []
+        for element in pipeline.iterate_recurse():
+            if isinstance(element, Gst.Bin):
+                continue
+            formats = [PadFormat.from_pad(element, pad) for pad in element.iterate_pads()]
+            formats = [pad_format for pad_format in formats if pad_format is not None]
+            pads += formats
+
+            name = element.get_name()
+            sinks = {(pad.format, pad.rate) for pad in formats if pad.direction == Gst.PadDirection.SINK}
+            srcs = {(pad.format, pad.rate) for pad in formats if pad.direction == Gst.PadDirection.SRC}
+            converting = bool(sinks and srcs and sinks != srcs)
+            factory = element.get_factory()
+            if factory is not None and factory.get_name() in CONVERTER_FACTORIES:
+                converters[name] = converting
+
+            if converting:
+                issues.append(FormatIssue(name, "conversion", f"{sorted(sinks)} -> {sorted(srcs)}"))
+            for pad in formats:
+                if pad.direction == Gst.PadDirection.SRC and not pad.matches(sample_format):
+                    issues.append(FormatIssue(name, "format", str(pad)))
+
+        return cls(sample_format, tuple(pads), converters, tuple(issues))
+
+    def format(self) -> str:
+        lines = [
+            f"internal format: {self.sample_format.format}@{self.sample_format.rate}, "
+            f"pads: {len(self.pads)}, issues: {len(self.issues)}"
+        ]
+        for name, converting in sorted(self.converters.items()):
+            lines.append(f"  converter {name}: {'converting' if converting else 'passthrough'}")
+        for issue in self.issues:
+            lines.append(f"  {issue.kind} {issue.element}: {issue.detail}")
+        return '\n'.join(lines)
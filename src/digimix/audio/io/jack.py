@@ -1,8 +1,11 @@
+from __future__ import annotations
+
 import typing
 from abc import ABC
 
 from digimix.audio import Gst
 from digimix.audio.base import AudioMode
+from digimix.audio.builder import GraphBuilder, PadRef
 from digimix.audio.io import Input, Output
 
 
@@ -10,6 +13,42 @@ class JackClient(ABC):
     JACK_BUFFER_TIME_US = 50_000
     JACK_LATENCY_TIME_US = 1_000
 
+    def _jack_element(self, builder: GraphBuilder, factory: str, name: str, client_name: str) -> str:
+        return builder.element(
+            factory,
+            name,
+            connect=0,
+            client_name=client_name,
+            buffer_time=self.JACK_BUFFER_TIME_US,
+            latency_time=self.JACK_LATENCY_TIME_US,
+        )
+
+    def _interleave(self, builder: GraphBuilder, name: str, **properties) -> str:
+        # an aggregator holds a buffer per sink pad, pads fed from one thread don't need a queue each like interleave
+        return builder.element("audiointerleave", name, **self._profile.mixer_properties, **properties)
+
+    def _unpositioned_caps(self, channels: int) -> str:
+        return f"{self.sample_format.format_info},channels={channels},channel-mask=(bitmask)0x{'0' * channels}"
+
+
+def jack_server_rate(client_name: str = "digimix-probe") -> typing.Optional[int]:
+    # a jackaudiosrc in READY has its client open and reports the server rate in its caps
+    src = Gst.ElementFactory.make("jackaudiosrc", None)
+    if src is None:
+        return None
+    src.set_property("connect", 0)
+    src.set_property("client-name", client_name)
+    try:
+        if src.set_state(Gst.State.READY) == Gst.StateChangeReturn.FAILURE:
+            return None
+        caps = src.get_static_pad("src").query_caps(None)
+        if caps.is_empty():
+            return None
+        valid, rate = caps.get_structure(0).get_int("rate")
+        return rate if valid else None
+    finally:
+        src.set_state(Gst.State.NULL)
+
 
 class JackClientInput(Input, JackClient, ABC):
     def __init__(self, name: str, conf: typing.Tuple[typing.Tuple[str, AudioMode], ...]):
@@ -21,147 +60,148 @@ class JackClientInput(Input, JackClient, ABC):
     def src(self) -> list[str]:
         return self._src
 
-    def attach_pipeline(self, pipeline: Gst.Element):
-        pass
-
 
 class SingleJackClientInput(JackClientInput):
-    def __init__(self, name: str, conf: typing.Tuple[typing.Tuple[str, AudioMode], ...]):
-        super().__init__(name=name, conf=conf)
-
-        audio_stream_count = 0
-        for _, mode in conf:
-            audio_stream_count += mode.channels
-
-        self._pipeline_description = f"""
-        bin.(
-            name=bin-jack-src-{self.name}
-            jackaudiosrc
-                connect=0
-                name=jack-src-{self.name}
-                client_name={self.name}
-                buffer-time={self.JACK_BUFFER_TIME_US}
-                latency-time={self.JACK_LATENCY_TIME_US}
-            ! capsfilter
-                name=jack-src-caps-{self.name}
-                caps=audio/x-raw,channels={audio_stream_count},channel-mask=(bitmask)0x{'0' * audio_stream_count}
-            ! deinterleave
-                name=jack-src-deinterleave-{self.name}
-        """
-
-        i = 0
-        for input_name, mode in conf:
-            if mode is AudioMode.MONO:
-                self._pipeline_description += f"""
-                bin.(
-                    name=bin-jack-src-in-{self.name}-{input_name}
-                    jack-src-deinterleave-{self.name}.src_{i}
-                    ! capsfilter
-                        name=jack-src-deinterleave_caps-{self.name}-src_{i}
-                        caps={mode.caps()}
-                    ! tee
-                        name=jack-src-{input_name}
-                )
-                """
-                i += 1
-            elif mode is AudioMode.STEREO:
-                self._pipeline_description += f"""
-                bin.(
-                    name=bin-jack-src-in-{self.name}-{input_name}
-                    interleave
-                        name=jack-src-interleave-{self.name}-{input_name}
-                    ! capsfilter
-                        name=jack-src-interleave_caps-{self.name}-{input_name}
-                        caps={mode.caps()}
-                    ! tee
-                        name=jack-src-{input_name}
-
-                    jack-src-deinterleave-{self.name}.src_{i}
-                    ! capsfilter
-                        name=jack-src-deinterleave_caps-{self.name}-{input_name}_left
-                        caps={AudioMode.LEFT_ONLY.caps()}
-                    ! queue
-                        name=queue-jack-src-pre-interleave-{self.name}-{input_name}_left
-                        max-size-time={self.QUEUE_TIME_NS}
-                    ! jack-src-interleave-{self.name}-{input_name}.sink_0
-
-                    jack-src-deinterleave-{self.name}.src_{i + 1}
-                    ! capsfilter
-                        name=jack-src-deinterleave-{self.name}-{input_name}_right
-                        caps={AudioMode.RIGHT_ONLY.caps()}
-                    ! queue
-                        name=queue-jack-src-pre-interleave-{self.name}-{input_name}_right
-                        max-size-time={self.QUEUE_TIME_NS}
-                    ! jack-src-interleave-{self.name}-{input_name}.sink_1
-                )
-                """
-                i += 2
-            else:
-                raise RuntimeError("Unsupported audio mode: " + str(mode))
-
-        self._pipeline_description += """
-        )
-        """
+    def build(self, builder: GraphBuilder):
+        audio_stream_count = sum(mode.channels for _, mode in self._conf)
+
+        with builder.bin(f"bin-jack-src-{self.name}"):
+            deinterleave = builder.element("deinterleave", f"jack-src-deinterleave-{self.name}")
+            builder.chain(
+                self._jack_element(builder, "jackaudiosrc", f"jack-src-{self.name}", self.name),
+                builder.element(
+                    "capsfilter",
+                    f"jack-src-caps-{self.name}",
+                    caps=self._unpositioned_caps(audio_stream_count),
+                ),
+                deinterleave,
+            )
+
+            i = 0
+            for input_name, mode in self._conf:
+                if mode is AudioMode.MONO:
+                    with builder.bin(f"bin-jack-src-in-{self.name}-{input_name}"):
+                        builder.chain(
+                            PadRef(deinterleave, f"src_{i}"),
+                            builder.element(
+                                "capsfilter",
+                                f"jack-src-deinterleave_caps-{self.name}-src_{i}",
+                                caps=self._caps(mode),
+                            ),
+                            builder.element("tee", f"jack-src-{input_name}"),
+                        )
+                    i += 1
+                elif mode is AudioMode.STEREO:
+                    with builder.bin(f"bin-jack-src-in-{self.name}-{input_name}"):
+                        interleave = builder.element("interleave", f"jack-src-interleave-{self.name}-{input_name}")
+                        builder.chain(
+                            interleave,
+                            builder.element(
+                                "capsfilter",
+                                f"jack-src-interleave_caps-{self.name}-{input_name}",
+                                caps=self._caps(mode),
+                            ),
+                            builder.element("tee", f"jack-src-{input_name}"),
+                        )
 
-    @property
-    def pipeline_description(self) -> str:
-        return self._pipeline_description
+                        for side, side_mode in enumerate((AudioMode.LEFT_ONLY, AudioMode.RIGHT_ONLY)):
+                            side_name = 'left' if side_mode is AudioMode.LEFT_ONLY else 'right'
+                            builder.chain(
+                                PadRef(deinterleave, f"src_{i + side}"),
+                                builder.element(
+                                    "capsfilter",
+                                    f"jack-src-deinterleave_caps-{self.name}-{input_name}_{side_name}",
+                                    caps=self._caps(side_mode),
+                                ),
+                                self._queue(
+                                    builder,
+                                    f"queue-jack-src-pre-interleave-{self.name}-{input_name}_{side_name}",
+                                ),
+                                PadRef(interleave, f"sink_{side}"),
+                            )
+                    i += 2
+                else:
+                    raise RuntimeError("Unsupported audio mode: " + str(mode))
 
 
 class MultiJackClientInput(JackClientInput):
-    def __init__(self, name: str, conf: typing.Tuple[typing.Tuple[str, AudioMode], ...]):
-        super().__init__(name, conf)
-
-        self._pipeline_description = f"""
-        bin.(
-            name=bin-jack-src-{self.name}
-        """
-
-        for input_name, mode in conf:
-            if mode is AudioMode.MONO:
-                self._pipeline_description += f"""
-                bin.(
-                    name=bin-jack-src-in-{self.name}-{input_name}
-                    jackaudiosrc
-                        connect=0
-                        name=jack-src-{self.name}-{input_name}
-                        client_name={self.name}-{input_name}
-                        buffer-time={self.JACK_BUFFER_TIME_US}
-                        latency-time={self.JACK_LATENCY_TIME_US}
-                    ! capsfilter
-                        name=jack-src-caps-{self.name}-{input_name}
-                        caps={mode.caps()}
-                    ! tee
-                        name=jack-src-{input_name}
-                )
-                """
-            elif mode is AudioMode.STEREO:
-                self._pipeline_description += f"""
-                bin.(
-                    name=bin-jack-src-in-{self.name}-{input_name}
-                    jackaudiosrc
-                        connect=0
-                        name=jack-src-{self.name}-{input_name}
-                        client_name={self.name}-{input_name}
-                        buffer-time={self.JACK_BUFFER_TIME_US}
-                        latency-time={self.JACK_LATENCY_TIME_US}
-                    ! capsfilter
-                        name=jack-src-caps-{self.name}-{input_name}
-                        caps={mode.caps()}
-                    ! tee
-                        name=jack-src-{input_name}
-                )
-                """
-            else:
-                raise RuntimeError("Unsupported audio mode: " + str(mode))
-
-        self._pipeline_description += """
-        )
-        """
+    def build(self, builder: GraphBuilder):
+        with builder.bin(f"bin-jack-src-{self.name}"):
+            for input_name, mode in self._conf:
+                if mode not in (AudioMode.MONO, AudioMode.STEREO):
+                    raise RuntimeError("Unsupported audio mode: " + str(mode))
+
+                with builder.bin(f"bin-jack-src-in-{self.name}-{input_name}"):
+                    builder.chain(
+                        self._jack_element(
+                            builder,
+                            "jackaudiosrc",
+                            f"jack-src-{self.name}-{input_name}",
+                            f"{self.name}-{input_name}",
+                        ),
+                        builder.element("capsfilter", f"jack-src-caps-{self.name}-{input_name}", caps=self._caps(mode)),
+                        builder.element("tee", f"jack-src-{input_name}"),
+                    )
+
+
+class MatrixJackClientInput(JackClientInput):
+    # one deinterleave splits the JACK channels, stereo streams are paired up again by a queueless aggregator,
+    # the work per period grows with the channel count only
+    def build(self, builder: GraphBuilder):
+        audio_stream_count = sum(mode.channels for _, mode in self._conf)
+
+        with builder.bin(f"bin-jack-src-{self.name}"):
+            deinterleave = builder.element("deinterleave", f"jack-src-deinterleave-{self.name}")
+            builder.chain(
+                self._jack_element(builder, "jackaudiosrc", f"jack-src-{self.name}", self.name),
+                builder.element(
+                    "capsfilter",
+                    f"jack-src-caps-{self.name}",
+                    caps=self._unpositioned_caps(audio_stream_count),
+                ),
+                deinterleave,
+            )
+
+            i = 0
+            for input_name, mode in self._conf:
+                if mode is AudioMode.MONO:
+                    with builder.bin(f"bin-jack-src-in-{self.name}-{input_name}"):
+                        builder.chain(
+                            PadRef(deinterleave, f"src_{i}"),
+                            builder.element(
+                                "capsfilter",
+                                f"jack-src-deinterleave_caps-{self.name}-src_{i}",
+                                caps=self._caps(mode),
+                            ),
+                            builder.element("tee", f"jack-src-{input_name}"),
+                        )
+                elif mode is AudioMode.STEREO:
+                    with builder.bin(f"bin-jack-src-in-{self.name}-{input_name}"):
+                        interleave = self._interleave(builder, f"jack-src-interleave-{self.name}-{input_name}")
+                        builder.chain(
+                            interleave,
+                            builder.element(
+                                "capsfilter",
+                                f"jack-src-interleave_caps-{self.name}-{input_name}",
+                                caps=self._caps(mode),
+                            ),
+                            builder.element("tee", f"jack-src-{input_name}"),
+                        )
 
-    @property
-    def pipeline_description(self) -> str:
-        return self._pipeline_description
+                        for side, side_mode in enumerate((AudioMode.LEFT_ONLY, AudioMode.RIGHT_ONLY)):
+                            side_name = 'left' if side_mode is AudioMode.LEFT_ONLY else 'right'
+                            builder.chain(
+                                PadRef(deinterleave, f"src_{i + side}"),
+                                builder.element(
+                                    "capsfilter",
+                                    f"jack-src-deinterleave_caps-{self.name}-{input_name}_{side_name}",
+                                    caps=self._caps(side_mode),
+                                ),
+                                PadRef(interleave, f"sink_{side}"),
+                            )
+                else:
+                    raise RuntimeError("Unsupported audio mode: " + str(mode))
+                i += mode.channels
 
 
 class JackClientOutput(Output, JackClient, ABC):
@@ -174,91 +214,116 @@ class JackClientOutput(Output, JackClient, ABC):
     def sink(self) -> list[str]:
         return self._sink
 
-    def attach_pipeline(self, pipeline: Gst.Pipeline):
-        pass
-
 
 class SingleJackClientOutput(JackClientOutput):
-    def __init__(self, name: str, conf: typing.Tuple[typing.Tuple[str, AudioMode], ...]):
-        super().__init__(name, conf)
-
-        audio_stream_count = 0
-        for _, mode in conf:
-            audio_stream_count += mode.channels
-
-        self._pipeline_description = f"""
-        bin.(
-            name=bin-jack-sink-{self.name}
-            interleave
-                name=jack-sink-interleave-{self.name}
-                channel-positions-from-input=false
-            ! capsfilter
-                name=jack-sink-caps-{self.name}
-                caps=audio/x-raw,channels={audio_stream_count},channel-mask=(bitmask)0x{'0' * audio_stream_count}
-            ! jackaudiosink
-                connect=0
-                name=jack-sink-{self.name}
-                client_name={self.name}
-                buffer-time={self.JACK_BUFFER_TIME_US}
-                latency-time={self.JACK_LATENCY_TIME_US}
-        """
-
-        i = 0
-        for input_name, mode in conf:
-            if mode is AudioMode.MONO:
-                self._pipeline_description += f"""
-                        bin.(
-                            name=bin-jack-sink-{self.name}-{input_name}
-                            queue
-                                name=jack-sink-{input_name}
-                                max-size-time={self.QUEUE_TIME_NS}
-                            ! capsfilter
-                                name=jack-sink-queue_caps-{input_name}
-                                caps={mode.caps()}
-                            ! jack-sink-interleave-{self.name}.sink_{i}
+    def build(self, builder: GraphBuilder):
+        audio_stream_count = sum(mode.channels for _, mode in self._conf)
+
+        with builder.bin(f"bin-jack-sink-{self.name}"):
+            interleave = builder.element(
+                "interleave",
+                f"jack-sink-interleave-{self.name}",
+                channel_positions_from_input=False,
+            )
+            builder.chain(
+                interleave,
+                builder.element(
+                    "capsfilter",
+                    f"jack-sink-caps-{self.name}",
+                    caps=self._unpositioned_caps(audio_stream_count),
+                ),
+                self._jack_element(builder, "jackaudiosink", f"jack-sink-{self.name}", self.name),
+            )
+
+            i = 0
+            for input_name, mode in self._conf:
+                if mode is AudioMode.MONO:
+                    with builder.bin(f"bin-jack-sink-{self.name}-{input_name}"):
+                        builder.chain(
+                            self._edge_queue(builder, f"jack-sink-{input_name}"),
+                            builder.element("capsfilter", f"jack-sink-queue_caps-{input_name}", caps=self._caps(mode)),
+                            PadRef(interleave, f"sink_{i}"),
                         )
-                        """
-                i += 1
-            elif mode is AudioMode.STEREO:
-                self._pipeline_description += f"""
-                        bin.(
-                            name=bin-jack-sink-{self.name}-{input_name}
-                            queue
-                                name=jack-sink-{input_name}
-                                max-size-time={self.QUEUE_TIME_NS}
-                            ! capsfilter
-                                name=jack-sink-queue_caps-{input_name}
-                                caps={mode.caps()}
-                            ! deinterleave
-                                name=jack-sink-deinterleave-{input_name}
-
-                            jack-sink-deinterleave-{input_name}.src_0
-                            ! capsfilter
-                                name=jack-sink-deinterleave_caps-{self.name}-{input_name}_left
-                                caps={AudioMode.LEFT_ONLY.caps()}
-                            ! queue
-                                name=queue-jack-sink-pre-interleave-{self.name}-{input_name}_left
-                                max-size-time={self.QUEUE_TIME_NS}
-                            ! jack-sink-interleave-{self.name}.sink_{i}
-
-                            jack-sink-deinterleave-{input_name}.src_1
-                            ! capsfilter
-                                name=jack-sink-deinterleave-{self.name}-{input_name}_right
-                                caps={AudioMode.RIGHT_ONLY.caps()}
-                            ! queue
-                                name=queue-jack-sink-pre-interleave-{self.name}-{input_name}_right
-                                max-size-time={self.QUEUE_TIME_NS}
-                            ! jack-sink-interleave-{self.name}.sink_{i + 1}
+                    i += 1
+                elif mode is AudioMode.STEREO:
+                    with builder.bin(f"bin-jack-sink-{self.name}-{input_name}"):
+                        deinterleave = builder.element("deinterleave", f"jack-sink-deinterleave-{input_name}")
+                        builder.chain(
+                            self._edge_queue(builder, f"jack-sink-{input_name}"),
+                            builder.element("capsfilter", f"jack-sink-queue_caps-{input_name}", caps=self._caps(mode)),
+                            deinterleave,
                         )
-                        """
-                i += 2
-            else:
-                raise RuntimeError("Unsupported audio mode: " + str(mode))
 
-        self._pipeline_description += """
-        )
-        """
+                        for side, side_mode in enumerate((AudioMode.LEFT_ONLY, AudioMode.RIGHT_ONLY)):
+                            side_name = 'left' if side_mode is AudioMode.LEFT_ONLY else 'right'
+                            builder.chain(
+                                PadRef(deinterleave, f"src_{side}"),
+                                builder.element(
+                                    "capsfilter",
+                                    f"jack-sink-deinterleave_caps-{self.name}-{input_name}_{side_name}",
+                                    caps=self._caps(side_mode),
+                                ),
+                                self._queue(
+                                    builder,
+                                    f"queue-jack-sink-pre-interleave-{self.name}-{input_name}_{side_name}",
+                                ),
+                                PadRef(interleave, f"sink_{i + side}"),
+                            )
+                    i += 2
+                else:
+                    raise RuntimeError("Unsupported audio mode: " + str(mode))
+
+
+class MatrixJackClientOutput(JackClientOutput):
+    # a single queueless aggregator joins all streams into the JACK channels, the only thread this direction adds
+    def build(self, builder: GraphBuilder):
+        audio_stream_count = sum(mode.channels for _, mode in self._conf)
+
+        with builder.bin(f"bin-jack-sink-{self.name}"):
+            interleave = self._interleave(
+                builder,
+                f"jack-sink-interleave-{self.name}",
+                channel_positions_from_input=False,
+            )
+            builder.chain(
+                interleave,
+                builder.element(
+                    "capsfilter",
+                    f"jack-sink-caps-{self.name}",
+                    caps=self._unpositioned_caps(audio_stream_count),
+                ),
+                self._jack_element(builder, "jackaudiosink", f"jack-sink-{self.name}", self.name),
+            )
+
+            i = 0
+            for input_name, mode in self._conf:
+                if mode is AudioMode.MONO:
+                    with builder.bin(f"bin-jack-sink-{self.name}-{input_name}"):
+                        builder.chain(
+                            self._edge_queue(builder, f"jack-sink-{input_name}"),
+                            builder.element("capsfilter", f"jack-sink-queue_caps-{input_name}", caps=self._caps(mode)),
+                            PadRef(interleave, f"sink_{i}"),
+                        )
+                elif mode is AudioMode.STEREO:
+                    with builder.bin(f"bin-jack-sink-{self.name}-{input_name}"):
+                        deinterleave = builder.element("deinterleave", f"jack-sink-deinterleave-{input_name}")
+                        builder.chain(
+                            self._edge_queue(builder, f"jack-sink-{input_name}"),
+                            builder.element("capsfilter", f"jack-sink-queue_caps-{input_name}", caps=self._caps(mode)),
+                            deinterleave,
+                        )
 
-    @property
-    def pipeline_description(self) -> str:
-        return self._pipeline_description
+                        for side, side_mode in enumerate((AudioMode.LEFT_ONLY, AudioMode.RIGHT_ONLY)):
+                            side_name = 'left' if side_mode is AudioMode.LEFT_ONLY else 'right'
+                            builder.chain(
+                                PadRef(deinterleave, f"src_{side}"),
+                                builder.element(
+                                    "capsfilter",
+                                    f"jack-sink-deinterleave_caps-{self.name}-{input_name}_{side_name}",
+                                    caps=self._caps(side_mode),
+                                ),
+                                PadRef(interleave, f"sink_{i + side}"),
+                            )
+                else:
+                    raise RuntimeError("Unsupported audio mode: " + str(mode))
+                i += mode.channels
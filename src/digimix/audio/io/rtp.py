@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import enum
+import typing
+from abc import ABC
+
+from digimix.audio import Gst
+from digimix.audio.base import AudioMode
+from digimix.audio.builder import GraphBuilder
+from digimix.audio.io import Input, Output
+
+MS_NS = 1000 * 1000
+
+
+@enum.unique
+class RtpEncoding(enum.Enum):
+    L16 = ("L16", "S16BE")
+    L24 = ("L24", "S24BE")
+
+    def __init__(self, encoding_name: str, sample_format: str):
+        self._encoding_name = encoding_name
+        self._sample_format = sample_format
+
+    @property
+    def encoding_name(self) -> str:
+        return self._encoding_name
+
+    @property
+    def sample_format(self) -> str:
+        return self._sample_format
+
+    @property
+    def payloader(self) -> str:
+        return f"rtp{self._encoding_name}pay"
+
+    @property
+    def depayloader(self) -> str:
+        return f"rtp{self._encoding_name}depay"
+
+
+class RtpStatistics(typing.NamedTuple):
+    name: str
+    pushed: int
+    lost: int
+    late: int
+    duplicates: int
+    jitter_ns: int
+    # the jitterbuffer's latency property, the buffering it adds, not a measurement
+    configured_latency_ns: int
+
+    @property
+    def loss_ratio(self) -> float:
+        total = self.pushed + self.lost
+        return self.lost / total if total else 0.
+
+    def format(self) -> str:
+        return (
+            f"{self.name}: pushed={self.pushed} lost={self.lost} ({self.loss_ratio:.2%}) late={self.late} "
+            f"duplicates={self.duplicates} jitter={self.jitter_ns / MS_NS:.3f}ms "
+            f"configured latency={self.configured_latency_ns / MS_NS:.1f}ms"
+        )
+
+
+class RtpStream(ABC):
+    PAYLOAD_TYPE = 96
+
+    def _check_conf(self, conf: typing.Tuple[typing.Tuple[str, AudioMode], ...]):
+        for _, mode in conf:
+            if mode not in (AudioMode.MONO, AudioMode.STEREO):
+                raise RuntimeError("Unsupported audio mode: " + str(mode))
+        if self._port % 2:
+            raise ValueError(f"RTP ports have to be even. Given {self._port}")
+
+    @property
+    def encoding(self) -> RtpEncoding:
+        return self._encoding
+
+    def port(self, index: int) -> int:
+        # one stream per configured input / output, RTCP would take the odd port in between
+        return self._port + 2 * index
+
+    def _rtp_caps(self, mode: AudioMode) -> str:
+        return (
+            f"application/x-rtp,media=audio,clock-rate={self.sample_format.rate},"
+            f"encoding-name={self._encoding.encoding_name},channels={mode.channels},payload={self.PAYLOAD_TYPE}"
+        )
+
+
+class RtpInput(Input, RtpStream):
+    def __init__(
+        self,
+        name: str,
+        conf: typing.Tuple[typing.Tuple[str, AudioMode], ...],
+        port: int,
+        address: str = "0.0.0.0",
+        encoding: RtpEncoding = RtpEncoding.L24,
+        latency_ns: int = 5 * MS_NS,
+    ):
+        super().__init__(name)
+        self._port = int(port)
+        self._check_conf(conf)
+        self._conf = conf
+        self._address = str(address)
+        self._encoding = encoding
+        self._latency_ns = int(latency_ns)
+        self._src = [f"rtp-src-{name}" for name, _ in conf]
+        self._jitterbuffers: dict[str, Gst.Element] = {}
+
+    @property
+    def src(self) -> list[str]:
+        return self._src
+
+    @property
+    def latency_ns(self) -> int:
+        return self._latency_ns
+
+    def build(self, builder: GraphBuilder):
+        with builder.bin(f"bin-rtp-src-{self.name}"):
+            for index, (input_name, mode) in enumerate(self._conf):
+                builder.chain(
+                    builder.element(
+                        "udpsrc",
+                        f"rtp-src-udp-{self.name}-{input_name}",
+                        address=self._address,
+                        port=self.port(index),
+                        caps=self._rtp_caps(mode),
+                    ),
+                    builder.element(
+                        "rtpjitterbuffer",
+                        f"rtp-src-jitterbuffer-{self.name}-{input_name}",
+                        latency=self._latency_ns // MS_NS,
+                        drop_on_latency=True,
+                        do_lost=True,
+                    ),
+                    builder.element(self._encoding.depayloader, f"rtp-src-depay-{self.name}-{input_name}"),
+                    builder.element("audioconvert", f"rtp-src-convert-{self.name}-{input_name}"),
+                    builder.element("capsfilter", f"rtp-src-caps-{self.name}-{input_name}", caps=self._caps(mode)),
+                    builder.element("tee", f"rtp-src-{input_name}"),
+                )
+
+    def attach_pipeline(self, pipeline: Gst.Pipeline):
+        super().attach_pipeline(pipeline)
+        for input_name, _ in self._conf:
+            name = f"rtp-src-jitterbuffer-{self.name}-{input_name}"
+            jitterbuffer = pipeline.get_by_name(name)
+            if jitterbuffer is None:
+                raise RuntimeError(f"Couldn't find element {name}")
+            self._jitterbuffers[input_name] = jitterbuffer
+
+    def statistics(self) -> dict[str, RtpStatistics]:
+        statistics = {}
+        for input_name, jitterbuffer in self._jitterbuffers.items():
+            stats = jitterbuffer.get_property("stats")
+            statistics[input_name] = RtpStatistics(
+                name=input_name,
+                pushed=stats.get_value("num-pushed"),
+                lost=stats.get_value("num-lost"),
+                late=stats.get_value("num-late"),
+                duplicates=stats.get_value("num-duplicates"),
+                jitter_ns=stats.get_value("avg-jitter"),
+                configured_latency_ns=jitterbuffer.get_property("latency") * MS_NS,
+            )
+        return statistics
+
+
+class RtpOutput(Output, RtpStream):
+    def __init__(
+        self,
+        name: str,
+        conf: typing.Tuple[typing.Tuple[str, AudioMode], ...],
+        host: str,
+        port: int,
+        encoding: RtpEncoding = RtpEncoding.L24,
+        ptime_ns: int = MS_NS,
+    ):
+        super().__init__(name)
+        self._port = int(port)
+        self._check_conf(conf)
+        self._conf = conf
+        self._host = str(host)
+        self._encoding = encoding
+        self._ptime_ns = int(ptime_ns)
+        self._sink = [f"rtp-sink-{name}" for name, _ in conf]
+
+    @property
+    def sink(self) -> list[str]:
+        return self._sink
+
+    @property
+    def ptime_ns(self) -> int:
+        return self._ptime_ns
+
+    @property
+    def packets_per_second(self) -> float:
+        return 1e9 / self._ptime_ns
+
+    def build(self, builder: GraphBuilder):
+        with builder.bin(f"bin-rtp-sink-{self.name}"):
+            for index, (output_name, mode) in enumerate(self._conf):
+                builder.chain(
+                    self._edge_queue(builder, f"rtp-sink-{output_name}"),
+                    builder.element("audioconvert", f"rtp-sink-convert-{self.name}-{output_name}"),
+                    builder.element(
+                        "capsfilter",
+                        f"rtp-sink-caps-{self.name}-{output_name}",
+                        caps=mode.caps(
+                            f"audio/x-raw,format={self._encoding.sample_format},layout=interleaved,"
+                            f"rate={self.sample_format.rate}"
+                        ),
+                    ),
+                    builder.element(
+                        self._encoding.payloader,
+                        f"rtp-sink-pay-{self.name}-{output_name}",
+                        pt=self.PAYLOAD_TYPE,
+                        min_ptime=self._ptime_ns,
+                        max_ptime=self._ptime_ns,
+                    ),
+                    builder.element(
+                        "udpsink",
+                        f"rtp-sink-udp-{self.name}-{output_name}",
+                        host=self._host,
+                        port=self.port(index),
+                        sync=False,
+                    ),
+                )
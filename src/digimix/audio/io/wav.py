@@ -0,0 +1,90 @@
+import os
+import typing
+from abc import ABC
+
+from digimix.audio.base import AudioMode
+from digimix.audio.builder import GraphBuilder
+from digimix.audio.io import Input, Output
+
+
+class WavFile(ABC):
+    @staticmethod
+    def _check_conf(conf: typing.Tuple[typing.Tuple[str, AudioMode], ...]):
+        for _, mode in conf:
+            if mode not in (AudioMode.MONO, AudioMode.STEREO):
+                raise RuntimeError("Unsupported audio mode: " + str(mode))
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    def path(self, stream_name: str) -> str:
+        return os.path.join(self._directory, f"{stream_name}.wav")
+
+
+class WavFileInput(Input, WavFile):
+    def __init__(self, name: str, conf: typing.Tuple[typing.Tuple[str, AudioMode], ...], directory: str):
+        super().__init__(name)
+        self._check_conf(conf)
+        self._directory = str(directory)
+        self._conf = conf
+        self._src = [f"wav-src-{name}" for name, _ in conf]
+
+    @property
+    def src(self) -> list[str]:
+        return self._src
+
+    def build(self, builder: GraphBuilder):
+        with builder.bin(f"bin-wav-src-{self.name}"):
+            for input_name, mode in self._conf:
+                builder.chain(
+                    builder.element(
+                        "filesrc",
+                        f"wav-src-file-{self.name}-{input_name}",
+                        location=self.path(input_name),
+                    ),
+                    builder.element("wavparse", f"wav-src-parse-{self.name}-{input_name}"),
+                    builder.element("audioconvert", f"wav-src-convert-{self.name}-{input_name}"),
+                    builder.element("audioresample", f"wav-src-resample-{self.name}-{input_name}"),
+                    builder.element(
+                        "capsfilter",
+                        f"wav-src-caps-{self.name}-{input_name}",
+                        caps=self._caps(mode),
+                    ),
+                    builder.element("tee", f"wav-src-{input_name}"),
+                )
+
+
+class WavFileOutput(Output, WavFile):
+    SAMPLE_FORMAT = "F32LE"
+
+    def __init__(self, name: str, conf: typing.Tuple[typing.Tuple[str, AudioMode], ...], directory: str):
+        super().__init__(name)
+        self._check_conf(conf)
+        self._directory = str(directory)
+        self._conf = conf
+        self._sink = [f"wav-sink-{name}" for name, _ in conf]
+
+    @property
+    def sink(self) -> list[str]:
+        return self._sink
+
+    def build(self, builder: GraphBuilder):
+        with builder.bin(f"bin-wav-sink-{self.name}"):
+            for output_name, mode in self._conf:
+                builder.chain(
+                    self._edge_queue(builder, f"wav-sink-{output_name}"),
+                    builder.element("audioconvert", f"wav-sink-convert-{self.name}-{output_name}"),
+                    builder.element(
+                        "capsfilter",
+                        f"wav-sink-caps-{self.name}-{output_name}",
+                        caps=mode.caps(f"audio/x-raw,format={self.SAMPLE_FORMAT}"),
+                    ),
+                    builder.element("wavenc", f"wav-sink-enc-{self.name}-{output_name}"),
+                    builder.element(
+                        "filesink",
+                        f"wav-sink-file-{self.name}-{output_name}",
+                        location=self.path(output_name),
+                        sync=False,
+                    ),
+                )
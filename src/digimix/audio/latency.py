@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import math
+import threading
+import typing
+
+from digimix.audio import GObject, Gst
+from digimix.audio.pipeline import Topology
+
+MS_NS = 1000 * 1000
+
+
+class PipelineLatency(typing.NamedTuple):
+    live: bool
+    min_ns: int
+    max_ns: int
+
+
+def query_latency(element: Gst.Element) -> typing.Optional[PipelineLatency]:
+    query = Gst.Query.new_latency()
+    if not element.query(query):
+        return None
+    live, min_ns, max_ns = query.parse_latency()
+    return PipelineLatency(bool(live), int(min_ns), int(max_ns))
+
+
+class LatencyStats:
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = math.inf
+        self.max_ns = 0
+
+    def add(self, latency_ns: int):
+        self.count += 1
+        self.total_ns += latency_ns
+        self.min_ns = min(self.min_ns, latency_ns)
+        self.max_ns = max(self.max_ns, latency_ns)
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} ' \
+               f'count={self.count} ' \
+               f'mean={self.mean_ns / MS_NS:.3f}ms ' \
+               f'min={self.min_ns / MS_NS:.3f}ms ' \
+               f'max={self.max_ns / MS_NS:.3f}ms>'
+
+
+class LatencyReport(typing.NamedTuple):
+    pipeline: typing.Optional[PipelineLatency]
+    elements: dict[str, LatencyStats]
+    owners: dict[str, float]
+    paths: dict[tuple[str, str], LatencyStats]
+
+    def format(self) -> str:
+        lines = []
+        if self.pipeline is not None:
+            lines.append(
+                f"pipeline: live={self.pipeline.live} "
+                f"min={self.pipeline.min_ns / MS_NS:.3f}ms max={self.pipeline.max_ns / MS_NS:.3f}ms"
+            )
+        lines.append("paths:")
+        for (src, sink), stats in sorted(self.paths.items(), key=lambda item: -item[1].mean_ns):
+            lines.append(f"  {src} -> {sink}: {stats.mean_ns / MS_NS:.3f}ms (max {stats.max_ns / MS_NS:.3f}ms)")
+        lines.append("owners:")
+        for owner, mean_ns in sorted(self.owners.items(), key=lambda item: -item[1]):
+            lines.append(f"  {owner}: {mean_ns / MS_NS:.3f}ms")
+        lines.append("elements:")
+        for name, stats in sorted(self.elements.items(), key=lambda item: -item[1].mean_ns):
+            lines.append(f"  {name}: {stats.mean_ns / MS_NS:.3f}ms (max {stats.max_ns / MS_NS:.3f}ms)")
+        return '\n'.join(lines)
+
+
+class LatencyTracer:
+    TRACER_NAME = "latency"
+    TRACER_TYPE_NAME = "GstLatencyTracer"
+    TRACER_PARAMS = "flags=pipeline+element"
+    TRACER_CATEGORY = "GST_TRACER"
+
+    def __init__(self, owners: typing.Optional[typing.Mapping[str, str]] = None):
+        self._owners = dict(owners or {})
+        self._lock = threading.Lock()
+        self._elements: dict[str, LatencyStats] = {}
+        self._paths: dict[tuple[str, str], LatencyStats] = {}
+        self._active = False
+        self._tracer: typing.Optional[Gst.Tracer] = None
+        self._log_function_installed = False
+        self._removed_default_log = False
+
+    @classmethod
+    def for_topology(cls, topology: Topology) -> 'LatencyTracer':
+        return cls({
+            name: f"{owner.__class__.__name__}({owner.name})"
+            for name, owner in topology.owners.items()
+        })
+
+    @classmethod
+    def _tracer_active(cls) -> bool:
+        return any(tracer.__gtype__.name == cls.TRACER_TYPE_NAME for tracer in Gst.tracing_get_active_tracers())
+
+    def _ensure_tracer(self):
+        # the tracer may already be enabled via GST_TRACERS, otherwise instantiating it registers its hooks
+        if self._tracer is not None or self._tracer_active():
+            return
+        factory = Gst.Registry.get().find_feature(self.TRACER_NAME, Gst.TracerFactory.__gtype__)
+        if factory is None:
+            raise RuntimeError(f"GStreamer tracer {self.TRACER_NAME} is not available")
+        self._tracer = GObject.new(factory.get_tracer_type(), params=self.TRACER_PARAMS)
+
+    def start(self):
+        self._ensure_tracer()
+        if not self._log_function_installed:
+            # the default log function would print every tracer record to stderr, _log_function forwards the rest
+            self._removed_default_log = Gst.debug_remove_log_function(None) > 0
+            Gst.debug_add_log_function(self._log_function, None)
+            self._log_function_installed = True
+        Gst.debug_set_threshold_for_name(self.TRACER_CATEGORY, Gst.DebugLevel.TRACE)
+        Gst.debug_set_active(True)
+        self._active = True
+
+    def stop(self):
+        self._active = False
+        Gst.debug_set_threshold_for_name(self.TRACER_CATEGORY, Gst.DebugLevel.NONE)
+        if self._log_function_installed and Gst.debug_remove_log_function(self._log_function) > 0:
+            self._log_function_installed = False
+            if self._removed_default_log:
+                Gst.debug_add_log_function(Gst.debug_log_default, None)
+                self._removed_default_log = False
+
+    def reset(self):
+        with self._lock:
+            self._elements.clear()
+            self._paths.clear()
+
+    def _log_function(self, category, level, file, function, line, obj, message, *user_data):
+        if category.get_name() != self.TRACER_CATEGORY:
+            # GST_DEBUG output keeps working while tracing, and after stop() if this function couldn't be removed
+            if self._removed_default_log:
+                Gst.debug_log_default(category, level, file, function, line, obj, message, None)
+            return
+        if self._active:
+            self.record(message.get())
+
+    def record(self, text: str):
+        if text.startswith("element-latency,"):
+            structure = Gst.Structure.new_from_string(text)
+            valid, latency_ns = structure.get_uint64("time")
+            element = structure.get_string("element")
+            if valid and element:
+                with self._lock:
+                    self._elements.setdefault(element, LatencyStats()).add(latency_ns)
+        elif text.startswith("latency,"):
+            structure = Gst.Structure.new_from_string(text)
+            valid, latency_ns = structure.get_uint64("time")
+            path = (structure.get_string("src-element"), structure.get_string("sink-element"))
+            if valid and all(path):
+                with self._lock:
+                    self._paths.setdefault(path, LatencyStats()).add(latency_ns)
+
+    def report(self, pipeline: typing.Optional[Gst.Pipeline] = None) -> LatencyReport:
+        with self._lock:
+            elements = {name: self._copy(stats) for name, stats in self._elements.items()}
+            paths = {path: self._copy(stats) for path, stats in self._paths.items()}
+
+        owners: dict[str, float] = {}
+        for name, stats in elements.items():
+            owner = self._owners.get(name, name)
+            owners[owner] = owners.get(owner, 0.) + stats.mean_ns
+
+        return LatencyReport(
+            pipeline=query_latency(pipeline) if pipeline is not None else None,
+            elements=elements,
+            owners=owners,
+            paths=paths,
+        )
+
+    @staticmethod
+    def _copy(stats: LatencyStats) -> LatencyStats:
+        copy = LatencyStats()
+        copy.count, copy.total_ns, copy.min_ns, copy.max_ns = stats.count, stats.total_ns, stats.min_ns, stats.max_ns
+        return copy
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import array
+import math
+import time
+import typing
+
+from digimix.audio import Gst
+from digimix.audio.pipeline import Topology
+
+MS_NS = 1000 * 1000
+
+
+class MeterSnapshot(typing.NamedTuple):
+    sequence: int
+    names: tuple[str, ...]
+    channels: tuple[int, ...]
+    peak_db: tuple[float, ...]
+    rms_db: tuple[float, ...]
+    decay_db: tuple[float, ...]
+    clip: tuple[bool, ...]
+
+    def slot(self, name: str) -> dict[str, tuple]:
+        index = self.names.index(name)
+        width = len(self.peak_db) // len(self.names)
+        values = slice(index * width, index * width + self.channels[index])
+        return {
+            "peak_db": self.peak_db[values],
+            "rms_db": self.rms_db[values],
+            "decay_db": self.decay_db[values],
+            "clip": self.clip[values],
+        }
+
+
+class MeterBank:
+    CLIP_THRESHOLD_DB = 0.
+    CLIP_HOLD_S = 2.
+
+    def __init__(self, names: typing.Sequence[str], max_channels: int = 2):
+        self._names = tuple(names)
+        self._index = {name: i for i, name in enumerate(self._names)}
+        if len(self._index) != len(self._names):
+            raise ValueError(f"Meter names must be unique: {self._names}")
+        self._max_channels = int(max_channels)
+
+        size = len(self._names) * self._max_channels
+        self._channels = array.array('i', [0] * len(self._names))
+        self._peak = array.array('d', [-math.inf] * size)
+        self._rms = array.array('d', [-math.inf] * size)
+        self._decay = array.array('d', [-math.inf] * size)
+        self._clip_until = array.array('d', [0.] * size)
+
+        # seqlock: odd while the single writer updates, readers retry instead of blocking it
+        self._sequence = 0
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        return self._names
+
+    @property
+    def max_channels(self) -> int:
+        return self._max_channels
+
+    def index(self, name: str) -> int:
+        return self._index[name]
+
+    def update(
+        self,
+        index: int,
+        peak_db: typing.Sequence[float],
+        rms_db: typing.Sequence[float],
+        decay_db: typing.Sequence[float],
+        now: typing.Optional[float] = None,
+    ):
+        if now is None:
+            now = time.monotonic()
+        channels = min(len(peak_db), self._max_channels)
+        offset = index * self._max_channels
+
+        self._sequence += 1
+        self._channels[index] = channels
+        for i in range(channels):
+            self._peak[offset + i] = peak_db[i]
+            self._rms[offset + i] = rms_db[i]
+            self._decay[offset + i] = decay_db[i]
+            if peak_db[i] >= self.CLIP_THRESHOLD_DB:
+                self._clip_until[offset + i] = now + self.CLIP_HOLD_S
+        self._sequence += 1
+
+    def reset_clip(self):
+        self._sequence += 1
+        for i in range(len(self._clip_until)):
+            self._clip_until[i] = 0.
+        self._sequence += 1
+
+    def snapshot(self, now: typing.Optional[float] = None) -> MeterSnapshot:
+        if now is None:
+            now = time.monotonic()
+        while True:
+            sequence = self._sequence
+            if sequence & 1:
+                time.sleep(0)
+                continue
+            channels = tuple(self._channels)
+            peak = tuple(self._peak)
+            rms = tuple(self._rms)
+            decay = tuple(self._decay)
+            clip_until = tuple(self._clip_until)
+            if sequence == self._sequence:
+                break
+
+        return MeterSnapshot(
+            sequence=sequence // 2,
+            names=self._names,
+            channels=channels,
+            peak_db=peak,
+            rms_db=rms,
+            decay_db=decay,
+            clip=tuple(until > now for until in clip_until),
+        )
+
+
+class MeteringService:
+    LEVEL_FACTORY = "level"
+
+    def __init__(self, topology: Topology, interval_ns: int = 33 * MS_NS, max_channels: int = 2):
+        self._interval_ns = int(interval_ns)
+
+        owners = topology.owners
+        self._levels = {
+            name: owners[name].name
+            for name, element in topology.graph.elements.items()
+            if element.factory == self.LEVEL_FACTORY
+        }
+        self._bank = MeterBank(list(self._levels.values()), max_channels=max_channels)
+        self._slots = {name: self._bank.index(owner) for name, owner in self._levels.items()}
+
+        self._bus: typing.Optional[Gst.Bus] = None
+        self._handler_id: typing.Optional[int] = None
+
+    @property
+    def bank(self) -> MeterBank:
+        return self._bank
+
+    @property
+    def interval_ns(self) -> int:
+        return self._interval_ns
+
+    def snapshot(self) -> MeterSnapshot:
+        return self._bank.snapshot()
+
+    def attach_pipeline(self, pipeline: Gst.Pipeline):
+        for name in self._levels:
+            level = pipeline.get_by_name(name)
+            if level is None:
+                raise RuntimeError(f"Couldn't find level element {name}")
+            level.set_property("interval", self._interval_ns)
+            level.set_property("post-messages", True)
+
+        self._bus = pipeline.get_bus()
+        self._bus.add_signal_watch()
+        self._handler_id = self._bus.connect("message::element", self._on_element_message)
+
+    def detach(self):
+        if self._bus is not None:
+            self._bus.disconnect(self._handler_id)
+            self._bus.remove_signal_watch()
+            self._bus = None
+
+    def _on_element_message(self, _, message: Gst.Message):
+        slot = self._slots.get(message.src.get_name())
+        if slot is None:
+            return
+        structure = message.get_structure()
+        self._bank.update(
+            slot,
+            structure.get_value("peak"),
+            structure.get_value("rms"),
+            structure.get_value("decay"),
+        )
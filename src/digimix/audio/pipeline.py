@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import typing
+
+from digimix.audio import Gst
+from digimix.audio.base import GstElement, ThreadDomain
+from digimix.audio.builder import ChainItem, DescriptionBuilder, GraphBuilder, GraphModel, ObjectBuilder, PadRef
+from digimix.audio.formats import INTERNAL_FORMAT, SampleFormat
+from digimix.audio.profiles import BufferingReport, LatencyProfile, byte_rate
+from digimix.audio.scheduler import ParameterScheduler
+
+T = typing.TypeVar('T', bound=GstElement)
+
+
+class DomainEdge(GstElement):
+    # one queue per upstream and thread domain, shared by all consumers of that domain
+    def __init__(self, upstream: PadRef, domain: ThreadDomain, consumers: typing.Sequence[str]):
+        pad = f"-{upstream.pad}" if upstream.pad is not None else ""
+        super().__init__(f"{domain.name}-{upstream.element}{pad}")
+        self._source = upstream
+        self._consumers = tuple(consumers)
+        self.thread_domain = domain
+
+    @property
+    def source(self) -> PadRef:
+        return self._source
+
+    @property
+    def consumers(self) -> tuple[str, ...]:
+        return self._consumers
+
+    @property
+    def sink(self) -> list[str]:
+        return [f"domain-queue-{self.name}"]
+
+    @property
+    def src(self) -> list[str]:
+        return [f"domain-src-{self.name}"]
+
+    def build(self, builder: GraphBuilder):
+        builder.chain(
+            self._queue(builder, self.sink[0]),
+            builder.element("tee", self.src[0]),
+        )
+
+
+class _EdgeBuilder(GraphBuilder):
+    # links into a shared domain edge are taken from its tee instead of the upstream element
+    def __init__(self, builder: GraphBuilder, edges: typing.Sequence[DomainEdge]):
+        self._builder = builder
+        self._edges = {consumer: edge for edge in edges for consumer in edge.consumers}
+
+    def element(self, factory: str, name: str, **properties) -> str:
+        return self._builder.element(factory, name, **properties)
+
+    def bin(self, name: str):
+        return self._builder.bin(name)
+
+    def chain(self, *items: ChainItem):
+        refs = [item if isinstance(item, PadRef) else PadRef(str(item)) for item in items]
+        segment = refs[:1]
+        for ref in refs[1:]:
+            edge = self._edges.get(ref.element)
+            if edge is not None and segment[-1] == edge.source:
+                if len(segment) > 1:
+                    self._builder.chain(*segment[:-1])
+                segment = [PadRef(edge.src[0])]
+            segment.append(ref)
+        self._builder.chain(*segment)
+
+
+class Topology:
+    def __init__(
+        self,
+        name: str = 'digimix',
+        profile: typing.Optional[LatencyProfile] = None,
+        sample_format: SampleFormat = INTERNAL_FORMAT,
+    ):
+        self._name = str(name)
+        self._profile = profile
+        self._sample_format = sample_format
+        self._elements: list[GstElement] = []
+        self._links: list[tuple[str, str]] = []
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def profile(self) -> typing.Optional[LatencyProfile]:
+        return self._profile
+
+    @profile.setter
+    def profile(self, new_profile: LatencyProfile):
+        self._profile = new_profile
+        for element in self._elements:
+            element.profile = new_profile
+
+    @property
+    def sample_format(self) -> SampleFormat:
+        return self._sample_format
+
+    @sample_format.setter
+    def sample_format(self, new_sample_format: SampleFormat):
+        self._sample_format = new_sample_format
+        for element in self._elements:
+            element.sample_format = new_sample_format
+
+    @property
+    def elements(self) -> tuple[GstElement, ...]:
+        return tuple(self._elements)
+
+    @property
+    def links(self) -> tuple[tuple[str, str], ...]:
+        return tuple(self._links)
+
+    def add(self, element: T) -> T:
+        if any(element.name == known.name and type(element) is type(known) for known in self._elements):
+            raise ValueError(f"{element.__class__.__name__} named {element.name} already added")
+        if self._profile is not None:
+            element.profile = self._profile
+        element.sample_format = self._sample_format
+        self._elements.append(element)
+        return element
+
+    def link(self, src: str, sink: str):
+        self._links.append((src, sink))
+
+    def assign(self, domain: typing.Optional[ThreadDomain], *elements: GstElement):
+        for element in elements:
+            element.thread_domain = domain
+
+    def _resolve_upstream(self) -> list[DomainEdge]:
+        if all(element.thread_domain is None for element in self._elements):
+            return []
+        owners = self._element_owners()
+        upstream = dict(owners)
+        upstream.update({sink: owners[src] for src, sink in self._links if src in owners})
+        for element in self._elements:
+            element.upstream = upstream
+
+        edges = self._domain_edges(owners)
+        for edge in edges:
+            upstream.update(dict.fromkeys(edge.consumers, edge))
+        return edges
+
+    def _domain_edges(self, owners: typing.Mapping[str, GstElement]) -> list[DomainEdge]:
+        graph = GraphModel()
+        for element in self._elements:
+            element.build(graph)
+        for src, sink in self._links:
+            graph.link(src, sink)
+
+        consumers: dict[tuple[PadRef, ThreadDomain], list[str]] = {}
+        for src, sink in graph.links:
+            source, consumer = owners.get(src.element), owners.get(sink.element)
+            if consumer is None or consumer.thread_domain is None or graph.elements[sink.element].factory != "queue":
+                continue
+            if source is not None and source.thread_domain == consumer.thread_domain:
+                continue
+            consumers.setdefault((src, consumer.thread_domain), []).append(sink.element)
+
+        edges = []
+        for (src, domain), sinks in consumers.items():
+            # a single consumer keeps its own queue
+            if len(sinks) > 1:
+                edge = DomainEdge(src, domain, sinks)
+                edge.profile = self._profile or edge.profile
+                edge.sample_format = self._sample_format
+                edges.append(edge)
+        return edges
+
+    def build(self, builder: GraphBuilder):
+        edges = self._resolve_upstream()
+        for edge in edges:
+            edge.build(builder)
+        edge_builder = _EdgeBuilder(builder, edges)
+        for element in self._elements:
+            element.build(edge_builder)
+        for src, sink in self._links:
+            edge_builder.link(src, sink)
+        for edge in edges:
+            builder.link(edge.source.element, edge.sink[0], src_pad=edge.source.pad)
+
+    @property
+    def pipeline_description(self) -> str:
+        builder = DescriptionBuilder()
+        self.build(builder)
+        return builder.description
+
+    @property
+    def graph(self) -> GraphModel:
+        graph = GraphModel()
+        self.build(graph)
+        return graph
+
+    def _element_owners(self) -> dict[str, GstElement]:
+        owners = {}
+        for element in self._elements:
+            graph = GraphModel()
+            element.build(graph)
+            owners.update(dict.fromkeys(graph.elements, element))
+        return owners
+
+    @property
+    def owners(self) -> dict[str, GstElement]:
+        owners = self._element_owners()
+        for edge in self._resolve_upstream():
+            owners.update(dict.fromkeys(edge.sink + edge.src, edge))
+        return owners
+
+    def buffering_report(
+        self,
+        sample_rate: typing.Optional[int] = None,
+        channels: int = 2,
+        sample_width: typing.Optional[int] = None,
+    ) -> BufferingReport:
+        rate = byte_rate(
+            sample_rate or self._sample_format.rate,
+            channels,
+            sample_width or self._sample_format.sample_width,
+        )
+        return BufferingReport.from_graph(self.graph, rate)
+
+    def create_pipeline(self) -> Gst.Pipeline:
+        pipeline = Gst.Pipeline.new(self._name)
+        builder = ObjectBuilder(pipeline)
+        self.build(builder)
+        builder.finish()
+        return pipeline
+
+    def parse_launch(self) -> Gst.Pipeline:
+        pipeline = Gst.parse_launch(self.pipeline_description)
+        pipeline.set_name(self._name)
+        return pipeline
+
+    def attach_pipeline(self, pipeline: Gst.Pipeline, scheduler: typing.Optional[ParameterScheduler] = None):
+        for element in self._elements:
+            element.attach_pipeline(pipeline)
+            element.scheduler = scheduler
@@ -0,0 +1,141 @@
+import enum
+import math
+import typing
+
+from digimix.audio.builder import ElementModel, GraphModel
+
+MS_NS = 1000 * 1000
+KIB = 1024
+
+QUEUE_DEFAULT_MAX_SIZE_TIME_NS = 1000 * MS_NS
+QUEUE_DEFAULT_MAX_SIZE_BYTES = 10 * KIB * KIB
+MIXER_DEFAULT_OUTPUT_BUFFER_DURATION_NS = 10 * MS_NS
+
+
+@enum.unique
+class QueueLeaky(enum.IntEnum):
+    NO = 0
+    UPSTREAM = 1
+    DOWNSTREAM = 2
+
+
+class LatencyProfile(typing.NamedTuple):
+    name: str
+    queue_max_size_time_ns: int
+    queue_max_size_buffers: int
+    queue_max_size_bytes: int
+    queue_leaky: QueueLeaky
+    mixer_latency_ns: int
+    mixer_output_buffer_duration_ns: int
+
+    @property
+    def queue_properties(self) -> dict:
+        return {
+            "max_size_time": self.queue_max_size_time_ns,
+            "max_size_buffers": self.queue_max_size_buffers,
+            "max_size_bytes": self.queue_max_size_bytes,
+            "leaky": self.queue_leaky,
+        }
+
+    @property
+    def mixer_properties(self) -> dict:
+        return {
+            "latency": self.mixer_latency_ns,
+            "output_buffer_duration": self.mixer_output_buffer_duration_ns,
+        }
+
+
+# LIVE trades audio for latency: a full queue drops its oldest buffer instead of blocking the JACK thread,
+# DropoutWatchdog counts those drops as "overrun" per owner
+LIVE = LatencyProfile(
+    name='live',
+    queue_max_size_time_ns=20 * MS_NS,
+    queue_max_size_buffers=0,
+    queue_max_size_bytes=64 * KIB,
+    queue_leaky=QueueLeaky.DOWNSTREAM,
+    mixer_latency_ns=0,
+    mixer_output_buffer_duration_ns=5 * MS_NS,
+)
+SAFE = LatencyProfile(
+    name='safe',
+    queue_max_size_time_ns=200 * MS_NS,
+    queue_max_size_buffers=0,
+    queue_max_size_bytes=KIB * KIB,
+    queue_leaky=QueueLeaky.NO,
+    mixer_latency_ns=10 * MS_NS,
+    mixer_output_buffer_duration_ns=10 * MS_NS,
+)
+OFFLINE = LatencyProfile(
+    name='offline',
+    queue_max_size_time_ns=3000 * MS_NS,
+    queue_max_size_buffers=0,
+    queue_max_size_bytes=0,
+    queue_leaky=QueueLeaky.NO,
+    mixer_latency_ns=0,
+    mixer_output_buffer_duration_ns=10 * MS_NS,
+)
+
+PROFILES: dict[str, LatencyProfile] = {profile.name: profile for profile in (LIVE, SAFE, OFFLINE)}
+DEFAULT_PROFILE = SAFE
+
+
+def byte_rate(sample_rate: int = 48000, channels: int = 2, sample_width: int = 4) -> int:
+    return sample_rate * channels * sample_width
+
+
+def _queue_limits(element: ElementModel, rate: int) -> tuple[float, float]:
+    max_time_ns = element.properties.get("max-size-time", QUEUE_DEFAULT_MAX_SIZE_TIME_NS)
+    max_bytes = element.properties.get("max-size-bytes", QUEUE_DEFAULT_MAX_SIZE_BYTES)
+
+    time_ns = [max_time_ns] if max_time_ns else []
+    size = [max_bytes] if max_bytes else []
+    if max_bytes:
+        time_ns.append(max_bytes * 1e9 / rate)
+    if max_time_ns:
+        size.append(max_time_ns * rate / 1e9)
+
+    return min(time_ns, default=math.inf), min(size, default=math.inf)
+
+
+def buffering_ns(element: ElementModel, rate: int) -> float:
+    if element.factory == "queue":
+        return _queue_limits(element, rate)[0]
+    if element.factory in ("audiomixer", "audiointerleave"):
+        return (
+            element.properties.get("latency", 0)
+            + element.properties.get("output-buffer-duration", MIXER_DEFAULT_OUTPUT_BUFFER_DURATION_NS)
+        )
+    if element.factory in ("jackaudiosrc", "jackaudiosink"):
+        return element.properties.get("buffer-time", 0) * 1000
+    return 0
+
+
+class BufferingReport(typing.NamedTuple):
+    queue_count: int
+    worst_case_latency_ns: float
+    memory_ceiling_bytes: float
+    critical_path: tuple[str, ...]
+
+    @classmethod
+    def from_graph(cls, graph: GraphModel, rate: int = byte_rate()) -> 'BufferingReport':
+        elements = graph.elements
+        downstream = graph.downstream()
+
+        longest: dict[str, tuple[float, tuple[str, ...]]] = {}
+
+        def visit(name: str) -> tuple[float, tuple[str, ...]]:
+            if name not in longest:
+                own = buffering_ns(elements[name], rate) if name in elements else 0
+                tail = max((visit(sink) for sink in downstream.get(name, ())), default=(0, ()))
+                longest[name] = (own + tail[0], (name,) + tail[1])
+            return longest[name]
+
+        worst = max((visit(name) for name in downstream), default=(0, ()))
+
+        queues = [element for element in elements.values() if element.factory == "queue"]
+        return cls(
+            queue_count=len(queues),
+            worst_case_latency_ns=worst[0],
+            memory_ceiling_bytes=sum(_queue_limits(queue, rate)[1] for queue in queues),
+            critical_path=tuple(name for name in worst[1] if name in elements and buffering_ns(elements[name], rate)),
+        )
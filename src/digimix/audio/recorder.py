@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+import collections
+import os
+import threading
+import time
+import typing
+
+from digimix.audio import Gst
+from digimix.audio.buses import MasterBus
+from digimix.audio.builder import ObjectBuilder
+from digimix.audio.channels import FaderChannel
+from digimix.audio.formats import INTERNAL_FORMAT, SampleFormat
+from digimix.audio.pipeline import Topology
+from digimix.audio.profiles import QueueLeaky
+from digimix.audio.tracks import RecordFormat, TrackWriter
+
+MS_NS = 1000 * 1000
+
+
+class RecordingGap(typing.NamedTuple):
+    track: str
+    at_ns: int
+    duration_ns: int
+    # "upstream": the leaky queue dropped buffers, "overflow": the writer fell behind
+    reason: str
+
+
+class TrackReport(typing.NamedTuple):
+    name: str
+    path: typing.Optional[str]
+    frames: int
+    dropped_buffers: int
+    dropped_bytes: int
+    gaps: tuple[RecordingGap, ...]
+    # set once writing the track failed, everything after that is dropped
+    error: typing.Optional[str] = None
+
+
+class RecordingReport(typing.NamedTuple):
+    directory: str
+    tracks: tuple[TrackReport, ...]
+    wall_s: float
+
+    @property
+    def gaps(self) -> tuple[RecordingGap, ...]:
+        return tuple(gap for track in self.tracks for gap in track.gaps)
+
+    @property
+    def failed(self) -> tuple[TrackReport, ...]:
+        return tuple(track for track in self.tracks if track.error is not None)
+
+    def format(self) -> str:
+        lines = [
+            f"recorded {len(self.tracks)} tracks into {self.directory} in {self.wall_s:.1f}s, gaps: {len(self.gaps)}"
+        ]
+        for track in self.tracks:
+            lines.append(
+                f"  {track.name}: {track.frames} frames, {track.dropped_buffers} dropped buffers, "
+                f"{track.dropped_bytes} dropped bytes"
+            )
+            if track.error is not None:
+                lines.append(f"    failed: {track.error}")
+            for gap in track.gaps:
+                lines.append(f"    gap at {gap.at_ns / 1e9:.3f}s for {gap.duration_ns / MS_NS:.1f}ms ({gap.reason})")
+        return '\n'.join(lines)
+
+
+class RecordingTrack:
+    DETACH_TIMEOUT_S = 2.
+
+    def __init__(self, name: str, tap: str, max_pending_bytes: int, sample_format: SampleFormat = INTERNAL_FORMAT):
+        self._name = str(name)
+        self._tap = str(tap)
+        self._max_pending_bytes = int(max_pending_bytes)
+        self._sample_format = sample_format
+        self._rate = sample_format.rate
+        self._frame_size: typing.Optional[int] = None
+
+        self._lock = threading.Lock()
+        self._pending: collections.deque[bytes] = collections.deque()
+        self._pending_bytes = 0
+        self._overflowed = False
+        self._next_pts: typing.Optional[int] = None
+        self._channels: typing.Optional[int] = None
+        self._gaps: list[RecordingGap] = []
+        self._dropped_buffers = 0
+        self._dropped_bytes = 0
+        self._error: typing.Optional[str] = None
+
+        self._writer: typing.Optional[TrackWriter] = None
+        self._tee_pad: typing.Optional[Gst.Pad] = None
+        self._branch: typing.Optional[Gst.Bin] = None
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def tap(self) -> str:
+        return self._tap
+
+    @property
+    def bin_name(self) -> str:
+        return f"bin-recorder-{self._name}"
+
+    def on_new_sample(self, sink: Gst.Element) -> Gst.FlowReturn:
+        # streaming thread of the branch queue: copy and hand over, never wait for the disk
+        sample = sink.emit("pull-sample")
+        if sample is None:
+            return Gst.FlowReturn.EOS
+        buffer = sample.get_buffer()
+        if self._channels is None:
+            # format and rate are fixed by the appsink caps, only the channel count comes from the tap
+            self._channels = sample.get_caps().get_structure(0).get_int("channels")[1]
+            self._frame_size = self._channels * self._sample_format.sample_width
+        data = buffer.extract_dup(0, buffer.get_size())
+
+        with self._lock:
+            if self._pending_bytes + len(data) > self._max_pending_bytes:
+                self._dropped_buffers += 1
+                self._dropped_bytes += len(data)
+                self._overflowed = True
+                return Gst.FlowReturn.OK
+
+            if self._next_pts is not None and buffer.pts > self._next_pts:
+                # silence keeps the tracks sample aligned with each other
+                gap_ns = buffer.pts - self._next_pts
+                frames = gap_ns * self._rate // Gst.SECOND
+                self._pending.append(bytes(frames * self._frame_size))
+                self._pending_bytes += frames * self._frame_size
+                reason = "overflow" if self._overflowed else "upstream"
+                self._gaps.append(RecordingGap(self._name, self._next_pts, gap_ns, reason))
+            self._overflowed = False
+            self._next_pts = buffer.pts + len(data) // self._frame_size * Gst.SECOND // self._rate
+            self._pending.append(data)
+            self._pending_bytes += len(data)
+        return Gst.FlowReturn.OK
+
+    def take(self) -> bytes:
+        with self._lock:
+            chunks, self._pending = self._pending, collections.deque()
+            self._pending_bytes = 0
+        return b''.join(chunks)
+
+    @property
+    def error(self) -> typing.Optional[str]:
+        return self._error
+
+    def fail(self, error: str, dropped_bytes: int = 0):
+        with self._lock:
+            if self._error is None:
+                self._error = error
+            self._dropped_bytes += dropped_bytes
+
+    def flush(self, directory: str, record_format: RecordFormat) -> int:
+        data = self.take()
+        if not data:
+            return 0
+        if self._error is not None:
+            self.fail(self._error, len(data))
+            return 0
+        try:
+            if self._writer is None:
+                path = os.path.join(directory, f"{self._name}.{record_format.extension}")
+                self._writer = record_format.open(path, self._channels, self._sample_format)
+            self._writer.write(data)
+        except Exception as e:
+            # a full disk or a broken writer only costs this track, the other tracks keep writing
+            self.fail(f"{e.__class__.__name__}: {e}", len(data))
+            return 0
+        return len(data)
+
+    def report(self) -> TrackReport:
+        with self._lock:
+            gaps = tuple(self._gaps)
+            dropped_bytes = self._dropped_bytes
+            error = self._error
+        return TrackReport(
+            name=self._name,
+            path=self._writer.path if self._writer is not None else None,
+            frames=self._writer.frames if self._writer is not None else 0,
+            dropped_buffers=self._dropped_buffers,
+            dropped_bytes=dropped_bytes,
+            gaps=gaps,
+            error=error,
+        )
+
+    def close(self):
+        if self._writer is None:
+            return
+        try:
+            self._writer.close()
+        except Exception as e:
+            self.fail(f"{e.__class__.__name__}: {e}")
+
+    def attach(self, pipeline: Gst.Pipeline, queue_time_ns: int, max_buffers: int):
+        tee = pipeline.get_by_name(self._tap)
+        if tee is None:
+            raise RuntimeError(f"Couldn't find tee {self._tap}")
+
+        builder = ObjectBuilder(pipeline)
+        with builder.bin(self.bin_name):
+            builder.chain(
+                builder.element(
+                    "queue",
+                    f"recorder-queue-{self._name}",
+                    max_size_time=queue_time_ns,
+                    max_size_buffers=0,
+                    max_size_bytes=0,
+                    leaky=QueueLeaky.DOWNSTREAM,
+                ),
+                builder.element(
+                    "appsink",
+                    f"recorder-sink-{self._name}",
+                    caps=self._sample_format.format_info,
+                    sync=False,
+                    # a branch added to a playing pipeline must not wait for preroll
+                    async_=False,
+                    drop=True,
+                    max_buffers=max_buffers,
+                    emit_signals=True,
+                ),
+            )
+        builder.finish()
+        self._branch = builder.elements[self.bin_name]
+        queue = builder.elements[f"recorder-queue-{self._name}"]
+        sink = builder.elements[f"recorder-sink-{self._name}"]
+        sink.connect("new-sample", self.on_new_sample)
+
+        ghost = Gst.GhostPad.new("sink", queue.get_static_pad("sink"))
+        self._branch.add_pad(ghost)
+        self._tee_pad = tee.get_request_pad("src_%u")
+        if self._tee_pad.link(ghost) != Gst.PadLinkReturn.OK:
+            raise RuntimeError(f"Couldn't link {self._tap} to {self.bin_name}")
+        self._branch.sync_state_with_parent()
+
+    def detach(self, pipeline: Gst.Pipeline):
+        if self._tee_pad is None:
+            return
+        tee = self._tee_pad.get_parent_element()
+        detached = threading.Event()
+
+        def unlink(pad: Gst.Pad, _) -> Gst.PadProbeReturn:
+            pad.unlink(self._branch.get_static_pad("sink"))
+            detached.set()
+            return Gst.PadProbeReturn.REMOVE
+
+        # the tee src pad is idle between two buffers, unlinking there never stalls the live path
+        probe = self._tee_pad.add_probe(Gst.PadProbeType.IDLE, unlink)
+        if not detached.wait(self.DETACH_TIMEOUT_S):
+            # the branch stays attached, its leaky queue keeps it from blocking the tee
+            self._tee_pad.remove_probe(probe)
+            raise RuntimeError(f"Couldn't detach {self.bin_name} within {self.DETACH_TIMEOUT_S}s")
+        tee.release_request_pad(self._tee_pad)
+        self._branch.set_state(Gst.State.NULL)
+        pipeline.remove(self._branch)
+        self._tee_pad = None
+        self._branch = None
+
+
+class Recorder:
+    QUEUE_TIME_NS = 2000 * MS_NS
+    APPSINK_MAX_BUFFERS = 64
+    MAX_PENDING_BYTES = 64 * 1024 * 1024
+    FLUSH_INTERVAL_S = 0.5
+
+    def __init__(
+        self,
+        taps: typing.Mapping[str, str],
+        record_format: RecordFormat = RecordFormat.W64,
+        sample_format: SampleFormat = INTERNAL_FORMAT,
+    ):
+        self._taps = dict(taps)
+        self._record_format = record_format
+        self._sample_format = sample_format
+        self._pipeline: typing.Optional[Gst.Pipeline] = None
+        self._tracks: list[RecordingTrack] = []
+        self._directory: typing.Optional[str] = None
+        self._started = 0.
+        self._stop = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+
+    @classmethod
+    def for_topology(
+        cls,
+        topology: Topology,
+        record_format: RecordFormat = RecordFormat.W64,
+        buses: bool = True,
+    ) -> 'Recorder':
+        taps = {}
+        for element in topology.elements:
+            if isinstance(element, FaderChannel):
+                taps[element.name] = f"fader_channel-pre_fader-{element.name}"
+            elif buses and isinstance(element, MasterBus):
+                taps[element.name] = element.src[0]
+        return cls(taps, record_format=record_format, sample_format=topology.sample_format)
+
+    @property
+    def taps(self) -> typing.Mapping[str, str]:
+        return self._taps
+
+    @property
+    def recording(self) -> bool:
+        return self._thread is not None
+
+    def attach_pipeline(self, pipeline: Gst.Pipeline):
+        self._pipeline = pipeline
+
+    def start(self, directory: str):
+        if self._pipeline is None:
+            raise RuntimeError("Recorder needs attach_pipeline before start")
+        if self.recording:
+            raise RuntimeError(f"Already recording into {self._directory}")
+        os.makedirs(directory, exist_ok=True)
+        self._directory = str(directory)
+        self._tracks = [
+            RecordingTrack(name, tap, self.MAX_PENDING_BYTES, self._sample_format) for name, tap in self._taps.items()
+        ]
+        for track in self._tracks:
+            track.attach(self._pipeline, self.QUEUE_TIME_NS, self.APPSINK_MAX_BUFFERS)
+
+        self._started = time.monotonic()
+        self._stop.clear()
+        self._thread = threading.Thread(name="recorder-writer", target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        # one large write per track and interval instead of one per buffer
+        while not self._stop.wait(self.FLUSH_INTERVAL_S):
+            self._flush()
+
+    def _flush(self):
+        for track in self._tracks:
+            track.flush(self._directory, self._record_format)
+
+    def report(self) -> RecordingReport:
+        return RecordingReport(
+            directory=self._directory or '',
+            tracks=tuple(track.report() for track in self._tracks),
+            wall_s=time.monotonic() - self._started if self._started else 0.,
+        )
+
+    def stop(self) -> RecordingReport:
+        if not self.recording:
+            raise RuntimeError("Not recording")
+        for track in self._tracks:
+            try:
+                track.detach(self._pipeline)
+            except RuntimeError as e:
+                track.fail(str(e))
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._flush()
+        for track in self._tracks:
+            track.close()
+        return self.report()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import time
+import typing
+
+from digimix.audio import Gst
+from digimix.audio.base import GstElement
+from digimix.audio.pipeline import Topology
+
+S_NS = 1000 * 1000 * 1000
+
+
+class ParameterChange(typing.NamedTuple):
+    at_ns: int
+    element: GstElement
+    attribute: str
+    value: typing.Any
+
+    def apply(self):
+        with self.element.scheduled_at(self.at_ns):
+            setattr(self.element, self.attribute, self.value)
+
+
+class ParameterScript:
+    def __init__(self, changes: typing.Iterable[ParameterChange] = ()):
+        self._changes: list[ParameterChange] = []
+        for change in changes:
+            self.add(change)
+
+    @classmethod
+    def parse(cls, text: str, topology: Topology) -> 'ParameterScript':
+        # one change per line: <seconds> <element name> <attribute> <value>, '#' starts a comment
+        script = cls()
+        for number, line in enumerate(text.splitlines(), start=1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            try:
+                seconds, element_name, attribute, value = line.split()
+            except ValueError:
+                raise ValueError(f"Line {number}: expected '<seconds> <element> <attribute> <value>', got {line!r}")
+
+            candidates = (element for element in topology.elements if element.name == element_name)
+            element = next((element for element in candidates if hasattr(element, attribute)), None)
+            if element is None:
+                raise ValueError(f"Line {number}: no element {element_name} with attribute {attribute}")
+
+            script.add(ParameterChange(round(float(seconds) * S_NS), element, attribute, cls._parse_value(value)))
+        return script
+
+    @staticmethod
+    def _parse_value(value: str):
+        if value.lower() in ("true", "false"):
+            return value.lower() == "true"
+        return float(value)
+
+    @property
+    def changes(self) -> tuple[ParameterChange, ...]:
+        return tuple(self._changes)
+
+    def add(self, change: ParameterChange):
+        if change.at_ns < 0:
+            raise ValueError(f"Parameter changes can't be scheduled before the start: {change}")
+        self._changes.append(change)
+        self._changes.sort(key=lambda known: known.at_ns)
+
+    def apply(self):
+        for change in self._changes:
+            change.apply()
+
+    def __len__(self) -> int:
+        return len(self._changes)
+
+
+class RenderResult(typing.NamedTuple):
+    audio_ns: int
+    wall_s: float
+    cpu_s: float
+
+    @property
+    def realtime_factor(self) -> float:
+        return self.audio_ns / S_NS / self.wall_s if self.wall_s else float('inf')
+
+    def __str__(self) -> str:
+        return f"rendered {self.audio_ns / S_NS:.3f}s of audio in {self.wall_s:.3f}s " \
+               f"({self.realtime_factor:.1f}x realtime, {self.cpu_s:.3f}s cpu)"
+
+
+def render(topology: Topology, script: typing.Optional[ParameterScript] = None) -> RenderResult:
+    pipeline = topology.create_pipeline()
+    topology.attach_pipeline(pipeline)
+    try:
+        # queued before preroll, so changes at 0 already apply to the first buffers
+        if script is not None:
+            script.apply()
+
+        pipeline.set_state(Gst.State.PAUSED)
+        result, _, _ = pipeline.get_state(Gst.CLOCK_TIME_NONE)
+        if result == Gst.StateChangeReturn.FAILURE:
+            raise RuntimeError(f"Couldn't preroll {topology.name}")
+        valid, duration_ns = pipeline.query_duration(Gst.Format.TIME)
+
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        pipeline.set_state(Gst.State.PLAYING)
+        message = pipeline.get_bus().timed_pop_filtered(
+            Gst.CLOCK_TIME_NONE,
+            Gst.MessageType.EOS | Gst.MessageType.ERROR,
+        )
+        wall_s, cpu_s = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+        if message.type == Gst.MessageType.ERROR:
+            error, debug = message.parse_error()
+            raise RuntimeError(f"Rendering {topology.name} failed: {error.message} ({debug})")
+        if not valid:
+            valid, duration_ns = pipeline.query_position(Gst.Format.TIME)
+
+        return RenderResult(duration_ns if valid else 0, wall_s, cpu_s)
+    finally:
+        pipeline.set_state(Gst.State.NULL)
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import enum
+import json
+import typing
+
+from digimix.audio import Gst
+from digimix.audio.automation import element_running_time
+from digimix.audio.base import GstElement
+from digimix.audio.pipeline import Topology
+
+MS_NS = 1000 * 1000
+
+SceneValues = dict[str, dict[str, typing.Any]]
+
+
+def _normalize(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+class Scene(typing.NamedTuple):
+    name: str
+    values: SceneValues
+
+    def diff(self, target: 'Scene') -> SceneValues:
+        changes: SceneValues = {}
+        for element_name, values in target.values.items():
+            known = self.values.get(element_name, {})
+            changed = {key: value for key, value in values.items() if known.get(key) != value}
+            if changed:
+                changes[element_name] = changed
+        return changes
+
+    def dumps(self) -> str:
+        return json.dumps({"name": self.name, "values": self.values}, separators=(',', ':'), sort_keys=True)
+
+    @classmethod
+    def loads(cls, text: str) -> 'Scene':
+        data = json.loads(text)
+        return cls(data["name"], data["values"])
+
+
+class RecallResult(typing.NamedTuple):
+    scene: str
+    changes: int
+    at_ns: typing.Optional[int]
+    crossfade_ns: int
+
+
+class SceneStore:
+    RECALL_LEAD_NS = 5 * MS_NS
+
+    def __init__(self, topology: Topology, lead_ns: int = RECALL_LEAD_NS):
+        self._elements: dict[str, GstElement] = {}
+        for element in topology.elements:
+            if not element.SCENE_PARAMETERS:
+                continue
+            if element.name in self._elements:
+                raise ValueError(f"Scene parameters of {element.name} would be ambiguous")
+            self._elements[element.name] = element
+
+        self._lead_ns = int(lead_ns)
+        self._scenes: dict[str, Scene] = {}
+        self._pipeline: typing.Optional[Gst.Pipeline] = None
+
+    @property
+    def scenes(self) -> typing.Mapping[str, Scene]:
+        return self._scenes
+
+    def attach_pipeline(self, pipeline: Gst.Pipeline):
+        self._pipeline = pipeline
+
+    def capture(self, name: str) -> Scene:
+        return Scene(name, {
+            element_name: {key: _normalize(getattr(element, key)) for key in element.SCENE_PARAMETERS}
+            for element_name, element in self._elements.items()
+        })
+
+    def save(self, name: str) -> Scene:
+        scene = self._scenes[name] = self.capture(name)
+        return scene
+
+    def add(self, scene: Scene):
+        self._scenes[scene.name] = scene
+
+    def delete(self, name: str):
+        del self._scenes[name]
+
+    def _recall_time_ns(self) -> typing.Optional[int]:
+        if self._pipeline is None or self._pipeline.get_clock() is None:
+            return None
+        return element_running_time(self._pipeline) + self._lead_ns
+
+    def recall(self, name: str, crossfade_ns: int = 0) -> RecallResult:
+        changes = self.capture(name).diff(self._scenes[name])
+
+        # every change is queued at the same running time so the whole scene lands on one buffer
+        at_ns = self._recall_time_ns()
+        count = 0
+        for element_name, values in changes.items():
+            element = self._elements.get(element_name)
+            if element is None:
+                continue
+            if at_ns is None:
+                self._apply(element, values)
+            else:
+                with element.scheduled_at(at_ns, ramp_time_ns=crossfade_ns or None):
+                    self._apply(element, values)
+            count += len(values)
+        return RecallResult(name, count, at_ns, crossfade_ns)
+
+    @staticmethod
+    def _apply(element: GstElement, values: dict[str, typing.Any]):
+        for key, value in values.items():
+            current = getattr(element, key)
+            setattr(element, key, type(current)(value))
+
+    def dump(self, path: str):
+        with open(path, 'w') as scenes_file:
+            for scene in self._scenes.values():
+                scenes_file.write(scene.dumps() + '\n')
+
+    def load(self, path: str):
+        with open(path) as scenes_file:
+            for line in scenes_file:
+                if line.strip():
+                    self.add(Scene.loads(line))
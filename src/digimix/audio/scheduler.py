@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import threading
+import typing
+
+from digimix.audio import GLib
+
+
+class ParameterSchedulerStats(typing.NamedTuple):
+    scheduled: int
+    coalesced: int
+    applied: int
+    flushes: int
+
+
+class ParameterScheduler:
+    DEFAULT_INTERVAL_US = 1_000
+
+    def __init__(self, interval_us: int = DEFAULT_INTERVAL_US, context: typing.Optional[GLib.MainContext] = None):
+        self._interval_us = int(interval_us)
+        self._context = context
+
+        self._lock = threading.Lock()
+        self._pending: dict[typing.Hashable, typing.Callable[[], None]] = {}
+        self._source: typing.Optional[GLib.Source] = None
+
+        self._scheduled = 0
+        self._coalesced = 0
+        self._applied = 0
+        self._flushes = 0
+
+    @property
+    def interval_us(self) -> int:
+        return self._interval_us
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    @property
+    def stats(self) -> ParameterSchedulerStats:
+        with self._lock:
+            return ParameterSchedulerStats(self._scheduled, self._coalesced, self._applied, self._flushes)
+
+    def reset_stats(self):
+        with self._lock:
+            self._scheduled = self._coalesced = self._applied = self._flushes = 0
+
+    def schedule(self, target: typing.Hashable, apply: typing.Callable[[], None]):
+        with self._lock:
+            self._scheduled += 1
+            if target in self._pending:
+                self._coalesced += 1
+            self._pending[target] = apply
+
+            if self._source is None:
+                if self._interval_us > 0:
+                    self._source = GLib.timeout_source_new(max(1, round(self._interval_us / 1000)))
+                else:
+                    self._source = GLib.idle_source_new()
+                self._source.set_priority(GLib.PRIORITY_HIGH)
+                self._source.set_callback(self._on_source)
+                self._source.attach(self._context)
+
+    def _on_source(self, *_) -> bool:
+        with self._lock:
+            self._source = None
+        self.flush()
+        return GLib.SOURCE_REMOVE
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushes += 1
+
+        for apply in pending.values():
+            apply()
+
+        with self._lock:
+            self._applied += len(pending)
+        return len(pending)
+
+    def cancel(self):
+        with self._lock:
+            self._pending.clear()
+            if self._source is not None:
+                self._source.destroy()
+                self._source = None
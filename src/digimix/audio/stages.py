@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import enum
+import typing
+from abc import ABC, abstractmethod
+
+from digimix.audio import Gst
+from digimix.audio.builder import GraphBuilder, Serialized
+from digimix.audio.utils import db_to_amplitude
+
+
+class Stage(ABC):
+    KIND: str
+    FACTORY: str
+
+    def __init__(self, bypass: bool = False):
+        self._bypass = bool(bypass)
+
+    @property
+    def kind(self) -> str:
+        return self.KIND
+
+    @property
+    def bypass(self) -> bool:
+        return self._bypass
+
+    @bypass.setter
+    def bypass(self, new_bypass: bool):
+        self._bypass = bool(new_bypass)
+
+    @property
+    @abstractmethod
+    def properties(self) -> dict:
+        ...
+
+    def element_name(self, channel_name: str) -> str:
+        return f"fader_channel-{self.KIND}-{channel_name}"
+
+    def build(self, builder: GraphBuilder, channel_name: str) -> str:
+        return builder.element(self.FACTORY, self.element_name(channel_name), **self.properties)
+
+    def configure(self, element: Gst.Element):
+        pass
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} bypass={self._bypass}>'
+
+
+class HighPassStage(Stage):
+    KIND = "hpf"
+    FACTORY = "audiocheblimit"
+
+    def __init__(self, cutoff_hz: float = 80., poles: int = 4, bypass: bool = False):
+        super().__init__(bypass)
+        if poles <= 0 or poles % 2:
+            raise ValueError(f"poles must be a positive even number. Given {poles}")
+        self._cutoff_hz = float(cutoff_hz)
+        self._poles = int(poles)
+
+    @property
+    def cutoff_hz(self) -> float:
+        return self._cutoff_hz
+
+    @property
+    def poles(self) -> int:
+        return self._poles
+
+    @property
+    def properties(self) -> dict:
+        return {"mode": Serialized("high-pass"), "cutoff": self._cutoff_hz, "poles": self._poles}
+
+
+@enum.unique
+class EqualizerBandType(enum.Enum):
+    PEAK = "peak"
+    LOW_SHELF = "low-shelf"
+    HIGH_SHELF = "high-shelf"
+
+
+class EqualizerBand(typing.NamedTuple):
+    freq: float
+    bandwidth: float
+    gain_db: float = 0.
+    type: EqualizerBandType = EqualizerBandType.PEAK
+
+
+class EqualizerStage(Stage):
+    KIND = "eq"
+    FACTORY = "equalizer-nbands"
+
+    def __init__(self, bands: typing.Sequence[EqualizerBand], bypass: bool = False):
+        super().__init__(bypass)
+        if not bands:
+            raise ValueError("EqualizerStage needs at least one band")
+        self._bands = tuple(bands)
+
+    @property
+    def bands(self) -> tuple[EqualizerBand, ...]:
+        return self._bands
+
+    @property
+    def properties(self) -> dict:
+        return {"num_bands": len(self._bands)}
+
+    def configure(self, element: Gst.Element):
+        # the bands are child objects, which a pipeline description can't address by index
+        for index, band in enumerate(self._bands):
+            child = element.get_child_by_index(index)
+            child.set_property("freq", band.freq)
+            child.set_property("bandwidth", band.bandwidth)
+            child.set_property("gain", band.gain_db)
+            Gst.util_set_object_arg(child, "type", band.type.value)
+
+
+@enum.unique
+class DynamicsMode(enum.Enum):
+    COMPRESSOR = "compressor"
+    EXPANDER = "expander"
+
+
+@enum.unique
+class DynamicsCharacteristics(enum.Enum):
+    HARD_KNEE = "hard-knee"
+    SOFT_KNEE = "soft-knee"
+
+
+class DynamicsStage(Stage):
+    KIND = "dynamics"
+    FACTORY = "audiodynamic"
+
+    def __init__(
+        self,
+        mode: DynamicsMode = DynamicsMode.COMPRESSOR,
+        threshold_db: float = -20.,
+        ratio: float = 4.,
+        characteristics: DynamicsCharacteristics = DynamicsCharacteristics.SOFT_KNEE,
+        bypass: bool = False,
+    ):
+        super().__init__(bypass)
+        if threshold_db > 0:
+            raise ValueError(f"threshold_db must be <= 0. Given {threshold_db}")
+        self._mode = mode
+        self._threshold_db = float(threshold_db)
+        self._ratio = float(ratio)
+        self._characteristics = characteristics
+
+    @classmethod
+    def gate(cls, threshold_db: float = -50., ratio: float = 0.1, bypass: bool = False) -> 'DynamicsStage':
+        return cls(
+            mode=DynamicsMode.EXPANDER,
+            threshold_db=threshold_db,
+            ratio=ratio,
+            characteristics=DynamicsCharacteristics.HARD_KNEE,
+            bypass=bypass,
+        )
+
+    @property
+    def mode(self) -> DynamicsMode:
+        return self._mode
+
+    @property
+    def threshold_db(self) -> float:
+        return self._threshold_db
+
+    @property
+    def ratio(self) -> float:
+        return self._ratio
+
+    @property
+    def properties(self) -> dict:
+        return {
+            "mode": Serialized(self._mode.value),
+            "characteristics": Serialized(self._characteristics.value),
+            "threshold": db_to_amplitude(self._threshold_db),
+            "ratio": self._ratio,
+        }
@@ -0,0 +1,132 @@
+import functools
+import typing
+
+import numpy as np
+
+MIDI_STEPS = 128
+
+
+def db_to_amplitude_array(levels) -> np.ndarray:
+    return np.power(10., np.asarray(levels, dtype=np.float64) / 20)
+
+
+def amplitude_to_db_array(levels) -> np.ndarray:
+    with np.errstate(divide='ignore'):
+        return 20 * np.log10(np.asarray(levels, dtype=np.float64))
+
+
+class LinearDbTaper(typing.NamedTuple):
+    min_db: float = -60.
+    max_db: float = 10.
+    # the bottom position mutes instead of sitting at min_db
+    mute_bottom: bool = True
+
+    def db(self, positions) -> np.ndarray:
+        positions = np.clip(np.asarray(positions, dtype=np.float64), 0., 1.)
+        levels = self.min_db + positions * (self.max_db - self.min_db)
+        if self.mute_bottom:
+            levels = np.where(positions == 0., -np.inf, levels)
+        return levels
+
+
+class ConsoleTaper(typing.NamedTuple):
+    # (position, dB) breakpoints, dB interpolated linearly in between, roughly the scale printed next to a console fader
+    points: tuple[tuple[float, float], ...] = ((0.0625, -60.), (0.25, -30.), (0.5, -10.), (0.75, 0.), (1., 10.))
+    floor_db: float = -90.
+
+    def db(self, positions) -> np.ndarray:
+        positions = np.clip(np.asarray(positions, dtype=np.float64), 0., 1.)
+        xp, fp = zip((0., self.floor_db), *self.points)
+        return np.where(positions == 0., -np.inf, np.interp(positions, xp, fp))
+
+
+FaderTaper = typing.Union[LinearDbTaper, ConsoleTaper]
+
+
+class TaperTable:
+    def __init__(self, taper: FaderTaper, steps: int = MIDI_STEPS):
+        if steps < 2:
+            raise ValueError(f"A taper table needs at least 2 steps. Given {steps}")
+        self._taper = taper
+        self._steps = int(steps)
+
+        self._db_values = np.atleast_1d(taper.db(np.arange(self._steps) / (self._steps - 1)))
+        self._amplitudes = db_to_amplitude_array(self._db_values)
+        self._db_values.flags.writeable = False
+        self._amplitudes.flags.writeable = False
+        # plain tuples of python floats, indexing them is cheaper than a numpy scalar access
+        self._db = tuple(self._db_values.tolist())
+        self._amplitude = tuple(self._amplitudes.tolist())
+
+    @property
+    def taper(self) -> FaderTaper:
+        return self._taper
+
+    @property
+    def steps(self) -> int:
+        return self._steps
+
+    @property
+    def db_values(self) -> np.ndarray:
+        return self._db_values
+
+    @property
+    def amplitudes(self) -> np.ndarray:
+        return self._amplitudes
+
+    def _check(self, value: int):
+        if not 0 <= value < self._steps:
+            raise ValueError(f"value must be between [0, {self._steps - 1}]. Given {value}")
+
+    def db(self, value: int) -> float:
+        self._check(value)
+        return self._db[value]
+
+    def amplitude(self, value: int) -> float:
+        self._check(value)
+        return self._amplitude[value]
+
+    def _indices(self, values) -> np.ndarray:
+        indices = np.asarray(values, dtype=np.intp)
+        if indices.size and (indices.min() < 0 or indices.max() >= self._steps):
+            raise ValueError(f"values must be between [0, {self._steps - 1}]")
+        return indices
+
+    def db_batch(self, values) -> np.ndarray:
+        return self._db_values[self._indices(values)]
+
+    def amplitude_batch(self, values) -> np.ndarray:
+        return self._amplitudes[self._indices(values)]
+
+    def value_for_db(self, level: float) -> int:
+        # nearest step at or below the level, e.g. to move a motor fader after a scene recall
+        return max(int(np.searchsorted(self._db_values, level, side='right')) - 1, 0)
+
+
+@functools.cache
+def _taper_table(taper: FaderTaper, steps: int) -> TaperTable:
+    return TaperTable(taper, steps)
+
+
+def taper_table(taper: FaderTaper = ConsoleTaper(), steps: int = MIDI_STEPS) -> TaperTable:
+    # shared per (taper, steps), every fader on the same taper uses one table
+    return _taper_table(taper, int(steps))
+
+
+class FaderMapping:
+    # moves the fader_db of a channel or bus with a MIDI fader, through the shared table instead of the taper math
+    def __init__(self, control, element, taper: FaderTaper = ConsoleTaper()):
+        self._control = control
+        self._element = element
+        self._table = taper_table(taper, control.max_value - control.min_value + 1)
+        control.add_callback(self._on_value)
+
+    @property
+    def table(self) -> TaperTable:
+        return self._table
+
+    def _on_value(self, caller, old_value: int, new_value: int):
+        self._element.fader_db = self._table.db(new_value - caller.min_value)
+
+    def detach(self):
+        self._control.remove_callback(self._on_value)
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import mmap
+import os
+import threading
+import typing
+
+from digimix.audio import Gst
+from digimix.audio.base import ThreadDomain
+from digimix.audio.pipeline import Topology
+
+
+def thread_domain(name: str, *cpus: int) -> ThreadDomain:
+    available = os.sched_getaffinity(0)
+    missing = set(cpus) - available
+    if not cpus or missing:
+        raise ValueError(f"Thread domain {name} needs CPUs out of {sorted(available)}. Given {sorted(cpus)}")
+    return ThreadDomain(name, frozenset(cpus))
+
+
+class RealtimePolicy(typing.NamedTuple):
+    policy: int = os.SCHED_FIFO
+    priority: int = 60
+    lock_memory: bool = False
+    prefault_bytes: int = 16 * 1024 * 1024
+
+
+# glibc values
+_MCL_CURRENT = 1
+_MCL_FUTURE = 2
+_M_TRIM_THRESHOLD = -1
+_M_MMAP_MAX = -4
+
+
+def lock_memory(prefault_bytes: int = 0) -> typing.Optional[str]:
+    libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    if not hasattr(libc, "mlockall"):
+        return "mlockall is not available"
+    if libc.mlockall(_MCL_CURRENT | _MCL_FUTURE) != 0:
+        return f"mlockall failed: {os.strerror(ctypes.get_errno())}"
+
+    if prefault_bytes > 0 and hasattr(libc, "mallopt"):
+        # keep freed memory in the (now locked) heap instead of returning it, then fault it in once
+        libc.mallopt(_M_TRIM_THRESHOLD, -1)
+        libc.mallopt(_M_MMAP_MAX, 0)
+        heap = bytearray(prefault_bytes)
+        for offset in range(0, prefault_bytes, mmap.PAGESIZE):
+            heap[offset] = 1
+        del heap
+    return None
+
+
+class ThreadStatus(typing.NamedTuple):
+    element: str
+    thread_id: int
+    domain: typing.Optional[str]
+    realtime: bool
+    error: typing.Optional[str]
+
+
+class ThreadReport(typing.NamedTuple):
+    threads: tuple[ThreadStatus, ...]
+    memory_locked: typing.Optional[bool]
+    memory_error: typing.Optional[str]
+
+    @property
+    def elevated(self) -> tuple[ThreadStatus, ...]:
+        return tuple(status for status in self.threads if status.realtime)
+
+    @property
+    def failed(self) -> tuple[ThreadStatus, ...]:
+        return tuple(status for status in self.threads if status.error is not None)
+
+    def format(self) -> str:
+        lines = [f"threads: {len(self.threads)}, realtime: {len(self.elevated)}, failed: {len(self.failed)}"]
+        if self.memory_locked is not None:
+            error = f" ({self.memory_error})" if self.memory_error else ""
+            lines.append(f"memory locked: {self.memory_locked}{error}")
+        for status in self.threads:
+            state = "realtime" if status.realtime else status.error or "normal"
+            lines.append(f"  {status.thread_id} {status.element} [{status.domain or '-'}]: {state}")
+        return '\n'.join(lines)
+
+
+class ThreadPlacement:
+    def __init__(
+        self,
+        domains: typing.Mapping[str, ThreadDomain],
+        realtime: typing.Optional[RealtimePolicy] = None,
+    ):
+        self._domains = dict(domains)
+        self._realtime = realtime
+        self._lock = threading.Lock()
+        self._statuses: dict[int, ThreadStatus] = {}
+        self._memory_locked: typing.Optional[bool] = None
+        self._memory_error: typing.Optional[str] = None
+        self._bus: typing.Optional[Gst.Bus] = None
+
+    @classmethod
+    def for_topology(cls, topology: Topology, realtime: typing.Optional[RealtimePolicy] = None) -> 'ThreadPlacement':
+        return cls(
+            {
+                name: owner.thread_domain
+                for name, owner in topology.owners.items()
+                if owner.thread_domain is not None
+            },
+            realtime=realtime,
+        )
+
+    @property
+    def domains(self) -> typing.Mapping[str, ThreadDomain]:
+        return self._domains
+
+    @property
+    def realtime(self) -> typing.Optional[RealtimePolicy]:
+        return self._realtime
+
+    @property
+    def threads(self) -> dict[str, tuple[int, ...]]:
+        threads: dict[str, list[int]] = {}
+        for status in self.report().threads:
+            if status.domain is not None:
+                threads.setdefault(status.domain, []).append(status.thread_id)
+        return {name: tuple(sorted(thread_ids)) for name, thread_ids in threads.items()}
+
+    def report(self) -> ThreadReport:
+        with self._lock:
+            statuses = tuple(self._statuses.values())
+        return ThreadReport(statuses, self._memory_locked, self._memory_error)
+
+    def attach_pipeline(self, pipeline: Gst.Pipeline):
+        if self._realtime is not None and self._realtime.lock_memory:
+            self._memory_error = lock_memory(self._realtime.prefault_bytes)
+            self._memory_locked = self._memory_error is None
+
+        # stream status messages are delivered synchronously from the streaming thread they describe
+        self._bus = pipeline.get_bus()
+        self._bus.set_sync_handler(self._on_sync_message)
+
+    def detach(self):
+        if self._bus is not None:
+            self._bus.set_sync_handler(None)
+            self._bus = None
+
+    def _on_sync_message(self, _, message: Gst.Message) -> Gst.BusSyncReply:
+        if message.type == Gst.MessageType.STREAM_STATUS:
+            status, owner = message.parse_stream_status()
+            if status == Gst.StreamStatusType.ENTER:
+                self.enter(owner.get_name())
+        return Gst.BusSyncReply.PASS
+
+    def enter(self, element_name: str) -> ThreadStatus:
+        domain = self._domains.get(element_name)
+        errors = []
+        if domain is not None:
+            try:
+                os.sched_setaffinity(0, domain.cpus)
+            except OSError as e:
+                errors.append(f"affinity: {e.strerror}")
+
+        realtime = False
+        if self._realtime is not None:
+            # without CAP_SYS_NICE / an rtprio limit this fails, the thread then keeps running at normal priority
+            priority = min(self._realtime.priority, os.sched_get_priority_max(self._realtime.policy))
+            try:
+                os.sched_setscheduler(0, self._realtime.policy, os.sched_param(priority))
+                realtime = True
+            except OSError as e:
+                errors.append(f"realtime: {e.strerror}")
+
+        status = ThreadStatus(
+            element=element_name,
+            thread_id=threading.get_native_id(),
+            domain=domain.name if domain is not None else None,
+            realtime=realtime,
+            error=', '.join(errors) or None,
+        )
+        with self._lock:
+            self._statuses[status.thread_id] = status
+        return status
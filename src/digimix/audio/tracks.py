@@ -0,0 +1,188 @@
+import enum
+import struct
+import typing
+import uuid
+from abc import ABC, abstractmethod
+
+from digimix.audio.formats import INTERNAL_FORMAT, SampleFormat
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+# sample formats a WAV/W64 fmt chunk describes without an extensible header
+WAVE_FORMATS = {
+    "F32LE": WAVE_FORMAT_IEEE_FLOAT,
+    "F64LE": WAVE_FORMAT_IEEE_FLOAT,
+    "S16LE": WAVE_FORMAT_PCM,
+    "S24LE": WAVE_FORMAT_PCM,
+    "S32LE": WAVE_FORMAT_PCM,
+}
+
+
+class TrackWriter(ABC):
+    def __init__(self, path: str, channels: int, sample_format: SampleFormat = INTERNAL_FORMAT):
+        self._path = str(path)
+        self._channels = int(channels)
+        self._sample_format = sample_format
+        self._rate = int(sample_format.rate)
+        self._frames = 0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def channels(self) -> int:
+        return self._channels
+
+    @property
+    def frames(self) -> int:
+        return self._frames
+
+    @property
+    def sample_format(self) -> SampleFormat:
+        return self._sample_format
+
+    @property
+    def frame_size(self) -> int:
+        return self._channels * self._sample_format.sample_width
+
+    def _fmt(self) -> bytes:
+        if self._sample_format.format not in WAVE_FORMATS:
+            raise ValueError(f"Can't write {self._sample_format.format} samples into {self._path}")
+        return struct.pack(
+            "<HHIIHH",
+            WAVE_FORMATS[self._sample_format.format],
+            self._channels,
+            self._rate,
+            self._rate * self.frame_size,
+            self.frame_size,
+            self._sample_format.sample_width * 8,
+        )
+
+    def write(self, data: bytes):
+        # interleaved samples in the sample format
+        self._write(data)
+        self._frames += len(data) // self.frame_size
+
+    @abstractmethod
+    def _write(self, data: bytes):
+        ...
+
+    @abstractmethod
+    def close(self):
+        ...
+
+
+class WavWriter(TrackWriter):
+    # RIFF sizes are 32 bit, use W64 for anything longer than ~6h of stereo at 48kHz
+    MAX_DATA_SIZE = 0xffffffff - 64
+
+    def __init__(self, path: str, channels: int, sample_format: SampleFormat = INTERNAL_FORMAT):
+        super().__init__(path, channels, sample_format)
+        header = self._header()
+        self._file = open(self._path, 'wb')
+        self._file.write(header)
+
+    def _header(self) -> bytes:
+        data_size = self._frames * self.frame_size
+        fmt = self._fmt() + struct.pack("<H", 0)
+        return b''.join((
+            b"RIFF", struct.pack("<I", 4 + 8 + len(fmt) + 8 + 4 + 8 + data_size), b"WAVE",
+            b"fmt ", struct.pack("<I", len(fmt)), fmt,
+            b"fact", struct.pack("<II", 4, self._frames),
+            b"data", struct.pack("<I", data_size),
+        ))
+
+    def _write(self, data: bytes):
+        if (self._frames * self.frame_size) + len(data) > self.MAX_DATA_SIZE:
+            raise RuntimeError(f"{self._path} would exceed the WAV size limit")
+        self._file.write(data)
+
+    def close(self):
+        self._file.seek(0)
+        self._file.write(self._header())
+        self._file.close()
+
+
+def _w64_guid(fourcc: bytes, tail: str) -> bytes:
+    return uuid.UUID(f"{fourcc[::-1].hex()}-{tail}").bytes_le
+
+
+W64_RIFF = _w64_guid(b"riff", "912e-11cf-a5d6-28db04c10000")
+W64_WAVE = _w64_guid(b"wave", "acf3-11d3-8cd1-00c04f8edb8a")
+W64_FMT = _w64_guid(b"fmt ", "acf3-11d3-8cd1-00c04f8edb8a")
+W64_DATA = _w64_guid(b"data", "acf3-11d3-8cd1-00c04f8edb8a")
+W64_CHUNK_HEADER = 16 + 8
+
+
+class W64Writer(TrackWriter):
+    def __init__(self, path: str, channels: int, sample_format: SampleFormat = INTERNAL_FORMAT):
+        super().__init__(path, channels, sample_format)
+        header = self._header()
+        self._file = open(self._path, 'wb')
+        self._file.write(header)
+
+    def _header(self) -> bytes:
+        # chunk sizes include their 24 byte header, chunks are 8 byte aligned
+        data_size = self._frames * self.frame_size
+        fmt = self._fmt()
+        fmt_chunk = W64_FMT + struct.pack("<Q", W64_CHUNK_HEADER + len(fmt)) + fmt
+        riff_size = W64_CHUNK_HEADER + 16 + len(fmt_chunk) + W64_CHUNK_HEADER + data_size + (-data_size % 8)
+        return b''.join((
+            W64_RIFF, struct.pack("<Q", riff_size), W64_WAVE,
+            fmt_chunk,
+            W64_DATA, struct.pack("<Q", W64_CHUNK_HEADER + data_size),
+        ))
+
+    def _write(self, data: bytes):
+        self._file.write(data)
+
+    def close(self):
+        self._file.write(b"\0" * (-(self._frames * self.frame_size) % 8))
+        self._file.seek(0)
+        self._file.write(self._header())
+        self._file.close()
+
+
+class FlacWriter(TrackWriter):
+    SUBTYPE = "PCM_24"
+    DTYPES = {"F32LE": "<f4", "F64LE": "<f8", "S16LE": "<i2", "S32LE": "<i4"}
+
+    def __init__(self, path: str, channels: int, sample_format: SampleFormat = INTERNAL_FORMAT):
+        super().__init__(path, channels, sample_format)
+        if sample_format.format not in self.DTYPES:
+            raise ValueError(f"Can't write {sample_format.format} samples into {self._path}")
+        try:
+            import numpy
+            import soundfile
+        except ImportError as e:
+            raise RuntimeError(f"FLAC recording needs numpy and soundfile: {e}")
+        self._numpy = numpy
+        self._file = soundfile.SoundFile(
+            self._path, 'w', samplerate=self._rate, channels=self._channels, format="FLAC", subtype=self.SUBTYPE,
+        )
+
+    def _write(self, data: bytes):
+        samples = self._numpy.frombuffer(data, dtype=self.DTYPES[self._sample_format.format])
+        self._file.write(samples.reshape(-1, self._channels))
+
+    def close(self):
+        self._file.close()
+
+
+@enum.unique
+class RecordFormat(enum.Enum):
+    WAV = ("wav", WavWriter)
+    W64 = ("w64", W64Writer)
+    FLAC = ("flac", FlacWriter)
+
+    def __init__(self, extension: str, writer: typing.Type[TrackWriter]):
+        self._extension = extension
+        self._writer = writer
+
+    @property
+    def extension(self) -> str:
+        return self._extension
+
+    def open(self, path: str, channels: int, sample_format: SampleFormat = INTERNAL_FORMAT) -> TrackWriter:
+        return self._writer(path, channels, sample_format)
@@ -5,16 +5,18 @@ _DIGITS_AMPLITUDE_CALC = 4
 
 
 def precision_round(number, digits):
-    power = f"{number:e}".split('e')[1]
-    return round(number, -(int(power) - digits + 1))
+    if number == 0 or not math.isfinite(number):
+        return number
+    power = math.floor(math.log10(abs(number)))
+    return round(number, -(power - digits + 1))
 
 
 def db_to_amplitude(level: float) -> float:
-    return precision_round(math.sqrt(10 ** (level / 10)), _DIGITS_AMPLITUDE_CALC)
+    return precision_round(10 ** (level / 20), _DIGITS_AMPLITUDE_CALC)
 
 
 def amplitude_to_db(level: float) -> float:
-    return precision_round(10 * math.log(level ** 2, 10), _DIGITS_AMPLITUDE_CALC)
+    return precision_round(20 * math.log10(level), _DIGITS_AMPLITUDE_CALC)
 
 
 def escape_pipeline_description(desc: str) -> str:
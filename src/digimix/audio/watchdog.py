@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import collections
+import json
+import threading
+import time
+import typing
+
+from digimix.audio import Gst
+from digimix.audio.pipeline import Topology
+from digimix.audio.profiles import QueueLeaky
+
+
+class DropoutEvent(typing.NamedTuple):
+    wall_s: float
+    running_time_ns: typing.Optional[int]
+    kind: str
+    element: str
+    owner: str
+    detail: str
+
+
+class WatchdogReport(typing.NamedTuple):
+    counters: dict[str, dict[str, int]]
+    timeline: tuple[DropoutEvent, ...]
+    dropped_events: int
+
+    @property
+    def total(self) -> int:
+        return sum(sum(kinds.values()) for kinds in self.counters.values())
+
+    def format(self) -> str:
+        lines = [f"dropout events: {self.total} (timeline keeps {len(self.timeline)}, lost {self.dropped_events})"]
+        for owner, kinds in sorted(self.counters.items()):
+            counts = ', '.join(f"{kind}={count}" for kind, count in sorted(kinds.items()))
+            lines.append(f"  {owner}: {counts}")
+        return '\n'.join(lines)
+
+
+class DropoutWatchdog:
+    PROBE_FACTORIES = ("jackaudiosrc", "jackaudiosink")
+    TIMELINE_SIZE = 4096
+
+    def __init__(
+        self,
+        owners: typing.Optional[typing.Mapping[str, str]] = None,
+        probe_elements: typing.Sequence[str] = (),
+        timeline_size: int = TIMELINE_SIZE,
+        leaky_queues: typing.Sequence[str] = (),
+    ):
+        self._owners = dict(owners or {})
+        self._probe_elements = tuple(probe_elements)
+        self._leaky_queues = tuple(leaky_queues)
+        self._lock = threading.Lock()
+        self._counters: dict[str, collections.Counter] = {}
+        self._timeline: collections.deque[DropoutEvent] = collections.deque(maxlen=timeline_size)
+        self._recorded = 0
+        self._pipeline: typing.Optional[Gst.Pipeline] = None
+        self._bus: typing.Optional[Gst.Bus] = None
+        self._handler_ids: list[int] = []
+        self._probes: list[tuple[Gst.Pad, int]] = []
+        self._queue_handlers: list[tuple[Gst.Element, int]] = []
+        self._seen_segment: set[str] = set()
+
+    @classmethod
+    def for_topology(cls, topology: Topology, timeline_size: int = TIMELINE_SIZE) -> 'DropoutWatchdog':
+        return cls(
+            {name: f"{owner.__class__.__name__}({owner.name})" for name, owner in topology.owners.items()},
+            probe_elements=[
+                name for name, element in topology.graph.elements.items() if element.factory in cls.PROBE_FACTORIES
+            ],
+            timeline_size=timeline_size,
+            leaky_queues=[
+                name for name, element in topology.graph.elements.items()
+                if element.factory == "queue" and element.properties.get("leaky", QueueLeaky.NO) != QueueLeaky.NO
+            ],
+        )
+
+    def attach_pipeline(self, pipeline: Gst.Pipeline):
+        self._pipeline = pipeline
+        self._bus = pipeline.get_bus()
+        self._bus.add_signal_watch()
+        self._handler_ids = [
+            self._bus.connect("message::qos", self._on_qos),
+            self._bus.connect("message::warning", self._on_warning),
+            self._bus.connect("message::error", self._on_error),
+        ]
+
+        for name in self._probe_elements:
+            element = pipeline.get_by_name(name)
+            if element is None:
+                raise RuntimeError(f"Couldn't find element {name}")
+            # data flows out of a JACK source and into a JACK sink. Events only, a buffer probe would take the GIL
+            # on the JACK thread every period; xruns reach the bus as audiobasesrc warnings and audiobasesink QoS
+            pad = element.get_static_pad("src") or element.get_static_pad("sink")
+            probe_id = pad.add_probe(Gst.PadProbeType.EVENT_DOWNSTREAM, self._on_probe, name)
+            self._probes.append((pad, probe_id))
+
+        for name in self._leaky_queues:
+            queue = pipeline.get_by_name(name)
+            if queue is None:
+                raise RuntimeError(f"Couldn't find element {name}")
+            # a full leaky queue drops a buffer right after signalling the overrun
+            self._queue_handlers.append((queue, queue.connect("overrun", self._on_overrun)))
+
+    def detach(self):
+        for pad, probe_id in self._probes:
+            pad.remove_probe(probe_id)
+        self._probes = []
+        for queue, handler_id in self._queue_handlers:
+            queue.disconnect(handler_id)
+        self._queue_handlers = []
+        if self._bus is not None:
+            for handler_id in self._handler_ids:
+                self._bus.disconnect(handler_id)
+            self._bus.remove_signal_watch()
+            self._bus = None
+        self._pipeline = None
+
+    def _owner(self, obj: typing.Optional[Gst.Object]) -> tuple[str, str]:
+        name = obj.get_name() if obj is not None else "pipeline"
+        while obj is not None:
+            owner = self._owners.get(obj.get_name())
+            if owner is not None:
+                return name, owner
+            obj = obj.get_parent()
+        return name, name
+
+    def _running_time_ns(self) -> typing.Optional[int]:
+        pipeline = self._pipeline
+        if pipeline is None:
+            return None
+        clock = pipeline.get_clock()
+        if clock is None:
+            return None
+        return clock.get_time() - pipeline.get_base_time()
+
+    def record(self, kind: str, obj: typing.Optional[Gst.Object], detail: str = ''):
+        element, owner = self._owner(obj)
+        event = DropoutEvent(time.time(), self._running_time_ns(), kind, element, owner, detail)
+        with self._lock:
+            self._counters.setdefault(owner, collections.Counter())[kind] += 1
+            self._timeline.append(event)
+            self._recorded += 1
+
+    def _on_qos(self, _, message: Gst.Message):
+        live, running_time, stream_time, timestamp, duration = message.parse_qos()
+        _, processed, dropped = message.parse_qos_stats()
+        self.record("qos", message.src, f"running_time={running_time} processed={processed} dropped={dropped}")
+
+    def _on_warning(self, _, message: Gst.Message):
+        error, debug = message.parse_warning()
+        self.record("warning", message.src, error.message)
+
+    def _on_error(self, _, message: Gst.Message):
+        error, debug = message.parse_error()
+        self.record("error", message.src, error.message)
+
+    def _on_overrun(self, queue: Gst.Element):
+        self.record("overrun", queue, f"level_time={queue.get_property('current-level-time')}")
+
+    def _on_probe(self, pad: Gst.Pad, info: Gst.PadProbeInfo, name: str) -> Gst.PadProbeReturn:
+        element = pad.get_parent_element()
+        event = info.get_event()
+        if event.type == Gst.EventType.GAP:
+            timestamp, duration = event.parse_gap()
+            self.record("gap", element, f"pts={timestamp} duration={duration}")
+        elif event.type == Gst.EventType.SEGMENT:
+            # the first segment starts the stream, any later one restarts the timeline
+            if name in self._seen_segment:
+                segment = event.parse_segment()
+                self.record("discont", element, f"start={segment.start} base={segment.base}")
+            self._seen_segment.add(name)
+        elif event.type == Gst.EventType.FLUSH_STOP:
+            self.record("discont", element, "flush")
+        return Gst.PadProbeReturn.OK
+
+    def report(self) -> WatchdogReport:
+        with self._lock:
+            return WatchdogReport(
+                counters={owner: dict(kinds) for owner, kinds in self._counters.items()},
+                timeline=tuple(self._timeline),
+                dropped_events=self._recorded - len(self._timeline),
+            )
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timeline.clear()
+            self._recorded = 0
+
+    def dump(self, path: str):
+        report = self.report()
+        with open(path, 'w') as dump_file:
+            dump_file.write(json.dumps({"counters": report.counters, "dropped_events": report.dropped_events}) + '\n')
+            for event in report.timeline:
+                dump_file.write(json.dumps(event._asdict()) + '\n')
@@ -1,3 +1,5 @@
+import typing
+
 from mido.messages import Message
 from transitions import EventData
 
@@ -78,6 +80,7 @@ class MidiMix:
                   ]
         self._button_matrix = tuple(tuple(buttons[row + col * 3] for col in range(8)) for row in range(3))
         self._special_buttons = tuple(buttons[-3:])
+        self._controls = tuple(ccs + [master_fader] + buttons)
 
         channels = []
 
@@ -155,6 +158,10 @@ class MidiMix:
     def special_buttons(self) -> tuple[Button]:
         return self._special_buttons
 
+    @property
+    def controls(self) -> tuple[typing.Union[ContinuousControlReadOnly, Button], ...]:
+        return self._controls
+
     @property
     def dispatcher(self) -> MidiDispatcher:
         return self._dispatcher
@@ -1,26 +1,74 @@
+import operator
 import typing
 
 from mido.messages import checks, Message
 
+from digimix.midi.raw import RawMessage
 from digimix.utils.dicts import dict_to_tuple
 
+# the field that tells controls of one type and channel apart, patterns fixing type, channel and this field are indexed
+NUMBER_FIELDS = {
+    'note_off': 'note',
+    'note_on': 'note',
+    'polytouch': 'note',
+    'control_change': 'control',
+    'program_change': 'program',
+}
+_MISSING = object()
+
 
 class MidiDispatcher:
     def __init__(self):
         self._midi_callback_map = {}
+        # (type, channel, number) -> {remaining pattern items: (registration order, callbacks)}
+        self._index: dict[tuple, dict[tuple, tuple[int, set]]] = {}
+        self._fallback: dict[tuple, tuple[int, set]] = {}
+
+    @staticmethod
+    def _index_key(partial_msg_dict: typing.Dict) -> typing.Optional[tuple]:
+        number_field = NUMBER_FIELDS.get(partial_msg_dict.get('type'))
+        if number_field is None or 'channel' not in partial_msg_dict or number_field not in partial_msg_dict:
+            return None
+        return partial_msg_dict['type'], partial_msg_dict['channel'], partial_msg_dict[number_field]
 
     def add_callback(self, partial_msg_dict: typing.Dict, callback: typing.Callable):
         checks.check_msgdict(partial_msg_dict)
 
         key = dict_to_tuple(partial_msg_dict)
         if key not in self._midi_callback_map:
-            self._midi_callback_map[key] = set()  # weakref.WeakSet()
+            entry = len(self._midi_callback_map), set()  # weakref.WeakSet()
+            self._midi_callback_map[key] = entry[1]
+            index_key = self._index_key(partial_msg_dict)
+            if index_key is None:
+                self._fallback[key] = entry
+            else:
+                number_field = NUMBER_FIELDS[partial_msg_dict['type']]
+                rest = tuple(item for item in key if item[0] not in ('type', 'channel', number_field))
+                self._index.setdefault(index_key, {})[rest] = entry
         self._midi_callback_map[key].add(callback)
 
-    def dispatch(self, msg: Message):
-        msg_dict_view = msg.dict().items()
-        for partial_msg_dict, callbacks in self._midi_callback_map.items():
-            if dict(partial_msg_dict).items() <= msg_dict_view:
-                for callback in callbacks:
-                    if callback:
-                        callback(msg=msg)
+    def _matching(self, msg: typing.Union[Message, RawMessage]) -> typing.Iterator[tuple[int, set]]:
+        number_field = NUMBER_FIELDS.get(msg.type)
+        if number_field is not None:
+            patterns = self._index.get((msg.type, msg.channel, getattr(msg, number_field)))
+            if patterns is not None:
+                for rest, entry in patterns.items():
+                    if all(getattr(msg, field, _MISSING) == value for field, value in rest):
+                        yield entry
+
+        if self._fallback:
+            msg_dict_view = msg.dict().items()
+            for partial_msg_dict, entry in self._fallback.items():
+                if dict(partial_msg_dict).items() <= msg_dict_view:
+                    yield entry
+
+    def dispatch(self, msg: typing.Union[Message, RawMessage]):
+        # RawMessage only decodes a mido Message if a fallback pattern or a callback needs it
+        matches = list(self._matching(msg))
+        if len(matches) > 1:
+            # patterns are called in the order they were registered, indexed or not
+            matches.sort(key=operator.itemgetter(0))
+        for _, callbacks in matches:
+            for callback in callbacks:
+                if callback:
+                    callback(msg=msg)
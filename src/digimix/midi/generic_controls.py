@@ -1,3 +1,4 @@
+import collections.abc
 import enum
 import threading
 import typing
@@ -15,6 +16,21 @@ Machine = MachineFactory.get_predefined(
 )
 
 
+class _MachineDict(collections.abc.Mapping):
+    # Button.MACHINE_DICT, each machine is still only built on first access
+    def __set_name__(self, owner: type, name: str):
+        self._owner = owner
+
+    def __getitem__(self, mode):
+        return self._owner.machine(mode)
+
+    def __iter__(self):
+        return iter(self._owner.MACHINE_CONFIGS)
+
+    def __len__(self) -> int:
+        return len(self._owner.MACHINE_CONFIGS)
+
+
 class ContinuousControlReadOnly(CallbackBase):
     PICK_UP_RANGE = Fraction(4, 100)
 
@@ -150,8 +166,8 @@ class Button(CallbackBase):
         MOMENTARY = enum.auto()
         TIMED_TOGGLE = TOGGLE | MOMENTARY
 
-    MACHINE_DICT = {
-        Mode.MOMENTARY: Machine(
+    MACHINE_CONFIGS = {
+        Mode.MOMENTARY: dict(
             name='ButtonMomentaryMachine',
             model=None,
             states=[
@@ -171,7 +187,7 @@ class Button(CallbackBase):
             after_state_change='_trigger_callbacks',
             queued=False,
         ),
-        Mode.TOGGLE: Machine(
+        Mode.TOGGLE: dict(
             name='ButtonToggleMachine',
             model=None,
             states=[
@@ -195,7 +211,7 @@ class Button(CallbackBase):
             after_state_change='_trigger_callbacks',
             queued=False,
         ),
-        Mode.TIMED_TOGGLE: Machine(
+        Mode.TIMED_TOGGLE: dict(
             name='ButtonTimedToggleMachine',
             model=None,
             states=[
@@ -230,6 +246,11 @@ class Button(CallbackBase):
         ),
     }
 
+    MACHINE_DICT: typing.Mapping[Mode, Machine] = _MachineDict()
+
+    _machines: dict[Mode, Machine] = {}
+    _machines_lock = threading.Lock()
+
     state: str
     press: typing.Callable
     release: typing.Callable
@@ -245,11 +266,19 @@ class Button(CallbackBase):
 
         self._mode = mode
 
-        self._machine = self.MACHINE_DICT[self._mode]
+        self._machine = self.machine(self._mode)
         self._machine.add_model(self)
 
         self._momentary_timeout_timer: typing.Optional[threading.Timer] = None
 
+    @classmethod
+    def machine(cls, mode: Mode) -> Machine:
+        # one shared machine per mode, built on first use instead of at import
+        with cls._machines_lock:
+            if mode not in cls._machines:
+                cls._machines[mode] = Machine(**cls.MACHINE_CONFIGS[mode])
+            return cls._machines[mode]
+
     def __del__(self):
         self._machine.remove_model(self)
 
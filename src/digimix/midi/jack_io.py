@@ -1,15 +1,41 @@
+import queue
 import threading
+import typing
 from queue import SimpleQueue
 
 import rtmidi
 from mido.messages import Message
 
+from digimix.midi.raw import MidiParser, RawMessage, coalesce_control_changes
+
+
+class MidiQueueStatistics(typing.NamedTuple):
+    queue_depth: int
+    batches: int
+    packets: int
+    messages: int
+    coalesced: int
+    max_batch: int
+
+    def format(self) -> str:
+        return (
+            f"midi in: {self.packets} packets in {self.batches} batches (largest {self.max_batch}), "
+            f"{self.messages} messages, {self.coalesced} coalesced, {self.queue_depth} queued"
+        )
+
 
 class RtMidiJackIO:
     API = rtmidi.API_UNIX_JACK
 
     def __init__(self, client_name_prefix: str):
         self._msg_queue_in = SimpleQueue()
+        self._parser = MidiParser()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._packets = 0
+        self._messages = 0
+        self._coalesced = 0
+        self._max_batch = 0
 
         self._in_client = rtmidi.MidiIn(
             rtapi=self.API,
@@ -35,6 +61,50 @@ class RtMidiJackIO:
     def receive(self) -> Message:
         return Message.from_bytes(self._msg_queue_in.get())
 
+    def receive_raw(self) -> list[RawMessage]:
+        # decodes the rtmidi bytes directly, with running status, for the receiving thread only
+        return self._parser.feed(self._msg_queue_in.get())
+
+    @property
+    def queue_depth(self) -> int:
+        return self._msg_queue_in.qsize()
+
+    def receive_batch(self, coalesce: bool = False, timeout: typing.Optional[float] = None) -> list[RawMessage]:
+        # waits for the first packet only, then drains whatever queued up behind it
+        try:
+            packets = [self._msg_queue_in.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        try:
+            while True:
+                packets.append(self._msg_queue_in.get_nowait())
+        except queue.Empty:
+            pass
+
+        messages = [msg for packet in packets for msg in self._parser.feed(packet)]
+        parsed = len(messages)
+        if coalesce:
+            messages = coalesce_control_changes(messages)
+
+        with self._stats_lock:
+            self._batches += 1
+            self._packets += len(packets)
+            self._messages += parsed
+            self._coalesced += parsed - len(messages)
+            self._max_batch = max(self._max_batch, len(packets))
+        return messages
+
+    def statistics(self) -> MidiQueueStatistics:
+        with self._stats_lock:
+            return MidiQueueStatistics(
+                queue_depth=self.queue_depth,
+                batches=self._batches,
+                packets=self._packets,
+                messages=self._messages,
+                coalesced=self._coalesced,
+                max_batch=self._max_batch,
+            )
+
     def send(self, msg: Message):
         with self._send_lock:
             self._out_client.send_message(msg.bytes())
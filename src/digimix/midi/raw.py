@@ -0,0 +1,185 @@
+import typing
+
+from mido.messages import Message
+
+# channel voice messages by the high nibble of the status byte: (type, data byte count)
+CHANNEL_TYPES = {
+    0x80: ('note_off', 2),
+    0x90: ('note_on', 2),
+    0xA0: ('polytouch', 2),
+    0xB0: ('control_change', 2),
+    0xC0: ('program_change', 1),
+    0xD0: ('aftertouch', 1),
+    0xE0: ('pitchwheel', 2),
+}
+# system common and realtime messages, sysex is delimited by its end byte instead
+SYSTEM_TYPES = {
+    0xF1: ('quarter_frame', 1),
+    0xF2: ('songpos', 2),
+    0xF3: ('song_select', 1),
+    0xF6: ('tune_request', 0),
+    0xF8: ('clock', 0),
+    0xFA: ('start', 0),
+    0xFB: ('continue', 0),
+    0xFC: ('stop', 0),
+    0xFE: ('active_sensing', 0),
+    0xFF: ('reset', 0),
+}
+SYSEX_START = 0xF0
+SYSEX_END = 0xF7
+REALTIME_START = 0xF8
+
+
+# data byte index of each field by message type, other types don't have the field, just like with mido
+DATA_FIELDS = {
+    'note': {'note_off': 0, 'note_on': 0, 'polytouch': 0},
+    'velocity': {'note_off': 1, 'note_on': 1},
+    'control': {'control_change': 0},
+    'program': {'program_change': 0},
+    'value': {'polytouch': 1, 'control_change': 1, 'aftertouch': 0},
+}
+
+
+class RawMessage:
+    __slots__ = ('type', 'channel', 'status', 'data', '_message')
+
+    def __init__(self, status: int, data: tuple[int, ...]):
+        self.status = status
+        # for sysex without the start and end bytes, like mido
+        self.data = data
+        if status < SYSEX_START:
+            self.type = CHANNEL_TYPES[status & 0xF0][0]
+            self.channel = status & 0x0F
+        else:
+            self.type = 'sysex' if status == SYSEX_START else SYSTEM_TYPES[status][0]
+            self.channel = None
+        self._message: typing.Optional[Message] = None
+
+    @classmethod
+    def from_bytes(cls, data: typing.Sequence[int]) -> 'RawMessage':
+        messages = MidiParser().feed(data)
+        if len(messages) != 1:
+            raise ValueError(f"Expected exactly one MIDI message, got {len(messages)}")
+        return messages[0]
+
+    def _field(self, name: str) -> int:
+        index = DATA_FIELDS[name].get(self.type)
+        if index is None:
+            raise AttributeError(f"{self.type} message has no attribute {name}")
+        return self.data[index]
+
+    @property
+    def note(self) -> int:
+        return self._field('note')
+
+    @property
+    def control(self) -> int:
+        return self._field('control')
+
+    @property
+    def program(self) -> int:
+        return self._field('program')
+
+    @property
+    def velocity(self) -> int:
+        return self._field('velocity')
+
+    @property
+    def value(self) -> int:
+        return self._field('value')
+
+    @property
+    def pitch(self) -> int:
+        if self.type != 'pitchwheel':
+            raise AttributeError(f"{self.type} message has no attribute pitch")
+        return (self.data[0] | self.data[1] << 7) - 8192
+
+    def bytes(self) -> list[int]:
+        if self.status == SYSEX_START:
+            return [SYSEX_START, *self.data, SYSEX_END]
+        return [self.status, *self.data]
+
+    @property
+    def message(self) -> Message:
+        # only built for callbacks that need the full mido API
+        if self._message is None:
+            self._message = Message.from_bytes(self.bytes())
+        return self._message
+
+    def __getattr__(self, name: str):
+        # a field the type doesn't have, no need to decode the mido message to find out
+        if name in DATA_FIELDS or name == 'pitch':
+            raise AttributeError(f"{self.type} message has no attribute {name}")
+        return getattr(self.message, name)
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} type={self.type} channel={self.channel} data={self.data}>'
+
+
+class MidiParser:
+    # a message may be split across packets, so the partial one is kept until the next feed
+    def __init__(self):
+        # running status of channel messages, or a system common message still waiting for its data
+        self._status: typing.Optional[int] = None
+        self._needed = 0
+        self._pending: list[int] = []
+        self._sysex: typing.Optional[list[int]] = None
+
+    def feed(self, data: typing.Sequence[int]) -> list[RawMessage]:
+        messages = []
+        for byte in data:
+            if byte >= REALTIME_START:
+                # may appear anywhere, even inside another message, and leaves running status alone
+                if byte in SYSTEM_TYPES:
+                    messages.append(RawMessage(byte, ()))
+            elif self._sysex is not None:
+                if byte == SYSEX_END:
+                    messages.append(RawMessage(SYSEX_START, tuple(self._sysex)))
+                    self._sysex = None
+                elif byte & 0x80:
+                    # an unterminated sysex, drop it and start over with the new status
+                    self._sysex = None
+                    self._start(byte, messages)
+                else:
+                    self._sysex.append(byte)
+            elif byte & 0x80:
+                self._start(byte, messages)
+            elif self._status is not None:
+                self._pending.append(byte)
+                if len(self._pending) == self._needed:
+                    messages.append(RawMessage(self._status, tuple(self._pending)))
+                    self._pending = []
+                    if self._status >= SYSEX_START:
+                        self._status = None
+            # data bytes without any status to attach them to are dropped
+        return messages
+
+    def _start(self, byte: int, messages: list[RawMessage]):
+        self._status, self._needed, self._pending = None, 0, []
+        if byte < SYSEX_START:
+            self._status, self._needed = byte, CHANNEL_TYPES[byte & 0xF0][1]
+            return
+
+        if byte == SYSEX_START:
+            self._sysex = []
+        elif byte in SYSTEM_TYPES:
+            needed = SYSTEM_TYPES[byte][1]
+            if needed:
+                self._status, self._needed = byte, needed
+            else:
+                messages.append(RawMessage(byte, ()))
+
+
+def coalesce_control_changes(messages: typing.Sequence[RawMessage]) -> list[RawMessage]:
+    # keeps the latest value per (channel, control) at its position, everything else keeps its order
+    seen = set()
+    kept = []
+    for msg in reversed(messages):
+        if msg.type == 'control_change':
+            key = (msg.channel, msg.control)
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(msg)
+    kept.reverse()
+    return kept
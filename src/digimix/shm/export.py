@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import array
+import typing
+
+from digimix.audio import GLib
+from digimix.audio.base import GstElement
+from digimix.audio.metering import MeterBank
+from digimix.midi.generic_controls import Button, ContinuousControlReadOnly
+from digimix.shm.layout import DEFAULT_PATH, Layout
+from digimix.shm.writer import SharedStateWriter
+
+Control = typing.Union[ContinuousControlReadOnly, Button]
+
+
+def _control_value(control: Control) -> float:
+    if isinstance(control, Button):
+        return float(control.active)
+    return float(control.value)
+
+
+class MixerStateExport:
+    def __init__(
+        self,
+        bank: MeterBank,
+        elements: typing.Iterable[GstElement],
+        controls: typing.Iterable[Control] = (),
+        path: str = DEFAULT_PATH,
+    ):
+        self._bank = bank
+        self._parameters: list[tuple[GstElement, str]] = [
+            (element, key) for element in elements for key in element.SCENE_PARAMETERS
+        ]
+        self._controls = tuple(controls)
+
+        names = [f"{element.name}/{key}" for element, key in self._parameters]
+        names += [f"midi/{control.name}" for control in self._controls]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Exported parameter names must be unique: {names}")
+
+        self._writer = SharedStateWriter(Layout(bank.names, bank.max_channels, tuple(names)), path=path)
+        self._source_id: typing.Optional[int] = None
+
+    @property
+    def layout(self) -> Layout:
+        return self._writer.layout
+
+    @property
+    def path(self) -> str:
+        return self._writer.path
+
+    @property
+    def sequence(self) -> int:
+        return self._writer.sequence // 2
+
+    def publish(self):
+        snapshot = self._bank.snapshot()
+        layout = self._writer.layout
+        values = [float(getattr(element, key)) for element, key in self._parameters]
+        values += [_control_value(control) for control in self._controls]
+
+        with self._writer.write() as slab:
+            slab[layout.channels_offset:layout.peak_offset] = array.array('d', snapshot.channels)
+            slab[layout.peak_offset:layout.rms_offset] = array.array('d', snapshot.peak_db)
+            slab[layout.rms_offset:layout.decay_offset] = array.array('d', snapshot.rms_db)
+            slab[layout.decay_offset:layout.clip_offset] = array.array('d', snapshot.decay_db)
+            slab[layout.clip_offset:layout.parameters_offset] = array.array('d', snapshot.clip)
+            slab[layout.parameters_offset:] = array.array('d', values)
+
+    def start(self, interval_ms: int = 33):
+        self.stop()
+        self._source_id = GLib.timeout_add(interval_ms, self._on_timeout)
+
+    def _on_timeout(self) -> bool:
+        self.publish()
+        return GLib.SOURCE_CONTINUE
+
+    def stop(self):
+        if self._source_id is not None:
+            GLib.source_remove(self._source_id)
+            self._source_id = None
+
+    def close(self):
+        self.stop()
+        self._writer.close()
@@ -0,0 +1,70 @@
+import json
+import struct
+import typing
+
+MAGIC = b"DGMXSHM1"
+VERSION = 1
+DEFAULT_PATH = "/dev/shm/digimix-state"
+
+# magic, version, layout json size, data offset, value count, sequence
+HEADER = struct.Struct("<8sIIIIQ")
+SEQUENCE_OFFSET = 24
+VALUE_SIZE = 8
+
+
+class Layout(typing.NamedTuple):
+    meters: tuple[str, ...]
+    max_channels: int
+    parameters: tuple[str, ...]
+
+    @property
+    def meter_values(self) -> int:
+        return len(self.meters) * self.max_channels
+
+    # value blocks, all float64: channels[meters], peak, rms, decay, clip[meters * max_channels], parameters
+
+    @property
+    def channels_offset(self) -> int:
+        return 0
+
+    @property
+    def peak_offset(self) -> int:
+        return len(self.meters)
+
+    @property
+    def rms_offset(self) -> int:
+        return self.peak_offset + self.meter_values
+
+    @property
+    def decay_offset(self) -> int:
+        return self.rms_offset + self.meter_values
+
+    @property
+    def clip_offset(self) -> int:
+        return self.decay_offset + self.meter_values
+
+    @property
+    def parameters_offset(self) -> int:
+        return self.clip_offset + self.meter_values
+
+    @property
+    def value_count(self) -> int:
+        return self.parameters_offset + len(self.parameters)
+
+    def encode(self) -> bytes:
+        return json.dumps(
+            {"meters": self.meters, "max_channels": self.max_channels, "parameters": self.parameters},
+            separators=(',', ':'),
+        ).encode()
+
+    @classmethod
+    def decode(cls, data: bytes) -> 'Layout':
+        layout = json.loads(data)
+        return cls(tuple(layout["meters"]), int(layout["max_channels"]), tuple(layout["parameters"]))
+
+    def data_offset(self) -> int:
+        end = HEADER.size + len(self.encode())
+        return end + (-end % VALUE_SIZE)
+
+    def size(self) -> int:
+        return self.data_offset() + self.value_count * VALUE_SIZE
@@ -0,0 +1,83 @@
+import mmap
+import os
+import time
+import typing
+
+from digimix.shm.layout import DEFAULT_PATH, HEADER, MAGIC, SEQUENCE_OFFSET, VERSION, Layout
+
+
+class MeterValues(typing.NamedTuple):
+    peak_db: tuple[float, ...]
+    rms_db: tuple[float, ...]
+    decay_db: tuple[float, ...]
+    clip: tuple[bool, ...]
+
+
+class SharedState(typing.NamedTuple):
+    sequence: int
+    meters: dict[str, MeterValues]
+    parameters: dict[str, float]
+
+
+class SharedStateReader:
+    def __init__(self, path: str = DEFAULT_PATH):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            self._mmap = mmap.mmap(fd, 0, prot=mmap.PROT_READ)
+        finally:
+            os.close(fd)
+
+        magic, version, layout_size, data_offset, value_count, _ = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise RuntimeError(f"{path} is not a digimix state export (version {VERSION})")
+        self._layout = Layout.decode(self._mmap[HEADER.size:HEADER.size + layout_size])
+        if self._layout.value_count != value_count:
+            raise RuntimeError(f"{path} has an inconsistent layout")
+
+        self._sequence = memoryview(self._mmap)[SEQUENCE_OFFSET:SEQUENCE_OFFSET + 8].cast('Q')
+        self._values = memoryview(self._mmap)[data_offset:data_offset + value_count * 8].cast('d')
+
+    @property
+    def layout(self) -> Layout:
+        return self._layout
+
+    @property
+    def sequence(self) -> int:
+        return self._sequence[0] // 2
+
+    @property
+    def values(self) -> memoryview:
+        # zero-copy view of the raw values, not protected against concurrent writes
+        return self._values
+
+    def read_values(self) -> tuple[int, list[float]]:
+        while True:
+            sequence = self._sequence[0]
+            if sequence & 1:
+                time.sleep(0)
+                continue
+            values = self._values.tolist()
+            if sequence == self._sequence[0]:
+                return sequence // 2, values
+
+    def read(self) -> SharedState:
+        sequence, values = self.read_values()
+        layout = self._layout
+        width = layout.max_channels
+
+        meters = {}
+        for index, name in enumerate(layout.meters):
+            channels = slice(index * width, index * width + int(values[layout.channels_offset + index]))
+            meters[name] = MeterValues(
+                peak_db=tuple(values[layout.peak_offset:layout.rms_offset][channels]),
+                rms_db=tuple(values[layout.rms_offset:layout.decay_offset][channels]),
+                decay_db=tuple(values[layout.decay_offset:layout.clip_offset][channels]),
+                clip=tuple(bool(clip) for clip in values[layout.clip_offset:layout.parameters_offset][channels]),
+            )
+        parameters = dict(zip(layout.parameters, values[layout.parameters_offset:]))
+        return SharedState(sequence, meters, parameters)
+
+    def close(self):
+        self._sequence.release()
+        self._values.release()
+        self._mmap.close()
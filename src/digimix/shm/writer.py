@@ -0,0 +1,90 @@
+import contextlib
+import mmap
+import os
+import typing
+
+from digimix.shm.layout import DEFAULT_PATH, HEADER, MAGIC, SEQUENCE_OFFSET, VERSION, Layout
+
+
+class SharedStateWriter:
+    def __init__(self, layout: Layout, path: str = DEFAULT_PATH):
+        self._layout = layout
+        self._path = str(path)
+
+        size = layout.size()
+        # no O_TRUNC, readers may still have the file of a previous writer mapped and would fault on a shrunk file
+        fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, size)
+            self._mmap = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+        encoded = layout.encode()
+        HEADER.pack_into(self._mmap, 0, MAGIC, VERSION, len(encoded), layout.data_offset(), layout.value_count, 0)
+        self._mmap[HEADER.size:HEADER.size + len(encoded)] = encoded
+
+        self._sequence_view = memoryview(self._mmap)[SEQUENCE_OFFSET:SEQUENCE_OFFSET + 8].cast('Q')
+        self._values = memoryview(self._mmap)[layout.data_offset():].cast('d')
+        self._sequence = 0
+        self._writing = False
+
+    @property
+    def layout(self) -> Layout:
+        return self._layout
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def sequence(self) -> int:
+        return self._sequence
+
+    @contextlib.contextmanager
+    def write(self):
+        # seqlock: odd while writing, readers in other processes retry instead of ever blocking the writer
+        if self._writing:
+            # nested, the outermost write publishes everything at once
+            yield self._values
+            return
+        self._writing = True
+        self._sequence += 1
+        self._sequence_view[0] = self._sequence
+        try:
+            yield self._values
+        finally:
+            self._sequence += 1
+            self._sequence_view[0] = self._sequence
+            self._writing = False
+
+    def set_meter(
+        self,
+        index: int,
+        peak_db: typing.Sequence[float],
+        rms_db: typing.Sequence[float],
+        decay_db: typing.Sequence[float],
+        clip: typing.Sequence[bool] = (),
+    ):
+        layout = self._layout
+        channels = min(len(peak_db), layout.max_channels)
+        offset = index * layout.max_channels
+        with self.write() as values:
+            values[layout.channels_offset + index] = channels
+            for i in range(channels):
+                values[layout.peak_offset + offset + i] = peak_db[i]
+                values[layout.rms_offset + offset + i] = rms_db[i]
+                values[layout.decay_offset + offset + i] = decay_db[i]
+                values[layout.clip_offset + offset + i] = float(i < len(clip) and clip[i])
+
+    def set_parameter(self, index: int, value: float):
+        with self.write() as values:
+            values[self._layout.parameters_offset + index] = float(value)
+
+    def close(self, unlink: bool = True):
+        self._sequence_view.release()
+        self._values.release()
+        self._mmap.close()
+        if unlink:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self._path)
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 # based on https://github.com/voc/voctomix/blob/3156f3546890e6ae8d379df17e5cc718eee14b15/vocto/debug.py
 
 import logging
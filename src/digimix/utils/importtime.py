@@ -0,0 +1,61 @@
+import re
+import subprocess
+import sys
+import typing
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+class ImportEntry(typing.NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+class ImportProfile(typing.NamedTuple):
+    module: str
+    entries: tuple[ImportEntry, ...]
+
+    @property
+    def modules(self) -> frozenset[str]:
+        return frozenset(entry.module for entry in self.entries)
+
+    @property
+    def total_us(self) -> int:
+        return sum(entry.self_us for entry in self.entries)
+
+    def cumulative_us(self, module: str) -> int:
+        return max((entry.cumulative_us for entry in self.entries if entry.module == module), default=0)
+
+    def slowest(self, count: int = 10) -> list[ImportEntry]:
+        return sorted(self.entries, key=lambda entry: entry.self_us, reverse=True)[:count]
+
+    def format(self, count: int = 10) -> str:
+        lines = [f"{self.module}: {self.cumulative_us(self.module) / 1000:.1f}ms, {len(self.entries)} modules imported"]
+        for entry in self.slowest(count):
+            lines.append(f"  {entry.self_us / 1000:>8.2f}ms {entry.module}")
+        return '\n'.join(lines)
+
+
+def parse_importtime(module: str, output: str) -> ImportProfile:
+    entries = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        entries.append(ImportEntry(name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return ImportProfile(module, tuple(entries))
+
+
+def measure_import(module: str, python: str = sys.executable) -> ImportProfile:
+    # a fresh interpreter per module, anything already imported would hide its cost
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+    return parse_importtime(module, result.stderr)
@@ -1,3 +1,6 @@
+from __future__ import annotations
+
+import argparse
 import threading
 import time
 
@@ -5,68 +8,181 @@ from digimix.audio import GLib, Gst
 from digimix.audio.base import AudioMode
 from digimix.audio.buses import MasterBus
 from digimix.audio.channels import FaderChannel
-from digimix.audio.io.jack import SingleJackClientInput, SingleJackClientOutput
+from digimix.audio.formats import FormatAudit, SampleFormat
+from digimix.audio.io.jack import JackClient, SingleJackClientInput, SingleJackClientOutput, jack_server_rate
+from digimix.audio.io.wav import WavFileInput, WavFileOutput
+from digimix.audio.latency import LatencyTracer
+from digimix.audio.metering import MeteringService
+from digimix.audio.pipeline import Topology
+from digimix.audio.profiles import LIVE, OFFLINE
+from digimix.audio.recorder import Recorder
+from digimix.audio.render import ParameterScript, render
+from digimix.audio.scheduler import ParameterScheduler
+from digimix.audio.threads import RealtimePolicy, ThreadPlacement
+from digimix.audio.tracks import RecordFormat
+from digimix.audio.watchdog import DropoutWatchdog
+from digimix.shm.export import MixerStateExport
+from digimix.shm.layout import DEFAULT_PATH
 from digimix.utils.debug.gstreamer import gst_generate_dot
 
 if __name__ == '__main__':
-    src = SingleJackClientInput(
-        name="main_in",
-        conf=(
-            ("mic1", AudioMode.MONO),
-            ("music", AudioMode.STEREO),
-            ("drums", AudioMode.STEREO),
-            ("bass", AudioMode.MONO),
-            ("guitar", AudioMode.MONO),
-        )
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--latency-report',
+        type=float,
+        metavar='SECONDS',
+        help="measure latency for the given time, print a per element / path report and exit",
+    )
+    parser.add_argument(
+        '--render',
+        nargs=2,
+        metavar=('INPUT_DIR', 'OUTPUT_DIR'),
+        help="render <input>.wav files from INPUT_DIR offline into OUTPUT_DIR as fast as possible and exit",
+    )
+    parser.add_argument(
+        '--script',
+        metavar='FILE',
+        help="parameter changes replayed during --render, one '<seconds> <element> <attribute> <value>' per line",
+    )
+    parser.add_argument(
+        '--realtime',
+        action='store_true',
+        help="run streaming threads with SCHED_FIFO priority and lock memory, where permitted",
+    )
+    parser.add_argument(
+        '--export-state',
+        nargs='?',
+        const=DEFAULT_PATH,
+        metavar='PATH',
+        help=f"publish meters and parameters into a shared memory file for external UIs (default {DEFAULT_PATH})",
+    )
+    parser.add_argument(
+        '--rate',
+        type=int,
+        help=f"internal sample rate, overrides the JACK server rate (default: the JACK rate, {SampleFormat().rate} "
+             f"when rendering or without a JACK server)",
+    )
+    parser.add_argument(
+        '--caps-audit',
+        action='store_true',
+        help="print negotiated formats and any conversion happening inside the pipeline once it is playing",
+    )
+    parser.add_argument(
+        '--record',
+        metavar='DIR',
+        help="record every channel pre-fader and the master bus into DIR while running",
     )
+    parser.add_argument(
+        '--record-format',
+        # FLAC needs soundfile, which isn't part of the default install
+        choices=[record_format.name for record_format in RecordFormat if record_format is not RecordFormat.FLAC],
+        default=RecordFormat.W64.name,
+    )
+    parser.add_argument(
+        '--watchdog',
+        metavar='FILE',
+        help="count dropouts, QoS and pipeline warnings per channel and dump their timeline to FILE on shutdown",
+    )
+    args = parser.parse_args()
+    rate = args.rate
+    if rate is None and not args.render:
+        # caps pin the rate, the pipeline only negotiates at the rate the JACK server runs at
+        rate = jack_server_rate()
+    sample_format = SampleFormat(rate=rate or SampleFormat().rate)
 
-    mic1 = FaderChannel(
-        name="mic1",
+    input_conf = (
+        ("mic1", AudioMode.MONO),
+        ("music", AudioMode.STEREO),
+        ("drums", AudioMode.STEREO),
+        ("bass", AudioMode.MONO),
+        ("guitar", AudioMode.MONO),
+    )
+    output_conf = (
+        ("main", AudioMode.STEREO),
     )
-    music = FaderChannel(name="music")
-    drums = FaderChannel(name="drums")
-    bass = FaderChannel(name="bass")
-    guitar = FaderChannel(name="guitar")
 
-    master = MasterBus(name="master", inputs=[
+    if args.render:
+        topology = Topology(name="digimix", profile=OFFLINE, sample_format=sample_format)
+        src = topology.add(WavFileInput(name="main_in", conf=input_conf, directory=args.render[0]))
+    else:
+        topology = Topology(name="digimix", profile=LIVE, sample_format=sample_format)
+        src = topology.add(SingleJackClientInput(name="main_in", conf=input_conf))
+
+    mic1 = topology.add(FaderChannel(
+        name="mic1",
+    ))
+    music = topology.add(FaderChannel(name="music"))
+    drums = topology.add(FaderChannel(name="drums"))
+    bass = topology.add(FaderChannel(name="bass"))
+    guitar = topology.add(FaderChannel(name="guitar"))
+
+    master = topology.add(MasterBus(name="master", inputs=[
         mic1.src[0],
         music.src[0],
         drums.src[0],
         bass.src[0],
         guitar.src[0],
-    ])
+    ]))
 
-    out = SingleJackClientOutput(
-        name="main_out",
-        conf=(
-            ("main", AudioMode.STEREO),
-        )
-    )
+    if args.render:
+        out = topology.add(WavFileOutput(name="main_out", conf=output_conf, directory=args.render[1]))
+    else:
+        out = topology.add(SingleJackClientOutput(name="main_out", conf=output_conf))
+
+    topology.link(src.src[0], mic1.sink[0])
+    topology.link(src.src[1], music.sink[0])
+    topology.link(src.src[2], drums.sink[0])
+    topology.link(src.src[3], bass.sink[0])
+    topology.link(src.src[4], guitar.sink[0])
+    topology.link(master.src[0], out.sink[0])
 
-    desc = ""
-    desc += src.pipeline_description + "\n"
-    desc += mic1.pipeline_description + "\n"
-    desc += music.pipeline_description + "\n"
-    desc += drums.pipeline_description + "\n"
-    desc += bass.pipeline_description + "\n"
-    desc += guitar.pipeline_description + "\n"
-    desc += master.pipeline_description + "\n"
-    desc += out.pipeline_description + "\n"
-
-    desc += f"{src.src[0]}. ! {mic1.sink[0]}." + "\n"
-    desc += f"{src.src[1]}. ! {music.sink[0]}." + "\n"
-    desc += f"{src.src[2]}. ! {drums.sink[0]}." + "\n"
-    desc += f"{src.src[3]}. ! {bass.sink[0]}." + "\n"
-    desc += f"{src.src[4]}. ! {guitar.sink[0]}." + "\n"
-    desc += f"{master.src[0]}. ! {out.sink[0]}." + "\n"
-
-    print(desc)
+    print(topology.pipeline_description)
+    print(topology.buffering_report())
+
+    if args.render:
+        script = None
+        if args.script is not None:
+            with open(args.script) as script_file:
+                script = ParameterScript.parse(script_file.read(), topology)
+        print(render(topology, script))
+        raise SystemExit(0)
 
     main = GLib.MainLoop()
-    pipeline = Gst.parse_launch(desc)  # type: Gst.Pipeline
+    pipeline = topology.create_pipeline()
     assert pipeline
+    scheduler = ParameterScheduler(interval_us=JackClient.JACK_LATENCY_TIME_US)
+    topology.attach_pipeline(pipeline, scheduler=scheduler)
+
+    placement = ThreadPlacement.for_topology(
+        topology,
+        realtime=RealtimePolicy(lock_memory=True) if args.realtime else None,
+    )
+    placement.attach_pipeline(pipeline)
+
+    tracer = None
+    if args.latency_report is not None:
+        tracer = LatencyTracer.for_topology(topology)
+        tracer.start()
+
+    watchdog = None
+    if args.watchdog is not None:
+        watchdog = DropoutWatchdog.for_topology(topology)
+        watchdog.attach_pipeline(pipeline)
+
+    export = None
+    if args.export_state is not None:
+        metering = MeteringService(topology)
+        metering.attach_pipeline(pipeline)
+        export = MixerStateExport(metering.bank, topology.elements, path=args.export_state)
+        export.start()
+
     pipeline.set_state(Gst.State.PLAYING)
-    music.attach_pipeline(pipeline)
+
+    recorder = None
+    if args.record is not None:
+        recorder = Recorder.for_topology(topology, record_format=RecordFormat[args.record_format])
+        recorder.attach_pipeline(pipeline)
+        recorder.start(args.record)
 
 
     def threader():
@@ -85,10 +201,39 @@ if __name__ == '__main__':
         main.quit()
 
 
-    t = threading.Thread(name="fader_channel_tester", target=threader)
-    t.start()
+    def latency_reporter():
+        tracer.stop()
+        print(tracer.report(pipeline).format())
+        main.quit()
+        return GLib.SOURCE_REMOVE
+
+
+    def caps_auditor():
+        print(FormatAudit.from_pipeline(pipeline, sample_format).format())
+        return GLib.SOURCE_REMOVE
+
+
+    if args.caps_audit:
+        GLib.timeout_add(1000, caps_auditor)
+    if tracer is not None:
+        GLib.timeout_add(int(args.latency_report * 1000), latency_reporter)
+    else:
+        t = threading.Thread(name="fader_channel_tester", target=threader)
+        t.start()
 
     try:
         main.run()
     except KeyError:
         main.quit()
+    finally:
+        if recorder is not None:
+            print(recorder.stop().format())
+        pipeline.set_state(Gst.State.NULL)
+        if watchdog is not None:
+            watchdog.detach()
+            print(watchdog.report().format())
+            watchdog.dump(args.watchdog)
+        if export is not None:
+            export.close()
+        if args.realtime:
+            print(placement.report().format())
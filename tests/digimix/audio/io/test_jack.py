@@ -1,5 +1,11 @@
 from digimix.audio.base import AudioMode
-from digimix.audio.io.jack import MultiJackClientInput, SingleJackClientInput, SingleJackClientOutput
+from digimix.audio.io.jack import (
+    MatrixJackClientInput,
+    MatrixJackClientOutput,
+    MultiJackClientInput,
+    SingleJackClientInput,
+    SingleJackClientOutput,
+)
 from digimix.audio.utils import escape_pipeline_description
 
 
@@ -84,3 +90,56 @@ class TestSingleJackClientOutput:
 
         print(desc)
         print(escape_pipeline_description(desc))
+
+
+class TestMatrixJackClientInput:
+    def test_pipeline_description(self):
+        in_patch_panel = MatrixJackClientInput(
+            'test',
+            (
+                ('music', AudioMode.STEREO),
+                ('mic', AudioMode.MONO),
+            )
+        )
+        desc = in_patch_panel.pipeline_description
+
+        print(desc)
+        assert desc.count("! deinterleave") == 1
+        assert desc.count("audiointerleave") == 1
+        assert "queue" not in desc
+        assert "audiomixmatrix" not in desc
+
+
+class TestMatrixJackClientOutput:
+    def test_pipeline_description(self):
+        in_patch_panel = MatrixJackClientInput(
+            'test',
+            (
+                ('music', AudioMode.STEREO),
+                ('mic', AudioMode.MONO),
+            )
+        )
+        out_patch_panel = MatrixJackClientOutput(
+            'test',
+            (
+                ('music', AudioMode.STEREO),
+                ('mic', AudioMode.MONO),
+            )
+        )
+        desc = in_patch_panel.pipeline_description
+        desc += out_patch_panel.pipeline_description
+        desc += f"""
+        {in_patch_panel.src[0]}.
+        ! {out_patch_panel.sink[0]}.
+        {in_patch_panel.src[1]}.
+        ! {out_patch_panel.sink[1]}.
+        """
+
+        print(desc)
+        print(escape_pipeline_description(desc))
+        # one aggregator per direction, the stereo input pairs its sides up in its own
+        assert desc.count("audiointerleave") == 2
+        assert "audiomixer" not in desc
+        assert "audiomixmatrix" not in desc
+        assert desc.count("queue\n") == 2
+        assert desc.count("jackaudiosink") == 1
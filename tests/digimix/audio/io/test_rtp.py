@@ -0,0 +1,98 @@
+import socket
+import time
+
+import pytest
+
+from digimix.audio import Gst
+from digimix.audio.base import AudioMode
+from digimix.audio.formats import INTERNAL_FORMAT
+from digimix.audio.io.rtp import RtpEncoding, RtpInput, RtpOutput
+from digimix.audio.pipeline import Topology
+
+MS_NS = 1000 * 1000
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as udp:
+        udp.bind(("127.0.0.1", 0))
+        return udp.getsockname()[1] & ~1
+
+
+class TestRtpInput:
+    def test_pipeline_description(self):
+        rtp_in = RtpInput(
+            'stagebox',
+            (
+                ('music', AudioMode.STEREO),
+                ('mic', AudioMode.MONO),
+            ),
+            port=5004,
+            latency_ns=10 * MS_NS,
+        )
+        desc = rtp_in.pipeline_description
+
+        print(desc)
+        assert rtp_in.src == ['rtp-src-music', 'rtp-src-mic']
+        assert 'port=5004' in desc
+        assert 'port=5006' in desc
+        assert desc.count('rtpL24depay') == 2
+        assert 'encoding-name=L24,channels=2' in desc
+        assert 'latency=10' in desc
+
+    def test_invalid_conf(self):
+        with pytest.raises(ValueError):
+            RtpInput('stagebox', (('mic', AudioMode.MONO),), port=5005)
+        with pytest.raises(RuntimeError):
+            RtpInput('stagebox', (('left', AudioMode.LEFT_ONLY),), port=5004)
+
+
+class TestRtpOutput:
+    def test_pipeline_description(self):
+        rtp_out = RtpOutput(
+            'stagebox',
+            (('main', AudioMode.STEREO),),
+            host='192.168.1.20',
+            port=5004,
+            encoding=RtpEncoding.L16,
+            ptime_ns=4 * MS_NS,
+        )
+        desc = rtp_out.pipeline_description
+
+        print(desc)
+        assert rtp_out.sink == ['rtp-sink-main']
+        assert rtp_out.packets_per_second == 250
+        assert 'rtpL16pay' in desc
+        assert 'format=S16BE' in desc
+        assert 'min-ptime=4000000' in desc
+        assert 'host=192.168.1.20' in desc
+
+
+class TestLoopback:
+    def test_statistics(self):
+        port = free_port()
+        topology = Topology()
+        rtp_out = topology.add(RtpOutput('send', (('mic', AudioMode.MONO),), host='127.0.0.1', port=port))
+        rtp_in = topology.add(RtpInput('receive', (('mic', AudioMode.MONO),), address='127.0.0.1', port=port))
+        pipeline = topology.create_pipeline()
+
+        source = Gst.parse_bin_from_description(
+            f"audiotestsrc is-live=true ! {INTERNAL_FORMAT.format_info},channels=1", True,
+        )
+        sink = Gst.ElementFactory.make("fakesink", "sink")
+        pipeline.add(source)
+        pipeline.add(sink)
+        assert source.link(pipeline.get_by_name(rtp_out.sink[0]))
+        assert pipeline.get_by_name(rtp_in.src[0]).link(sink)
+        topology.attach_pipeline(pipeline)
+
+        pipeline.set_state(Gst.State.PLAYING)
+        try:
+            time.sleep(0.5)
+            statistics = rtp_in.statistics()["mic"]
+        finally:
+            pipeline.set_state(Gst.State.NULL)
+
+        print(statistics.format())
+        assert statistics.pushed > 100
+        assert statistics.loss_ratio < 0.05
+        assert statistics.configured_latency_ns == rtp_in.latency_ns
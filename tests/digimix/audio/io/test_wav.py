@@ -0,0 +1,39 @@
+import pytest
+
+from digimix.audio.base import AudioMode
+from digimix.audio.io.wav import WavFileInput, WavFileOutput
+
+
+class TestWavFileInput:
+    def test_pipeline_description(self):
+        in_patch_panel = WavFileInput(
+            'test',
+            (
+                ('music', AudioMode.STEREO),
+                ('mic', AudioMode.MONO),
+            ),
+            directory='/tmp/in',
+        )
+        desc = in_patch_panel.pipeline_description
+
+        print(desc)
+        assert in_patch_panel.src == ['wav-src-music', 'wav-src-mic']
+        assert 'location=/tmp/in/music.wav' in desc
+        assert 'location=/tmp/in/mic.wav' in desc
+        assert desc.count('wavparse') == 2
+
+    def test_unsupported_mode(self):
+        with pytest.raises(RuntimeError):
+            WavFileInput('test', (('left', AudioMode.LEFT_ONLY),), directory='/tmp/in')
+
+
+class TestWavFileOutput:
+    def test_pipeline_description(self):
+        out_patch_panel = WavFileOutput('test', (('main', AudioMode.STEREO),), directory='/tmp/out')
+        desc = out_patch_panel.pipeline_description
+
+        print(desc)
+        assert out_patch_panel.sink == ['wav-sink-main']
+        assert 'location=/tmp/out/main.wav' in desc
+        assert 'sync=false' in desc
+        assert 'format=F32LE' in desc
@@ -0,0 +1,76 @@
+import pytest
+
+from digimix.audio import Gst
+from digimix.audio.automation import ParameterRamp
+from digimix.audio.bindings import ParameterBindings
+from digimix.audio.channels import FaderChannel
+from digimix.audio.pipeline import Topology
+from digimix.audio.utils import db_to_amplitude
+
+MS = 1000 * 1000
+
+
+class TestParameterRamp:
+    def test_ramp_to(self):
+        pipeline = Gst.Pipeline.new("test")
+        pipeline.add(Gst.ElementFactory.make("volume", "vol"))
+        bindings = ParameterBindings.resolve(pipeline, {"fader": ("vol", "volume")})
+
+        ramp = ParameterRamp(bindings["fader"], ramp_time_ns=100 * MS)
+        ramp.ramp_to(0.5, start_ns=0)
+
+        assert ramp.control_source.get_value(0) == (True, pytest.approx(1.0))
+        assert ramp.control_source.get_value(50 * MS) == (True, pytest.approx(0.75))
+        assert ramp.control_source.get_value(200 * MS) == (True, pytest.approx(0.5))
+
+        ramp.ramp_to(0.0, ramp_time_ns=0, start_ns=50 * MS)
+        assert ramp.control_source.get_value(50 * MS) == (True, pytest.approx(0.0))
+        assert bindings["fader"].get() == pytest.approx(0.0)
+
+
+class TestFaderChannelAutomation:
+    def test_ramp_times(self):
+        topology = Topology()
+        fader = topology.add(FaderChannel(name="mic"))
+        fader.set_ramp_time_ns("fader", 10 * MS)
+        with pytest.raises(KeyError):
+            fader.set_ramp_time_ns("pan_method", 10 * MS)
+
+        pipeline = topology.create_pipeline()
+        topology.attach_pipeline(pipeline)
+
+        assert set(fader.automation.ramps) == set(FaderChannel.RAMP_TIMES_NS)
+        assert fader.automation.ramps["fader"].ramp_time_ns == 10 * MS
+
+        fader.fader_db = -20
+        control_source = fader.automation.ramps["fader"].control_source
+        assert control_source.get_value(10 * MS) == (True, pytest.approx(db_to_amplitude(-20)))
+
+
+class TestScheduledParameters:
+    def test_schedule_keeps_earlier_points(self):
+        pipeline = Gst.Pipeline.new("test")
+        pipeline.add(Gst.ElementFactory.make("volume", "vol"))
+        bindings = ParameterBindings.resolve(pipeline, {"fader": ("vol", "volume")})
+
+        ramp = ParameterRamp(bindings["fader"], ramp_time_ns=10 * MS)
+        ramp.schedule(0.5, at_ns=100 * MS)
+        ramp.schedule(0.0, at_ns=200 * MS)
+
+        assert ramp.control_source.get_value(50 * MS) == (True, pytest.approx(1.0))
+        assert ramp.control_source.get_value(150 * MS) == (True, pytest.approx(0.5))
+        assert ramp.control_source.get_value(205 * MS) == (True, pytest.approx(0.25))
+        assert ramp.control_source.get_value(300 * MS) == (True, pytest.approx(0.0))
+        assert bindings["fader"].get() == pytest.approx(1.0)
+
+    def test_scheduled_at(self):
+        topology = Topology()
+        fader = topology.add(FaderChannel(name="mic"))
+        pipeline = topology.create_pipeline()
+        topology.attach_pipeline(pipeline)
+
+        with fader.scheduled_at(100 * MS):
+            fader.fader_db = -20
+        control_source = fader.automation.ramps["fader"].control_source
+        assert control_source.get_value(50 * MS) == (True, pytest.approx(1.0))
+        assert control_source.get_value(200 * MS) == (True, pytest.approx(db_to_amplitude(-20)))
@@ -0,0 +1,65 @@
+import pytest
+
+from digimix.audio import Gst
+from digimix.audio.base import Stereo2Mono
+from digimix.audio.bindings import ParameterBindings
+from digimix.audio.channels import AudioPanoramaMethods, FaderChannel
+from digimix.audio.pipeline import Topology
+from digimix.audio.utils import db_to_amplitude
+
+
+class TestParameterBindings:
+    def test_resolve(self):
+        pipeline = Gst.Pipeline.new("test")
+        pipeline.add(Gst.ElementFactory.make("volume", "vol"))
+
+        bindings = ParameterBindings.resolve(pipeline, {"fader": ("vol", "volume"), "cut": ("vol", "mute")})
+        assert set(bindings) == {"fader", "cut"}
+        assert bindings["fader"].element is bindings["cut"].element
+
+        bindings.set("fader", 0.5)
+        assert bindings["fader"].get() == 0.5
+        bindings.set("unknown", 1)
+
+    def test_resolve_missing(self):
+        pipeline = Gst.Pipeline.new("test")
+        pipeline.add(Gst.ElementFactory.make("volume", "vol"))
+
+        with pytest.raises(RuntimeError):
+            ParameterBindings.resolve(pipeline, {"fader": ("missing", "volume")})
+        with pytest.raises(RuntimeError):
+            ParameterBindings.resolve(pipeline, {"fader": ("vol", "missing")})
+
+
+class TestAttachPipeline:
+    def test_fader_channel(self):
+        topology = Topology()
+        fader = topology.add(FaderChannel(name="mic"))
+        pipeline = topology.create_pipeline()
+        topology.attach_pipeline(pipeline)
+
+        assert set(fader.bindings) == set(fader.parameter_targets)
+
+        fader.fader_db = -10
+        fader.gain_db = 6
+        fader.pan = -0.5
+        fader.pan_method = AudioPanoramaMethods.SIMPLE
+        fader.cut = True
+
+        assert fader.bindings["fader"].get() == pytest.approx(db_to_amplitude(-10))
+        assert fader.bindings["gain"].get() == pytest.approx(db_to_amplitude(6))
+        assert fader.bindings["pan"].get() == pytest.approx(-0.5)
+        assert int(fader.bindings["pan_method"].get()) == AudioPanoramaMethods.SIMPLE
+        assert fader.bindings["cut"].get() is True
+
+        with pytest.raises(RuntimeError):
+            fader.attach_pipeline(pipeline)
+
+    def test_stereo2mono(self):
+        topology = Topology()
+        el = topology.add(Stereo2Mono("test"))
+        pipeline = topology.create_pipeline()
+        topology.attach_pipeline(pipeline)
+
+        el.level_db = -6
+        assert el.bindings["level"].get() == pytest.approx(db_to_amplitude(-6))
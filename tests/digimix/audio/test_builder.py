@@ -0,0 +1,55 @@
+from digimix.audio.builder import DescriptionBuilder, PadRef, value_array
+
+
+class TestDescriptionBuilder:
+    def test_chain(self):
+        builder = DescriptionBuilder()
+        builder.chain(
+            builder.element("audiotestsrc", "src", is_live=True),
+            builder.element("fakesink", "sink"),
+        )
+
+        desc = builder.description
+        print(desc)
+        assert desc.split() == ["audiotestsrc", "name=src", "is-live=true", "!", "fakesink", "name=sink"]
+
+    def test_pad_reference_declares_element_first(self):
+        builder = DescriptionBuilder()
+        with builder.bin("bin-test"):
+            split = builder.element("deinterleave", "split")
+            builder.chain(builder.element("audiotestsrc", "src"), split)
+            builder.chain(PadRef(split, "src_0"), builder.element("fakesink", "sink_0"))
+            mix = builder.element("audiomixer", "mix")
+            builder.link(split, mix, "src_1", "sink_1")
+
+        desc = builder.description
+        print(desc)
+        assert desc.index("audiomixer") < desc.index("split.src_1")
+        assert "split.src_0\n" in desc
+        assert "! mix.sink_1" in desc
+
+    def test_reference_splits_chain(self):
+        builder = DescriptionBuilder()
+        builder.chain(builder.element("tee", "t"))
+        builder.chain(builder.element("audiotestsrc", "src"), "t", builder.element("fakesink", "sink"))
+
+        desc = builder.description
+        print(desc)
+        assert "! t.\n" in desc
+        assert "\nt.\n! fakesink" in desc
+
+    def test_serialized_value(self):
+        builder = DescriptionBuilder()
+        builder.chain(builder.element("audiomixmatrix", "matrix", matrix=value_array([[1., 0.], [0., 1.5]])))
+
+        desc = builder.description
+        print(desc)
+        assert 'matrix="<<(double)1.0, (double)0.0>, <(double)0.0, (double)1.5>>"' in desc
+
+    def test_keyword_property(self):
+        builder = DescriptionBuilder()
+        builder.chain(builder.element("fakesink", "sink", async_=False))
+
+        desc = builder.description
+        print(desc)
+        assert "async=" in desc and "async-" not in desc
@@ -1,4 +1,11 @@
+import time
+
+import pytest
+
+from digimix.audio import Gst
 from digimix.audio.channels import FaderChannel
+from digimix.audio.pipeline import Topology
+from digimix.audio.stages import DynamicsStage, EqualizerBand, EqualizerStage, HighPassStage
 from digimix.audio.utils import escape_pipeline_description
 
 
@@ -18,3 +25,106 @@ class TestFaderChannel:
 
         print(desc)
         print(escape_pipeline_description(desc))
+
+
+def make_stages(bypass: bool = False) -> list:
+    return [
+        HighPassStage(cutoff_hz=100., bypass=bypass),
+        EqualizerStage([EqualizerBand(freq=1000., bandwidth=500., gain_db=3.)], bypass=bypass),
+        DynamicsStage.gate(bypass=bypass),
+    ]
+
+
+def chain(topology: Topology, channel: FaderChannel) -> list[str]:
+    graph = topology.graph
+    downstream = graph.downstream()
+    names = []
+    name = f"fader_channel-gain-{channel.name}"
+    while name != f"fader_channel-pre_fader-{channel.name}":
+        names.append(graph.elements[name].factory)
+        name = downstream[name][0]
+    return names
+
+
+class TestFaderChannelStages:
+    def test_bypassed_stages_are_not_built(self):
+        topology = Topology()
+        channel = topology.add(FaderChannel(name="mic", stages=make_stages(bypass=True)))
+        assert chain(topology, channel) == ["audioamplify"]
+        assert set(channel.stages) == {"hpf", "eq", "dynamics"}
+
+    def test_active_stages(self):
+        topology = Topology()
+        channel = topology.add(FaderChannel(name="mic", stages=make_stages()))
+        assert chain(topology, channel) == ["audioamplify", "audiocheblimit", "equalizer-nbands", "audiodynamic"]
+
+        channel.set_bypass("eq", True)
+        assert chain(topology, channel) == ["audioamplify", "audiocheblimit", "audiodynamic"]
+        assert 'mode="expander"' in topology.pipeline_description
+
+    def test_duplicate_stage(self):
+        with pytest.raises(ValueError):
+            FaderChannel(name="mic", stages=[HighPassStage(), HighPassStage(cutoff_hz=60.)])
+
+    @staticmethod
+    def play(topology: Topology, channel: FaderChannel) -> Gst.Pipeline:
+        pipeline = topology.create_pipeline()
+        source = Gst.ElementFactory.make("audiotestsrc", "source")
+        source.set_property("is-live", True)
+        sink = Gst.ElementFactory.make("fakesink", "sink")
+        pipeline.add(source)
+        pipeline.add(sink)
+        assert source.link(pipeline.get_by_name(channel.sink[0]))
+        assert pipeline.get_by_name(channel.src[0]).link(sink)
+        topology.attach_pipeline(pipeline)
+        pipeline.set_state(Gst.State.PLAYING)
+        return pipeline
+
+    @staticmethod
+    def live_chain(pipeline: Gst.Pipeline, channel: FaderChannel) -> list[str]:
+        names = []
+        element = pipeline.get_by_name(f"fader_channel-gain-{channel.name}")
+        while element.get_name() != f"fader_channel-pre_fader-{channel.name}":
+            # an unlinked or looping chain fails instead of walking forever
+            assert len(names) <= len(channel.stages)
+            names.append(element.get_factory().get_name())
+            element = element.get_static_pad("src").get_peer().get_parent_element()
+        return names
+
+    def test_live_bypass(self):
+        topology = Topology()
+        channel = topology.add(FaderChannel(name="mic", stages=make_stages(bypass=True)))
+        pipeline = self.play(topology, channel)
+        try:
+            channel.set_bypass("eq", False)
+            time.sleep(0.1)
+            eq = pipeline.get_by_name("fader_channel-eq-mic")
+            assert eq is not None
+            assert eq.get_child_by_index(0).get_property("gain") == 3.
+            assert eq.get_static_pad("src").get_peer().get_parent_element().get_name() == "fader_channel-pre_fader-mic"
+
+            channel.set_bypass("eq", True)
+            time.sleep(0.1)
+            assert pipeline.get_by_name("fader_channel-eq-mic") is None
+            gain = pipeline.get_by_name("fader_channel-gain-mic")
+            assert gain.get_static_pad("src").get_peer().get_parent_element().get_name() == "fader_channel-pre_fader-mic"
+        finally:
+            pipeline.set_state(Gst.State.NULL)
+
+    def test_live_bypass_burst(self):
+        topology = Topology()
+        channel = topology.add(FaderChannel(name="mic", stages=make_stages(bypass=True)))
+        pipeline = self.play(topology, channel)
+        try:
+            # toggles faster than the pad goes idle end up in the last requested state
+            for _ in range(3):
+                channel.set_bypass("eq", False)
+                channel.set_bypass("hpf", False)
+                channel.set_bypass("eq", True)
+                channel.set_bypass("dynamics", False)
+                channel.set_bypass("hpf", True)
+            channel.set_bypass("eq", False)
+            time.sleep(0.1)
+            assert self.live_chain(pipeline, channel) == ["audioamplify", "equalizer-nbands", "audiodynamic"]
+        finally:
+            pipeline.set_state(Gst.State.NULL)
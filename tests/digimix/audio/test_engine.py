@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from digimix.audio.base import AudioMode
+from digimix.audio.channels import AudioPanoramaMethods
+from digimix.audio.engine import ChannelStripEngine, VectorFaderChannel, VectorMasterBus
+from digimix.audio.formats import SampleFormat
+from digimix.audio.pipeline import Topology
+
+
+def constant_block(values, frames=4):
+    return np.repeat(np.array(values, dtype=np.float32)[:, :, None], frames, axis=2)
+
+
+class TestChannelStripEngine:
+    def test_pan_laws(self):
+        engine = ChannelStripEngine()
+        engine.add_strip(1, pan=0.5)
+        engine.add_strip(1, pan=0.5, pan_method=int(AudioPanoramaMethods.SIMPLE))
+        engine.add_strip(2, pan=-0.5)
+        engine.add_strip(2, pan=-0.5, pan_method=int(AudioPanoramaMethods.SIMPLE))
+
+        np.testing.assert_allclose(engine.coefficients(), [
+            [[0.25, 0.], [0.75, 0.]],
+            [[0.5, 0.], [1., 0.]],
+            [[1., 0.5], [0., 0.5]],
+            [[1., 0.], [0., 0.5]],
+        ])
+
+    def test_process_sums_strips(self):
+        engine = ChannelStripEngine()
+        engine.add_strip(1, gain=2.)
+        engine.add_strip(2, fader=0.5, phase_invert=True)
+        engine.add_strip(2, cut=True)
+
+        out = engine.process(constant_block([[1., 0.], [1., 0.5], [1., 1.]]))
+        np.testing.assert_allclose(out, [[0.5] * 4, [0.75] * 4])
+
+    def test_ramp(self):
+        engine = ChannelStripEngine()
+        index = engine.add_strip(2)
+        engine.set(index, "fader", 0.)
+
+        out = engine.process(constant_block([[1., 1.]]))
+        np.testing.assert_allclose(out[0], [0.75, 0.5, 0.25, 0.])
+        np.testing.assert_allclose(engine.process(constant_block([[1., 1.]])), 0.)
+
+    def test_invalid(self):
+        engine = ChannelStripEngine()
+        with pytest.raises(ValueError):
+            engine.add_strip(3)
+        index = engine.add_strip(1)
+        with pytest.raises(KeyError):
+            engine.set(index, "volume", 1.)
+
+
+class TestVectorFaderChannel:
+    def test_properties_update_engine(self):
+        mic = VectorFaderChannel(name="mic", mode=AudioMode.MONO, gain_db=6)
+        music = VectorFaderChannel(name="music", pan=-1)
+        bus = VectorMasterBus(name="main", channels=[mic, music])
+
+        music.fader_db = -20
+        music.cut = True
+        mic.pan = 1
+
+        coefficients = bus.engine.coefficients()
+        np.testing.assert_allclose(coefficients[0], [[0., 0.], [mic.gain_amplitude, 0.]], rtol=1e-6)
+        np.testing.assert_allclose(coefficients[1], 0.)
+
+    def test_pipeline_description(self):
+        topology = Topology()
+        channels = [
+            topology.add(VectorFaderChannel(name="mic", mode=AudioMode.MONO)),
+            topology.add(VectorFaderChannel(name="music")),
+        ]
+        bus = topology.add(VectorMasterBus(name="main", channels=channels))
+
+        desc = topology.pipeline_description
+        print(desc)
+        assert desc.count("! appsink") == 2
+        assert "audiopanorama" not in desc
+        assert bus.src == ["master-src-main"]
+
+    def test_caps_follow_sample_format(self):
+        topology = Topology(sample_format=SampleFormat(format="F64LE", rate=44100))
+        channels = [topology.add(VectorFaderChannel(name="mic", mode=AudioMode.MONO))]
+        topology.add(VectorMasterBus(name="main", channels=channels))
+
+        desc = topology.pipeline_description
+        assert "F32LE" not in desc
+        assert desc.count("format=F64LE") == 2
+        assert desc.count("rate=44100") == 2
+
+    def test_integer_sample_format(self):
+        topology = Topology(sample_format=SampleFormat(format="S16LE"))
+        channels = [topology.add(VectorFaderChannel(name="mic"))]
+        topology.add(VectorMasterBus(name="main", channels=channels))
+
+        with pytest.raises(ValueError):
+            topology.pipeline_description
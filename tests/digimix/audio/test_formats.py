@@ -0,0 +1,65 @@
+from digimix.audio import Gst
+from digimix.audio.buses import MasterBus
+from digimix.audio.channels import FaderChannel
+from digimix.audio.formats import INTERNAL_FORMAT, FormatAudit, SampleFormat
+from digimix.audio.pipeline import Topology
+
+
+def make_topology(sample_format: SampleFormat = INTERNAL_FORMAT) -> Topology:
+    topology = Topology(sample_format=sample_format)
+    faders = [topology.add(FaderChannel(name=f"ch{i}")) for i in range(2)]
+    topology.add(MasterBus(name="main", inputs=[fader.src[0] for fader in faders]))
+    return topology
+
+
+def run_audit(description: str) -> FormatAudit:
+    pipeline = Gst.parse_launch(description)
+    pipeline.set_state(Gst.State.PAUSED)
+    pipeline.get_state(Gst.CLOCK_TIME_NONE)
+    try:
+        return FormatAudit.from_pipeline(pipeline)
+    finally:
+        pipeline.set_state(Gst.State.NULL)
+
+
+class TestSampleFormat:
+    def test_format_info(self):
+        assert INTERNAL_FORMAT.format_info == "audio/x-raw,format=F32LE,layout=interleaved,rate=48000"
+        assert INTERNAL_FORMAT.sample_width == 4
+        assert SampleFormat(format="S16LE").sample_width == 2
+
+    def test_topology_caps(self):
+        topology = make_topology()
+        caps = [
+            element.properties["caps"]
+            for element in topology.graph.elements.values()
+            if element.factory == "capsfilter"
+        ]
+        assert len(caps) == 3
+        assert all("format=F32LE" in str(value) and "rate=48000" in str(value) for value in caps)
+
+        topology.sample_format = SampleFormat(rate=44100)
+        assert "rate=44100" in topology.pipeline_description
+        assert "rate=48000" not in topology.pipeline_description
+
+
+class TestFormatAudit:
+    def test_clean(self):
+        audit = run_audit(
+            f"audiotestsrc num-buffers=1 ! {INTERNAL_FORMAT.format_info},channels=1 ! audioconvert name=convert "
+            f"! volume ! fakesink"
+        )
+        assert audit.clean, audit.format()
+        assert audit.converters == {"convert": False}
+        assert any(pad.element == "convert" for pad in audit.pads)
+
+    def test_conversion(self):
+        audit = run_audit(
+            "audiotestsrc num-buffers=1 ! audio/x-raw,format=S16LE,rate=48000,channels=1 ! audioconvert name=convert "
+            f"! {INTERNAL_FORMAT.format_info} ! fakesink"
+        )
+        assert not audit.clean
+        assert audit.converters == {"convert": True}
+        assert ("convert", "conversion") in [(issue.element, issue.kind) for issue in audit.issues]
+        assert any(issue.kind == "format" and "S16LE" in issue.detail for issue in audit.issues)
+        assert "convert: converting" in audit.format()
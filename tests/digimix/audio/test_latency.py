@@ -0,0 +1,52 @@
+import pytest
+
+from digimix.audio import Gst
+from digimix.audio.channels import FaderChannel
+from digimix.audio.latency import LatencyTracer, MS_NS, query_latency
+from digimix.audio.pipeline import Topology
+
+
+class TestLatencyTracer:
+    def test_record(self):
+        topology = Topology()
+        fader = topology.add(FaderChannel(name="mic"))
+        tracer = LatencyTracer.for_topology(topology)
+
+        for time_ns in (1 * MS_NS, 3 * MS_NS):
+            tracer.record(
+                f"element-latency, element-id=(string)0x1, element=(string)fader_channel-sink-{fader.name}, "
+                f"src=(string)src, time=(guint64){time_ns}, ts=(guint64)1;"
+            )
+        tracer.record(
+            f"element-latency, element-id=(string)0x2, element=(string)fader_channel-gain-{fader.name}, "
+            f"src=(string)src, time=(guint64){MS_NS}, ts=(guint64)1;"
+        )
+        tracer.record(
+            "latency, src-element-id=(string)0x3, src-element=(string)jack-src-in, src=(string)src, "
+            "sink-element-id=(string)0x4, sink-element=(string)jack-sink-out, sink=(string)sink, "
+            f"time=(guint64){5 * MS_NS}, ts=(guint64)1;"
+        )
+        tracer.record("unrelated, foo=(int)1;")
+
+        report = tracer.report()
+        print(report.format())
+
+        queue = report.elements[f"fader_channel-sink-{fader.name}"]
+        assert queue.count == 2
+        assert queue.mean_ns == pytest.approx(2 * MS_NS)
+        assert queue.max_ns == 3 * MS_NS
+        assert report.owners == {f"FaderChannel({fader.name})": pytest.approx(3 * MS_NS)}
+        assert report.paths[("jack-src-in", "jack-sink-out")].mean_ns == pytest.approx(5 * MS_NS)
+
+    def test_query_latency(self):
+        pipeline = Topology().create_pipeline()
+        latency = query_latency(pipeline)
+        assert latency is None or not latency.live
+
+    def test_stop_restores_default_log(self, capfd):
+        category = Gst.debug_get_category("GST_PIPELINE")
+        tracer = LatencyTracer()
+        tracer.start()
+        tracer.stop()
+        Gst.debug_log_literal(category, Gst.DebugLevel.ERROR, "test_latency.py", "test", 1, None, "still logged")
+        assert "still logged" in capfd.readouterr().err
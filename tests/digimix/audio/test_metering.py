@@ -0,0 +1,50 @@
+import math
+
+import pytest
+
+from digimix.audio.buses import MasterBus
+from digimix.audio.channels import FaderChannel
+from digimix.audio.metering import MeterBank, MeteringService
+from digimix.audio.pipeline import Topology
+
+
+class TestMeterBank:
+    def test_update_and_snapshot(self):
+        bank = MeterBank(["mic", "music"])
+        bank.update(bank.index("music"), [-6., -3.], [-12., -9.], [-7., -4.], now=10.)
+        bank.update(bank.index("mic"), [1.], [-1.], [0.5], now=10.)
+
+        snapshot = bank.snapshot(now=11.)
+        assert snapshot.sequence == 2
+        assert snapshot.channels == (1, 2)
+        assert snapshot.slot("music") == {
+            "peak_db": (-6., -3.),
+            "rms_db": (-12., -9.),
+            "decay_db": (-7., -4.),
+            "clip": (False, False),
+        }
+        assert snapshot.slot("mic")["clip"] == (True,)
+        assert snapshot.peak_db[1] == -math.inf
+
+        assert not any(bank.snapshot(now=10. + MeterBank.CLIP_HOLD_S + 1).clip)
+
+    def test_unique_names(self):
+        with pytest.raises(ValueError):
+            MeterBank(["mic", "mic"])
+
+
+class TestMeteringService:
+    def test_levels(self):
+        topology = Topology()
+        faders = [topology.add(FaderChannel(name=f"ch{i}")) for i in range(3)]
+        topology.add(MasterBus(name="main", inputs=[fader.src[0] for fader in faders]))
+
+        service = MeteringService(topology)
+        assert service.bank.names == ("ch0", "ch1", "ch2", "main")
+
+        pipeline = topology.create_pipeline()
+        service.attach_pipeline(pipeline)
+        level = pipeline.get_by_name("fader_channel-level-ch0")
+        assert level.get_property("post-messages")
+        assert level.get_property("interval") == service.interval_ns
+        service.detach()
@@ -0,0 +1,41 @@
+import pytest
+
+from digimix.audio.base import AudioMode
+from digimix.audio.buses import MasterBus
+from digimix.audio.channels import FaderChannel
+from digimix.audio.io.jack import SingleJackClientInput, SingleJackClientOutput
+from digimix.audio.pipeline import Topology
+from digimix.audio.utils import escape_pipeline_description
+
+
+class TestTopology:
+    def test_pipeline_description(self):
+        topology = Topology()
+        ins = topology.add(SingleJackClientInput(
+            name="JackIn",
+            conf=(
+                ("mic", AudioMode.MONO),
+                ("music", AudioMode.STEREO),
+            )
+        ))
+        faders = [topology.add(FaderChannel(name=name)) for name in ("mic", "music")]
+        master = topology.add(MasterBus(name="main", inputs=[fader.src[0] for fader in faders]))
+        out = topology.add(SingleJackClientOutput(name="JackOut", conf=(("main", AudioMode.STEREO),)))
+
+        for src, fader in zip(ins.src, faders):
+            topology.link(src, fader.sink[0])
+        topology.link(master.src[0], out.sink[0])
+
+        desc = topology.pipeline_description
+        for element in topology.elements:
+            assert element.pipeline_description in desc
+        assert f"{master.src[0]}.\n! {out.sink[0]}." in desc
+
+        print(desc)
+        print(escape_pipeline_description(desc))
+
+    def test_duplicate_element(self):
+        topology = Topology()
+        topology.add(FaderChannel(name="mic"))
+        with pytest.raises(ValueError):
+            topology.add(FaderChannel(name="mic"))
@@ -0,0 +1,44 @@
+import pytest
+
+from digimix.audio.buses import MasterBus
+from digimix.audio.channels import FaderChannel
+from digimix.audio.pipeline import Topology
+from digimix.audio.profiles import LIVE, OFFLINE, PROFILES, SAFE, QueueLeaky, byte_rate
+
+
+def make_topology(profile=None) -> Topology:
+    topology = Topology(profile=profile)
+    faders = [topology.add(FaderChannel(name=f"ch{i}")) for i in range(4)]
+    topology.add(MasterBus(name="main", inputs=[fader.src[0] for fader in faders]))
+    return topology
+
+
+class TestLatencyProfile:
+    def test_profiles(self):
+        assert set(PROFILES) == {"live", "safe", "offline"}
+        assert OFFLINE.queue_leaky is QueueLeaky.NO
+        # only LIVE drops audio instead of applying backpressure
+        assert SAFE.queue_leaky is QueueLeaky.NO
+
+    def test_applied_to_all_queues(self):
+        topology = make_topology(LIVE)
+        queues = [element for element in topology.graph.elements.values() if element.factory == "queue"]
+        assert len(queues) == 4 + 4 + 1
+        for queue in queues:
+            assert queue.properties["max-size-time"] == LIVE.queue_max_size_time_ns
+            assert queue.properties["leaky"] is QueueLeaky.DOWNSTREAM
+
+        topology.profile = OFFLINE
+        assert "max-size-time=3000000000" in topology.pipeline_description
+
+    def test_buffering_report(self):
+        report = make_topology(LIVE).buffering_report()
+        print(report)
+
+        assert report.queue_count == 9
+        # fader sink queue + master input queue + mixer + master output queue
+        assert report.worst_case_latency_ns == pytest.approx(
+            3 * LIVE.queue_max_size_time_ns + LIVE.mixer_latency_ns + LIVE.mixer_output_buffer_duration_ns
+        )
+        assert report.memory_ceiling_bytes == pytest.approx(9 * LIVE.queue_max_size_time_ns * byte_rate() / 1e9)
+        assert report.critical_path[-1] == "queue-master-bus-mixer-main"
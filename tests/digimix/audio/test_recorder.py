@@ -0,0 +1,108 @@
+import os
+import time
+
+import pytest
+
+from digimix.audio import Gst
+from digimix.audio.buses import MasterBus
+from digimix.audio.channels import FaderChannel
+from digimix.audio.formats import INTERNAL_FORMAT
+from digimix.audio.pipeline import Topology
+from digimix.audio.recorder import Recorder, RecordingTrack
+from digimix.audio.tracks import RecordFormat
+
+
+class AppSinkSample:
+    # what on_new_sample reads from the appsink, without a playing pipeline
+    def __init__(self, pts: int, data: bytes, channels: int):
+        self._buffer = Gst.Buffer.new_wrapped(data)
+        self._buffer.pts = pts
+        self._caps = Gst.Caps.from_string(f"{INTERNAL_FORMAT.format_info},channels={channels}")
+
+    def get_buffer(self) -> Gst.Buffer:
+        return self._buffer
+
+    def get_caps(self) -> Gst.Caps:
+        return self._caps
+
+    def emit(self, signal: str) -> 'AppSinkSample':
+        return self
+
+
+def make_topology() -> tuple[Topology, list[FaderChannel]]:
+    topology = Topology()
+    channels = [topology.add(FaderChannel(name=f"ch{i}")) for i in range(2)]
+    topology.add(MasterBus(name="main", inputs=[channel.src[0] for channel in channels]))
+    return topology, channels
+
+
+class TestRecorder:
+    def test_taps(self):
+        topology, _ = make_topology()
+        recorder = Recorder.for_topology(topology)
+        assert recorder.taps == {
+            "ch0": "fader_channel-pre_fader-ch0",
+            "ch1": "fader_channel-pre_fader-ch1",
+            "main": "master-src-main",
+        }
+        assert set(Recorder.for_topology(topology, buses=False).taps) == {"ch0", "ch1"}
+
+    def test_start_requires_pipeline(self, tmp_path):
+        topology, _ = make_topology()
+        with pytest.raises(RuntimeError):
+            Recorder.for_topology(topology).start(str(tmp_path))
+
+    def test_record_while_playing(self, tmp_path):
+        topology, channels = make_topology()
+        pipeline = topology.create_pipeline()
+        for channel in channels:
+            source = Gst.parse_bin_from_description(
+                f"audiotestsrc is-live=true ! {INTERNAL_FORMAT.format_info},channels=1", True,
+            )
+            pipeline.add(source)
+            assert source.link(pipeline.get_by_name(channel.sink[0]))
+        sink = Gst.ElementFactory.make("fakesink", "sink")
+        pipeline.add(sink)
+        assert pipeline.get_by_name("master-src-main").link(sink)
+        topology.attach_pipeline(pipeline)
+
+        recorder = Recorder.for_topology(topology, record_format=RecordFormat.WAV)
+        recorder.attach_pipeline(pipeline)
+        pipeline.set_state(Gst.State.PLAYING)
+        try:
+            time.sleep(0.2)
+            recorder.start(str(tmp_path))
+            assert recorder.recording
+            time.sleep(1)
+            report = recorder.stop()
+            _, state, _ = pipeline.get_state(0)
+            assert state == Gst.State.PLAYING
+        finally:
+            pipeline.set_state(Gst.State.NULL)
+
+        print(report.format())
+        assert not recorder.recording
+        assert pipeline.get_by_name("bin-recorder-ch0") is None
+        assert {track.name for track in report.tracks} == {"ch0", "ch1", "main"}
+        for track in report.tracks:
+            assert os.path.exists(track.path)
+            assert track.frames > INTERNAL_FORMAT.rate // 2
+
+    def test_failed_track_keeps_others_writing(self, tmp_path):
+        data = bytes(INTERNAL_FORMAT.sample_width * 2 * 480)
+        good = RecordingTrack("good", "tee-good", Recorder.MAX_PENDING_BYTES)
+        bad = RecordingTrack("bad", "tee-bad", Recorder.MAX_PENDING_BYTES)
+        for pts in (0, 10 * 1000 * 1000):
+            for track in (good, bad):
+                track.on_new_sample(AppSinkSample(pts, data, channels=2))
+            assert good.flush(str(tmp_path), RecordFormat.WAV) == len(data)
+            assert bad.flush(str(tmp_path / "missing"), RecordFormat.WAV) == 0
+        good.close()
+        bad.close()
+
+        report = good.report()
+        assert report.error is None and report.frames == 960 and report.dropped_bytes == 0
+        report = bad.report()
+        assert report.error.startswith("FileNotFoundError")
+        assert report.path is None
+        assert report.dropped_bytes == 2 * len(data)
@@ -0,0 +1,80 @@
+import wave
+
+import numpy as np
+import pytest
+
+from digimix.audio.base import AudioMode
+from digimix.audio.buses import MasterBus
+from digimix.audio.channels import FaderChannel
+from digimix.audio.io.wav import WavFileInput, WavFileOutput
+from digimix.audio.pipeline import Topology
+from digimix.audio.profiles import OFFLINE
+from digimix.audio.render import ParameterScript, render
+
+S_NS = 1000 * 1000 * 1000
+
+
+def make_topology(input_dir, output_dir) -> Topology:
+    topology = Topology(name="render", profile=OFFLINE)
+    src = topology.add(WavFileInput(name="in", conf=(("mic", AudioMode.MONO),), directory=str(input_dir)))
+    mic = topology.add(FaderChannel(name="mic"))
+    master = topology.add(MasterBus(name="master", inputs=[mic.src[0]]))
+    out = topology.add(WavFileOutput(name="out", conf=(("main", AudioMode.STEREO),), directory=str(output_dir)))
+    topology.link(src.src[0], mic.sink[0])
+    topology.link(master.src[0], out.sink[0])
+    return topology
+
+
+def read_float_wav(path) -> np.ndarray:
+    data = path.read_bytes()
+    offset = data.index(b"data") + 8
+    return np.frombuffer(data[offset:], dtype=np.float32).reshape(-1, 2)
+
+
+class TestParameterScript:
+    def test_parse(self):
+        topology = make_topology("/tmp/in", "/tmp/out")
+        script = ParameterScript.parse(
+            """
+            # seconds element attribute value
+            1.5 mic fader_db -10
+            0.5 mic cut true
+            """,
+            topology,
+        )
+
+        assert [change.at_ns for change in script.changes] == [S_NS // 2, 3 * S_NS // 2]
+        assert script.changes[0].attribute == "cut"
+        assert script.changes[0].value is True
+        assert script.changes[1].value == -10.
+
+    def test_parse_errors(self):
+        topology = make_topology("/tmp/in", "/tmp/out")
+        with pytest.raises(ValueError):
+            ParameterScript.parse("1 mic fader_db", topology)
+        with pytest.raises(ValueError):
+            ParameterScript.parse("1 unknown fader_db -10", topology)
+        with pytest.raises(ValueError):
+            ParameterScript.parse("-1 mic fader_db -10", topology)
+
+
+class TestRender:
+    def test_render_with_script(self, tmp_path):
+        input_dir, output_dir = tmp_path / "in", tmp_path / "out"
+        input_dir.mkdir()
+        output_dir.mkdir()
+
+        with wave.open(str(input_dir / "mic.wav"), "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(48000)
+            wav.writeframes((np.sin(np.arange(48000) * 0.05) * 16000).astype("<i2").tobytes())
+
+        topology = make_topology(input_dir, output_dir)
+        result = render(topology, ParameterScript.parse("0.5 mic cut true", topology))
+        print(result)
+        assert result.audio_ns == S_NS
+
+        rendered = read_float_wav(output_dir / "main.wav")
+        assert np.abs(rendered[:20000]).max() > 0.1
+        assert np.abs(rendered[30000:]).max() == 0.
@@ -0,0 +1,112 @@
+import pytest
+
+from digimix.audio import Gst
+from digimix.audio.base import Stereo2Mono
+from digimix.audio.buses import MasterBus
+from digimix.audio.channels import AudioPanoramaMethods, FaderChannel
+from digimix.audio.pipeline import Topology
+from digimix.audio.scenes import Scene, SceneStore
+from digimix.audio.utils import db_to_amplitude
+
+MS = 1000 * 1000
+
+
+def make_topology() -> tuple[Topology, FaderChannel, FaderChannel]:
+    topology = Topology()
+    mic = topology.add(FaderChannel(name="mic"))
+    music = topology.add(FaderChannel(name="music"))
+    topology.add(MasterBus(name="main", inputs=[mic.src[0], music.src[0]]))
+    return topology, mic, music
+
+
+class TestScene:
+    def test_diff(self):
+        current = Scene("a", {"mic": {"fader_db": 0., "cut": False}, "music": {"pan": 0.}})
+        target = Scene("b", {"mic": {"fader_db": -10., "cut": False}, "music": {"pan": 0.}})
+        assert current.diff(target) == {"mic": {"fader_db": -10.}}
+        assert target.diff(target) == {}
+
+    def test_serialization(self):
+        scene = Scene("intro", {"mic": {"fader_db": -10., "pan_method": 1, "cut": True}})
+        text = scene.dumps()
+        assert " " not in text
+        assert Scene.loads(text) == scene
+
+
+class TestSceneStore:
+    def test_capture_and_recall(self):
+        topology, mic, music = make_topology()
+        store = SceneStore(topology)
+        assert set(store.capture("now").values) == {"mic", "music", "main"}
+
+        store.save("intro")
+        mic.fader_db = -20
+        mic.cut = True
+        music.pan_method = AudioPanoramaMethods.SIMPLE
+
+        result = store.recall("intro")
+        assert result.changes == 3
+        assert result.at_ns is None
+        assert mic.fader_db == 0
+        assert mic.cut is False
+        assert music.pan_method is AudioPanoramaMethods.PSYCHOACOUSTIC
+        assert store.recall("intro").changes == 0
+
+    def test_bus_round_trip(self):
+        topology, _, _ = make_topology()
+        bus = topology.elements[-1]
+        store = SceneStore(topology)
+        assert store.capture("now").values["main"] == {"fader_db": 0., "mute": False}
+
+        bus.fader_db = -6
+        bus.mute = True
+        store.save("quiet")
+        bus.fader_db = 0
+        bus.mute = False
+
+        assert store.recall("quiet").changes == 2
+        assert bus.fader_db == -6
+        assert bus.mute is True
+
+    def test_dump_and_load(self, tmp_path):
+        topology, mic, _ = make_topology()
+        store = SceneStore(topology)
+        mic.gain_db = 6
+        store.save("loud")
+        store.dump(tmp_path / "scenes.jsonl")
+
+        mic.gain_db = 0
+        loaded = SceneStore(topology)
+        loaded.load(tmp_path / "scenes.jsonl")
+        assert loaded.scenes["loud"] == store.scenes["loud"]
+        loaded.recall("loud")
+        assert mic.gain_db == 6
+
+    def test_ambiguous_names(self):
+        topology = Topology()
+        topology.add(FaderChannel(name="mic"))
+        topology.add(Stereo2Mono(name="mic"))
+        with pytest.raises(ValueError):
+            SceneStore(topology)
+
+    def test_scheduled_crossfade(self):
+        topology, mic, music = make_topology()
+        store = SceneStore(topology)
+        mic.fader_db = -20
+        music.fader_db = -20
+        store.save("quiet")
+        mic.fader_db = 0
+        music.fader_db = 0
+
+        pipeline = topology.create_pipeline()
+        topology.attach_pipeline(pipeline)
+        pipeline.set_clock(Gst.SystemClock.obtain())
+        store.attach_pipeline(pipeline)
+
+        result = store.recall("quiet", crossfade_ns=500 * MS)
+        assert result.changes == 2
+        for channel in (mic, music):
+            control_source = channel.automation.ramps["fader"].control_source
+            assert control_source.get_value(result.at_ns) == (True, pytest.approx(1.0))
+            assert control_source.get_value(result.at_ns + 250 * MS)[1] < 1.0
+            assert control_source.get_value(result.at_ns + 500 * MS) == (True, pytest.approx(db_to_amplitude(-20)))
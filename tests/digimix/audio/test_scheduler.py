@@ -0,0 +1,32 @@
+from digimix.audio import GLib
+from digimix.audio.scheduler import ParameterScheduler, ParameterSchedulerStats
+
+
+class TestParameterScheduler:
+    def test_coalescing(self):
+        applied = []
+        scheduler = ParameterScheduler(context=GLib.MainContext.new())
+
+        for value in range(50):
+            scheduler.schedule(("fader", "volume"), lambda value=value: applied.append(("fader", value)))
+        scheduler.schedule(("pan", "panorama"), lambda: applied.append(("pan", 0.5)))
+        assert scheduler.pending == 2
+
+        assert scheduler.flush() == 2
+        assert applied == [("fader", 49), ("pan", 0.5)]
+        assert scheduler.stats == ParameterSchedulerStats(scheduled=51, coalesced=49, applied=2, flushes=1)
+
+    def test_main_context(self):
+        applied = []
+        context = GLib.MainContext.new()
+        scheduler = ParameterScheduler(interval_us=0, context=context)
+
+        scheduler.schedule("fader", lambda: applied.append(1))
+        scheduler.schedule("fader", lambda: applied.append(2))
+        assert applied == []
+
+        while context.iteration(False):
+            pass
+        assert applied == [2]
+        assert scheduler.stats.flushes == 1
+        assert scheduler.pending == 0
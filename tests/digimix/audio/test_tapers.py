@@ -0,0 +1,90 @@
+import math
+
+import numpy as np
+import pytest
+
+from digimix.audio.channels import FaderChannel
+from digimix.audio.tapers import (
+    ConsoleTaper, FaderMapping, LinearDbTaper, TaperTable, amplitude_to_db_array, db_to_amplitude_array, taper_table,
+)
+from digimix.audio.utils import amplitude_to_db, db_to_amplitude
+from digimix.midi.generic_controls import ContinuousControlReadOnly
+
+
+class TestArrayConversions:
+    def test_matches_scalar(self):
+        levels = np.arange(-90., 12., 0.5)
+        amplitudes = db_to_amplitude_array(levels)
+        assert amplitudes == pytest.approx([db_to_amplitude(level) for level in levels], rel=1e-3)
+        assert amplitude_to_db_array(amplitudes) == pytest.approx(levels)
+        assert amplitude_to_db(db_to_amplitude(-10)) == -10
+
+    def test_silence(self):
+        assert db_to_amplitude_array([-np.inf])[0] == 0
+        assert amplitude_to_db_array([0.])[0] == -np.inf
+        assert db_to_amplitude_array(-6.).shape == ()
+
+
+class TestTapers:
+    def test_linear_db(self):
+        levels = LinearDbTaper(min_db=-60., max_db=10.).db([0., 0.5, 1.])
+        assert levels.tolist() == [-np.inf, -25., 10.]
+        assert LinearDbTaper(mute_bottom=False).db([0.])[0] == -60.
+
+    def test_console(self):
+        levels = ConsoleTaper().db([0., 0.0625, 0.5, 0.75, 1., 2.])
+        assert levels.tolist() == [-np.inf, -60., -10., 0., 10., 10.]
+        assert np.all(np.diff(levels) >= 0)
+        assert ConsoleTaper().db(0.) == -np.inf
+        assert LinearDbTaper().db(1.) == 10.
+
+
+class TestTaperTable:
+    def test_lookup(self):
+        table = taper_table()
+        assert table is taper_table(ConsoleTaper(), 128)
+        assert table.db(0) == -math.inf
+        assert table.amplitude(0) == 0.
+        assert table.db(127) == 10.
+        assert table.amplitude(127) == pytest.approx(db_to_amplitude(10), rel=1e-3)
+        assert isinstance(table.db(64), float)
+
+    def test_batch(self):
+        table = taper_table(LinearDbTaper())
+        values = np.array([0, 10, 127])
+        assert table.db_batch(values).tolist() == [table.db(value) for value in values]
+        assert table.amplitude_batch(values).tolist() == [table.amplitude(value) for value in values]
+        with pytest.raises(ValueError):
+            table.db_batch([-1])
+        with pytest.raises(ValueError):
+            table.db(128)
+        with pytest.raises(ValueError):
+            table.db_values[0] = 0.
+
+    def test_value_for_db(self):
+        table = taper_table()
+        for value in (0, 1, 64, 96, 127):
+            assert table.value_for_db(table.db(value)) == value
+        assert table.value_for_db(-200.) == 0
+
+    def test_steps(self):
+        assert TaperTable(LinearDbTaper(), steps=2).db_values.tolist() == [-np.inf, 10.]
+        with pytest.raises(ValueError):
+            TaperTable(LinearDbTaper(), steps=1)
+
+
+class TestFaderMapping:
+    def test_moves_fader(self):
+        control = ContinuousControlReadOnly(initial_value=100)
+        channel = FaderChannel(name="ch")
+        mapping = FaderMapping(control, channel)
+        assert mapping.table is taper_table()
+
+        control.value = 96
+        assert channel.fader_db == mapping.table.db(96) == pytest.approx(0., abs=0.5)
+        control.value = 0
+        assert channel.fader_db == -math.inf
+
+        mapping.detach()
+        control.value = 127
+        assert channel.fader_db == -math.inf
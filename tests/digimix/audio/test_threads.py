@@ -0,0 +1,124 @@
+import os
+import threading
+
+import pytest
+
+from digimix.audio.base import AudioMode
+from digimix.audio.buses import MasterBus
+from digimix.audio.channels import FaderChannel
+from digimix.audio.io.jack import SingleJackClientInput
+from digimix.audio.pipeline import Topology
+from digimix.audio.threads import RealtimePolicy, ThreadPlacement, thread_domain
+
+CPU = min(os.sched_getaffinity(0))
+
+
+def make_topology() -> tuple[Topology, SingleJackClientInput, list[FaderChannel], MasterBus]:
+    topology = Topology()
+    src = topology.add(SingleJackClientInput(
+        name="in",
+        conf=tuple((f"in{i}", AudioMode.MONO) for i in range(4)),
+    ))
+    channels = [topology.add(FaderChannel(name=f"ch{i}")) for i in range(4)]
+    master = topology.add(MasterBus(name="main", inputs=[channel.src[0] for channel in channels]))
+    for src_name, channel in zip(src.src, channels):
+        topology.link(src_name, channel.sink[0])
+    return topology, src, channels, master
+
+
+class TestThreadDomains:
+    def test_queues_only_at_domain_edges(self):
+        topology, src, channels, master = make_topology()
+        inputs = thread_domain("inputs", CPU)
+        topology.assign(inputs, src, *channels[:2])
+        topology.assign(thread_domain("channels", CPU), *channels[2:])
+        topology.assign(thread_domain("master", CPU), master)
+
+        elements = topology.graph.elements
+        assert [elements[channel.sink[0]].factory for channel in channels] == ["identity", "identity", "queue", "queue"]
+        assert all(
+            elements[f"queue-master-bux-mixer-main-{channel.src[0]}"].factory == "queue"
+            for channel in channels
+        )
+
+        topology.assign(inputs, master)
+        elements = topology.graph.elements
+        assert elements[f"queue-master-bux-mixer-main-{channels[0].src[0]}"].factory == "identity"
+        assert elements[f"queue-master-bux-mixer-main-{channels[2].src[0]}"].factory == "queue"
+
+    def test_one_queue_per_domain_edge(self):
+        topology, src, channels, master = make_topology()
+        monitor = topology.add(MasterBus(name="monitor", inputs=[channel.src[0] for channel in channels[:2]]))
+        topology.assign(thread_domain("channels", CPU), src, *channels)
+        topology.assign(thread_domain("master", CPU), master, monitor)
+
+        graph = topology.graph
+        for channel in channels[:2]:
+            assert graph.downstream()[channel.src[0]] == [f"domain-queue-master-{channel.src[0]}"]
+            for bus in (master, monitor):
+                assert graph.elements[f"queue-master-bux-mixer-{bus.name}-{channel.src[0]}"].factory == "identity"
+        # a single consumer in the domain keeps its own queue
+        assert graph.elements[f"queue-master-bux-mixer-main-{channels[2].src[0]}"].factory == "queue"
+        assert topology.owners[f"domain-queue-master-{channels[0].src[0]}"].thread_domain.name == "master"
+
+    def test_without_domains(self):
+        topology, _, channels, _ = make_topology()
+        elements = topology.graph.elements
+        assert all(elements[channel.sink[0]].factory == "queue" for channel in channels)
+
+    def test_invalid_cpus(self):
+        with pytest.raises(ValueError):
+            thread_domain("none")
+        with pytest.raises(ValueError):
+            thread_domain("missing", max(os.sched_getaffinity(0)) + 1)
+
+
+class TestThreadPlacement:
+    def test_for_topology(self):
+        topology, src, channels, master = make_topology()
+        domain = thread_domain("master", CPU)
+        topology.assign(domain, master)
+
+        placement = ThreadPlacement.for_topology(topology)
+        assert placement.domains["master-bus-mixer-main"] == domain
+        assert channels[0].sink[0] not in placement.domains
+
+    def test_enter_pins_thread(self):
+        domain = thread_domain("pinned", CPU)
+        placement = ThreadPlacement({"mixer": domain})
+        affinity = []
+
+        def streaming_thread():
+            placement.enter("unknown")
+            placement.enter("mixer")
+            affinity.append(os.sched_getaffinity(0))
+
+        thread = threading.Thread(target=streaming_thread)
+        thread.start()
+        thread.join()
+
+        assert affinity == [{CPU}]
+        assert list(placement.threads) == ["pinned"]
+
+    def test_realtime_degrades(self):
+        # run unprivileged containers as well as with CAP_SYS_NICE, either way every thread is reported
+        placement = ThreadPlacement({}, realtime=RealtimePolicy(priority=10))
+        statuses = []
+
+        def streaming_thread():
+            statuses.append(placement.enter("queue0"))
+
+        thread = threading.Thread(target=streaming_thread)
+        thread.start()
+        thread.join()
+
+        status, = statuses
+        assert status.realtime != (status.error is not None)
+        if status.realtime:
+            assert os.sched_getscheduler(0) == os.SCHED_OTHER
+
+        report = placement.report()
+        assert report.threads == (status,)
+        assert report.memory_locked is None
+        assert len(report.elevated) + len(report.failed) == 1
+        print(report.format())
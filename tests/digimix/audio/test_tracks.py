@@ -0,0 +1,87 @@
+import importlib.util
+import struct
+
+import pytest
+
+from digimix.audio.formats import SampleFormat
+from digimix.audio.tracks import (
+    W64_DATA,
+    W64_FMT,
+    W64_RIFF,
+    W64_WAVE,
+    WAVE_FORMAT_IEEE_FLOAT,
+    WAVE_FORMAT_PCM,
+    RecordFormat,
+)
+
+FRAMES = struct.pack("<4f", 0.5, -0.5, 0.25, -0.25)
+
+
+class TestWavWriter:
+    def test_header(self, tmp_path):
+        path = str(tmp_path / "mic.wav")
+        writer = RecordFormat.WAV.open(path, channels=2)
+        writer.write(FRAMES)
+        writer.write(FRAMES)
+        writer.close()
+        assert writer.frames == 4
+
+        with open(path, 'rb') as wav:
+            data = wav.read()
+        assert data[:4] == b"RIFF" and data[8:12] == b"WAVE"
+        assert struct.unpack_from("<I", data, 4)[0] == len(data) - 8
+        audio_format, channels, rate = struct.unpack_from("<HHI", data, 20)
+        assert (audio_format, channels, rate) == (WAVE_FORMAT_IEEE_FLOAT, 2, 48000)
+        assert data[-40:-32] == b"data" + struct.pack("<I", 32)
+        assert data[-32:] == FRAMES * 2
+
+    def test_integer_samples(self, tmp_path):
+        path = str(tmp_path / "mic.wav")
+        writer = RecordFormat.WAV.open(path, channels=2, sample_format=SampleFormat(format="S16LE"))
+        writer.write(FRAMES)
+        writer.close()
+        assert writer.frames == 4
+
+        with open(path, 'rb') as wav:
+            data = wav.read()
+        assert struct.unpack_from("<HHIIHH", data, 20) == (WAVE_FORMAT_PCM, 2, 48000, 48000 * 4, 4, 16)
+        assert data[-24:-16] == b"data" + struct.pack("<I", 16)
+
+    def test_unsupported_format(self, tmp_path):
+        path = tmp_path / "mic.wav"
+        with pytest.raises(ValueError):
+            RecordFormat.WAV.open(str(path), channels=2, sample_format=SampleFormat(format="S24_32LE"))
+        assert not path.exists()
+
+
+class TestW64Writer:
+    def test_header(self, tmp_path):
+        path = str(tmp_path / "mic.w64")
+        writer = RecordFormat.W64.open(path, channels=1, sample_format=SampleFormat(rate=44100))
+        writer.write(FRAMES[:12])
+        writer.close()
+
+        with open(path, 'rb') as w64:
+            data = w64.read()
+        assert len(data) % 8 == 0
+        assert data[:16] == W64_RIFF
+        assert struct.unpack_from("<Q", data, 16)[0] == len(data)
+        assert data[24:40] == W64_WAVE
+        assert data[40:56] == W64_FMT
+        assert struct.unpack_from("<HHI", data, 64) == (WAVE_FORMAT_IEEE_FLOAT, 1, 44100)
+        assert data[80:96] == W64_DATA
+        assert struct.unpack_from("<Q", data, 96)[0] == 24 + 12
+        assert data[104:116] == FRAMES[:12]
+
+
+class TestFlacWriter:
+    def test_requires_soundfile(self, tmp_path):
+        if importlib.util.find_spec("soundfile") is None:
+            with pytest.raises(RuntimeError):
+                RecordFormat.FLAC.open(str(tmp_path / "mic.flac"), channels=1)
+            return
+
+        writer = RecordFormat.FLAC.open(str(tmp_path / "mic.flac"), channels=2)
+        writer.write(FRAMES)
+        writer.close()
+        assert writer.frames == 2
@@ -0,0 +1,95 @@
+import json
+import time
+
+from digimix.audio import GLib, Gst
+from digimix.audio.base import AudioMode
+from digimix.audio.buses import MasterBus
+from digimix.audio.channels import FaderChannel
+from digimix.audio.io.jack import SingleJackClientInput
+from digimix.audio.pipeline import Topology
+from digimix.audio.profiles import LIVE, SAFE
+from digimix.audio.watchdog import DropoutWatchdog
+
+
+def make_topology(profile=None) -> Topology:
+    topology = Topology(profile=profile)
+    jack = topology.add(SingleJackClientInput(name="in", conf=(("mic", AudioMode.MONO),)))
+    channel = topology.add(FaderChannel(name="mic"))
+    topology.add(MasterBus(name="main", inputs=[channel.src[0]]))
+    topology.link(jack.src[0], channel.sink[0])
+    return topology
+
+
+class TestDropoutWatchdog:
+    def test_for_topology(self):
+        watchdog = DropoutWatchdog.for_topology(make_topology())
+        assert watchdog._owners["fader_channel-fader-mic"] == "FaderChannel(mic)"
+        assert watchdog._probe_elements == ("jack-src-in",)
+        assert watchdog._leaky_queues == ()
+
+    def test_leaky_queues(self):
+        assert DropoutWatchdog.for_topology(make_topology(SAFE))._leaky_queues == ()
+        leaky_queues = DropoutWatchdog.for_topology(make_topology(LIVE))._leaky_queues
+        assert "queue-master-bus-mixer-main" in leaky_queues
+
+    def test_timeline_bounded(self, tmp_path):
+        watchdog = DropoutWatchdog(timeline_size=4)
+        for _ in range(10):
+            watchdog.record("gap", None, "pts=0")
+        watchdog.record("qos", None)
+
+        report = watchdog.report()
+        assert report.counters == {"pipeline": {"gap": 10, "qos": 1}}
+        assert report.total == 11
+        assert len(report.timeline) == 4
+        assert report.dropped_events == 7
+        assert report.timeline[-1].kind == "qos"
+        print(report.format())
+
+        path = tmp_path / "watchdog.jsonl"
+        watchdog.dump(str(path))
+        lines = path.read_text().splitlines()
+        assert json.loads(lines[0])["counters"] == report.counters
+        assert [json.loads(line)["kind"] for line in lines[1:]] == ["gap", "gap", "gap", "qos"]
+
+        watchdog.reset()
+        assert watchdog.report().total == 0
+
+    def test_attribution(self):
+        bin_ = Gst.Bin.new("bin-mic")
+        volume = Gst.ElementFactory.make("volume", "fader_channel-volume-mic")
+        bin_.add(volume)
+        watchdog = DropoutWatchdog({"fader_channel-volume-mic": "FaderChannel(mic)"})
+        watchdog.record("warning", volume)
+        watchdog.record("warning", bin_)
+        assert watchdog.report().counters == {
+            "FaderChannel(mic)": {"warning": 1},
+            "bin-mic": {"warning": 1},
+        }
+
+    def test_gap_and_qos(self):
+        pipeline = Gst.parse_launch("audiotestsrc is-live=true name=src ! identity name=lossy ! fakesink name=sink")
+        watchdog = DropoutWatchdog({"lossy": "FaderChannel(mic)", "sink": "MasterBus(main)"}, probe_elements=["sink"])
+        watchdog.attach_pipeline(pipeline)
+        pipeline.set_state(Gst.State.PLAYING)
+        try:
+            time.sleep(0.2)
+            pipeline.get_by_name("lossy").get_static_pad("src").push_event(Gst.Event.new_gap(0, Gst.SECOND))
+            segment = Gst.Segment.new()
+            segment.init(Gst.Format.TIME)
+            pipeline.get_by_name("lossy").get_static_pad("src").push_event(Gst.Event.new_segment(segment))
+            pipeline.get_bus().post(Gst.Message.new_qos(
+                pipeline.get_by_name("lossy"), True, 0, 0, 0, 10 * 1000 * 1000,
+            ))
+            context = GLib.MainContext.default()
+            while context.iteration(False):
+                pass
+        finally:
+            pipeline.set_state(Gst.State.NULL)
+            watchdog.detach()
+
+        report = watchdog.report()
+        print(report.format())
+        assert report.counters["FaderChannel(mic)"]["qos"] == 1
+        assert report.counters["MasterBus(main)"]["gap"] >= 1
+        assert report.counters["MasterBus(main)"]["discont"] == 1
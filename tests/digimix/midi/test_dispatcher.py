@@ -27,3 +27,52 @@ def test_midi_msg_matching():
 
     msg = Message(type='note_off')
     dispatcher.dispatch(msg)
+
+
+def test_indexed_and_fallback_patterns():
+    calls = []
+    dispatcher = MidiDispatcher()
+    dispatcher.add_callback({'type': 'control_change', 'channel': 0, 'control': 16}, lambda msg: calls.append('cc16'))
+    dispatcher.add_callback(
+        {'type': 'note_on', 'channel': 0, 'note': 1, 'velocity': 127}, lambda msg: calls.append('press'),
+    )
+    dispatcher.add_callback({'type': 'control_change'}, lambda msg: calls.append('any_cc'))
+    dispatcher.add_callback({'type': 'pitchwheel', 'channel': 1}, lambda msg: calls.append('pitch'))
+
+    dispatcher.dispatch(Message(type='control_change', channel=0, control=16, value=3))
+    assert sorted(calls) == ['any_cc', 'cc16']
+    calls.clear()
+
+    dispatcher.dispatch(Message(type='control_change', channel=1, control=16))
+    dispatcher.dispatch(Message(type='note_on', channel=0, note=1, velocity=64))
+    assert calls == ['any_cc']
+    calls.clear()
+
+    dispatcher.dispatch(Message(type='note_on', channel=0, note=1, velocity=127))
+    dispatcher.dispatch(Message(type='pitchwheel', channel=1, pitch=100))
+    dispatcher.dispatch(Message(type='clock'))
+    assert calls == ['press', 'pitch']
+
+
+def test_same_pattern_shares_callbacks():
+    calls = []
+    dispatcher = MidiDispatcher()
+    pattern = {'type': 'note_off', 'channel': 0, 'note': 2}
+    dispatcher.add_callback(pattern, lambda msg: calls.append(1))
+    dispatcher.add_callback(dict(reversed(pattern.items())), lambda msg: calls.append(2))
+    dispatcher.dispatch(Message(type='note_off', channel=0, note=2))
+    assert sorted(calls) == [1, 2]
+
+
+def test_registration_order():
+    calls = []
+    dispatcher = MidiDispatcher()
+    dispatcher.add_callback({'type': 'control_change'}, lambda msg: calls.append('any_cc'))
+    dispatcher.add_callback({'type': 'control_change', 'channel': 0, 'control': 16}, lambda msg: calls.append('cc16'))
+    dispatcher.add_callback({'type': 'control_change', 'value': 3}, lambda msg: calls.append('value3'))
+    dispatcher.add_callback(
+        {'type': 'control_change', 'channel': 0, 'control': 16, 'value': 3}, lambda msg: calls.append('cc16_3'),
+    )
+
+    dispatcher.dispatch(Message(type='control_change', channel=0, control=16, value=3))
+    assert calls == ['any_cc', 'cc16', 'value3', 'cc16_3']
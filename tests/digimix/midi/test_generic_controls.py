@@ -71,6 +71,10 @@ class TestContinuousControlReadOnly:
 
 
 class TestButton:
+    def test_machine_dict(self):
+        assert set(Button.MACHINE_DICT) == set(Button.MACHINE_CONFIGS)
+        assert Button.MACHINE_DICT[Button.Mode.TOGGLE] is Button.machine(Button.Mode.TOGGLE)
+
     def test_arbitrary_args_actions(self):
         b = Button()
         b.press(msg={})
@@ -0,0 +1,121 @@
+import pytest
+from mido.messages import Message
+
+from digimix.midi.dispatcher import MidiDispatcher
+from digimix.midi.generic_controls import ContinuousControlReadOnly
+from digimix.midi.raw import MidiParser, RawMessage, coalesce_control_changes
+
+MESSAGES = [
+    Message('note_off', channel=1, note=60, velocity=10),
+    Message('note_on', channel=15, note=1, velocity=127),
+    Message('polytouch', channel=2, note=3, value=4),
+    Message('control_change', channel=0, control=16, value=100),
+    Message('program_change', channel=3, program=7),
+    Message('aftertouch', channel=4, value=9),
+    Message('pitchwheel', channel=5, pitch=-1000),
+    Message('songpos', pos=300),
+    Message('clock'),
+    Message('sysex', data=[1, 2, 3]),
+]
+
+
+class TestRawMessage:
+    @pytest.mark.parametrize("message", MESSAGES, ids=[message.type for message in MESSAGES])
+    def test_matches_mido(self, message):
+        raw = RawMessage.from_bytes(message.bytes())
+        assert raw.type == message.type
+        assert raw.bytes() == message.bytes()
+        for field in ('channel', 'note', 'velocity', 'control', 'value', 'program', 'pitch'):
+            if hasattr(message, field):
+                assert getattr(raw, field) == getattr(message, field)
+        for field in ('note', 'velocity', 'control', 'value', 'program', 'pitch'):
+            assert hasattr(raw, field) == hasattr(message, field)
+        if message.type == 'sysex':
+            assert raw.data == tuple(message.data)
+        assert raw.message == message
+
+    def test_missing_field_stays_lazy(self):
+        raw = RawMessage.from_bytes([0xC0, 5])
+        with pytest.raises(AttributeError):
+            raw.value
+        assert raw._message is None
+
+    def test_lazy_message(self):
+        raw = RawMessage.from_bytes([0xB0, 16, 1])
+        assert raw._message is None
+        assert raw.dict()['value'] == 1
+        assert raw._message is not None
+
+    def test_from_bytes_single(self):
+        with pytest.raises(ValueError):
+            RawMessage.from_bytes([0xB0, 16, 1, 17, 2])
+
+
+class TestMidiParser:
+    def test_running_status(self):
+        parser = MidiParser()
+        messages = parser.feed([0xB0, 16, 1, 17, 2])
+        assert [(msg.control, msg.value) for msg in messages] == [(16, 1), (17, 2)]
+        # running status carries over to the next packet
+        assert [(msg.type, msg.control) for msg in parser.feed([18, 3])] == [('control_change', 18)]
+
+    def test_split_packets(self):
+        parser = MidiParser()
+        assert parser.feed([0xB0, 16]) == []
+        assert [(msg.control, msg.value) for msg in parser.feed([1])] == [(16, 1)]
+        assert parser.feed([17]) == []
+        assert [(msg.control, msg.value) for msg in parser.feed([2, 3])] == [(17, 2)]
+        assert [(msg.control, msg.value) for msg in parser.feed([4])] == [(3, 4)]
+
+        assert parser.feed([0xF2, 0x2C]) == []
+        assert [msg.pos for msg in parser.feed([0x02])] == [300]
+        assert parser.feed([0xF0, 1]) == []
+        assert [msg.data for msg in parser.feed([2, 0xF7])] == [(1, 2)]
+
+    def test_realtime_interleaved(self):
+        messages = MidiParser().feed([0x90, 60, 0xF8, 100, 61, 0])
+        assert [msg.type for msg in messages] == ['clock', 'note_on', 'note_on']
+        assert [msg.velocity for msg in messages[1:]] == [100, 0]
+
+    def test_system_clears_running_status(self):
+        parser = MidiParser()
+        messages = parser.feed([0xC0, 5, 0xF0, 1, 2, 0xF7, 6])
+        assert [msg.type for msg in messages] == ['program_change', 'sysex']
+        assert messages[1].bytes() == [0xF0, 1, 2, 0xF7]
+        assert parser.feed([7]) == []
+
+
+class TestCoalesceControlChanges:
+    def test_latest_value_per_control(self):
+        messages = MidiParser().feed([
+            0xB0, 16, 1, 17, 1, 16, 2,
+            0x90, 1, 127,
+            0xB0, 16, 3,
+            0xB1, 16, 9,
+            0x80, 1, 127,
+            0xB0, 17, 4,
+        ])
+        kept = coalesce_control_changes(messages)
+        assert [(msg.type, msg.channel, msg.data) for msg in kept] == [
+            ('note_on', 0, (1, 127)),
+            ('control_change', 0, (16, 3)),
+            ('control_change', 1, (16, 9)),
+            ('note_off', 0, (1, 127)),
+            ('control_change', 0, (17, 4)),
+        ]
+        assert coalesce_control_changes([]) == []
+
+
+class TestRawDispatch:
+    def test_dispatch(self):
+        cc = ContinuousControlReadOnly()
+        dispatcher = MidiDispatcher()
+        dispatcher.add_callback({'type': 'control_change', 'channel': 0, 'control': 16}, cc.midi_message_extractor)
+        fallback = []
+        dispatcher.add_callback({'type': 'control_change', 'value': 42}, lambda msg: fallback.append(msg))
+
+        parser = MidiParser()
+        for msg in parser.feed([0xB0, 16, 99, 17, 42]):
+            dispatcher.dispatch(msg)
+        assert cc.value == 99
+        assert [msg.control for msg in fallback] == [17]
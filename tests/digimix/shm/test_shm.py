@@ -0,0 +1,118 @@
+import multiprocessing
+
+import pytest
+
+from digimix.audio.channels import FaderChannel
+from digimix.audio.metering import MeterBank
+from digimix.midi.generic_controls import Button, ContinuousControlReadOnly
+from digimix.shm.export import MixerStateExport
+from digimix.shm.layout import Layout
+from digimix.shm.reader import SharedStateReader
+from digimix.shm.writer import SharedStateWriter
+
+LAYOUT = Layout(meters=("mic", "master"), max_channels=2, parameters=("mic/fader_db", "midi/Master"))
+
+
+def _write_counter(path: str, layout: Layout, writes: int, ready: multiprocessing.Event):
+    writer = SharedStateWriter(layout, path=path)
+    ready.set()
+    for counter in range(1, writes + 1):
+        with writer.write() as slab:
+            for i in range(len(slab)):
+                slab[i] = counter
+    writer.close(unlink=False)
+
+
+class TestLayout:
+    def test_encode_decode(self):
+        assert Layout.decode(LAYOUT.encode()) == LAYOUT
+        assert LAYOUT.value_count == 2 + 4 * 4 + 2
+        assert LAYOUT.data_offset() % 8 == 0
+        assert LAYOUT.size() == LAYOUT.data_offset() + LAYOUT.value_count * 8
+
+
+class TestSharedState:
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "state")
+        writer = SharedStateWriter(LAYOUT, path=path)
+        with writer.write():
+            writer.set_meter(0, [-6.], [-12.], [-7.], [True])
+            writer.set_meter(1, [-3., -4.], [-9., -10.], [-4., -5.])
+            writer.set_parameter(0, -10.)
+            writer.set_parameter(1, 64)
+
+        reader = SharedStateReader(path)
+        assert reader.layout == LAYOUT
+        state = reader.read()
+        assert state.sequence == 1
+
+        # outside of write() every setter publishes on its own
+        writer.set_parameter(0, -20.)
+        assert writer.sequence == 4
+        assert reader.read().parameters["mic/fader_db"] == -20.
+        assert state.meters["mic"] == ((-6.,), (-12.,), (-7.,), (True,))
+        assert state.meters["master"].peak_db == (-3., -4.)
+        assert state.meters["master"].clip == (False, False)
+        assert state.parameters == {"mic/fader_db": -10., "midi/Master": 64.}
+
+        reader.close()
+        writer.close()
+
+    def test_invalid_file(self, tmp_path):
+        path = tmp_path / "state"
+        path.write_bytes(b"\0" * 64)
+        with pytest.raises(RuntimeError):
+            SharedStateReader(str(path))
+
+    def test_export(self, tmp_path):
+        bank = MeterBank(["mic"], max_channels=2)
+        bank.update(0, [-6., -5.], [-12., -11.], [-7., -6.])
+        mic = FaderChannel(name="mic")
+        mic.fader_db = -10.
+        fader = ContinuousControlReadOnly(name="Master", initial_value=100)
+        mute = Button(name="Mute")
+        mute.press()
+
+        export = MixerStateExport(bank, [mic], [fader, mute], path=str(tmp_path / "state"))
+        assert export.layout.parameters == (
+            "mic/gain_db", "mic/fader_db", "mic/pan", "mic/pan_method", "mic/cut", "midi/Master", "midi/Mute",
+        )
+        export.publish()
+
+        reader = SharedStateReader(export.path)
+        state = reader.read()
+        assert state.sequence == export.sequence == 1
+        assert state.meters["mic"].rms_db == (-12., -11.)
+        assert state.parameters["mic/fader_db"] == -10.
+        assert state.parameters["mic/cut"] == 0.
+        assert state.parameters["midi/Master"] == 100.
+        assert state.parameters["midi/Mute"] == 1.
+        reader.close()
+        export.close()
+
+    def test_throughput(self, tmp_path):
+        path = str(tmp_path / "state")
+        layout = Layout(
+            meters=tuple(f"ch{i}" for i in range(32)),
+            max_channels=2,
+            parameters=tuple(f"ch{i}/fader_db" for i in range(32)),
+        )
+        ready = multiprocessing.Event()
+        writes = 20000
+        process = multiprocessing.Process(target=_write_counter, args=(path, layout, writes, ready))
+        process.start()
+        assert ready.wait(timeout=10)
+
+        reader = SharedStateReader(path)
+        reads = 0
+        while process.is_alive() or reads == 0:
+            sequence, values = reader.read_values()
+            # a torn read would mix values of two different writes
+            assert all(value == values[0] for value in values)
+            assert sequence == 0 or values[0] == sequence
+            reads += 1
+        process.join()
+
+        assert process.exitcode == 0
+        assert reader.read_values() == (writes, [float(writes)] * layout.value_count)
+        reader.close()
@@ -0,0 +1,49 @@
+import pytest
+
+from digimix.utils.importtime import measure_import, parse_importtime
+
+# modules that must import without loading gi, GStreamer is only initialized once a repository is used
+GI_FREE_MODULES = (
+    "digimix.audio",
+    "digimix.audio.base",
+    "digimix.audio.channels",
+    "digimix.audio.pipeline",
+    "digimix.audio.utils",
+    "digimix.shm.reader",
+    "digimix.midi.dispatcher",
+    "digimix.midi.generic_controls",
+)
+
+OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        420 | digimix
+import time:        80 |         80 |     math
+import time:       200 |        280 |   digimix.audio.utils
+"""
+
+
+class TestParseImporttime:
+    def test_parse(self):
+        profile = parse_importtime("digimix.audio.utils", OUTPUT)
+        assert profile.modules == {"_io", "digimix", "math", "digimix.audio.utils"}
+        assert profile.total_us == 700
+        assert profile.cumulative_us("digimix.audio.utils") == 280
+        assert profile.entries[2].depth == 2
+        assert profile.slowest(1)[0].module == "digimix"
+
+    def test_import_error(self):
+        with pytest.raises(RuntimeError):
+            measure_import("digimix.does_not_exist")
+
+
+class TestImportBudget:
+    @pytest.mark.parametrize("module", GI_FREE_MODULES)
+    def test_no_gi(self, module):
+        profile = measure_import(module)
+        print(profile.format())
+        assert module in profile.modules
+        assert "gi" not in profile.modules
+
+    def test_midi_without_audio(self):
+        profile = measure_import("digimix.midi.dispatcher")
+        assert not {module for module in profile.modules if module.startswith("digimix.audio")}